@@ -0,0 +1,211 @@
+"""
+Build step for the download page: minify, inline, precompress.
+
+Reads index.html (and the icon.svg it references) and writes optimized copies
+to dist/: HTML/CSS/JS minified, icon.svg inlined as a data: URI, plus .gz and
+.br siblings (.br needs the optional `brotli` package) and dist/manifest.json
+mapping every output to its content hash, size and the input hashes it was
+built from. Outputs whose inputs have not changed are left untouched.
+wed_view.py serves dist/ files (and their precompressed siblings) in place of
+the originals whenever they are at least as new as the source.
+Run:
+  python build_assets.py            # incremental build into dist/
+  python build_assets.py --force    # rebuild everything
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+import urllib.parse
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BUILD_DIR = "dist"
+MANIFEST = "manifest.json"
+PAGES = ["index.html"]
+INLINE_ASSETS = ["icon.svg"]  # referenced as href="/<name>" and small enough to embed
+BUILD_VERSION = 1  # bump when the minifiers change so every output is rebuilt
+
+# Content of these elements is kept byte for byte by the HTML minifier
+PROTECTED = re.compile(r"<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>", re.S | re.I)
+# Whitespace next to these tags never renders, so it can be dropped entirely
+BLOCK_TAG = re.compile(
+    r"\s*(</?(?:html|head|body|meta|link|title|style|script|div|p|ul|ol|li|h[1-6]|header|footer"
+    r"|section|nav|main|article|table|thead|tbody|tr|td|th|br|hr|!DOCTYPE)\b[^>]*>)\s*", re.I)
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def minify_css(css):
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+def minify_js(js):
+    """Conservative: only drops indentation, blank lines and whole-line // comments"""
+    lines = (line.strip() for line in js.splitlines())
+    return "\n".join(line for line in lines if line and not line.startswith("//"))
+
+
+def minify_html(html):
+    protected = []
+
+    def protect(match):
+        block = match.group(0)
+        tag = match.group(1).lower()
+        open_tag, _, rest = block.partition(">")
+        body, _, close_tag = rest.rpartition("<")
+        if tag == "style":
+            block = f"{open_tag}>{minify_css(body)}<{close_tag}"
+        elif tag == "script":
+            block = f"{open_tag}>{minify_js(body)}<{close_tag}"
+        protected.append(block)
+        return f"\0{len(protected) - 1}\0"
+
+    html = PROTECTED.sub(protect, html)
+    html = re.sub(r"<!--(?!\[if).*?-->", "", html, flags=re.S)
+    html = re.sub(r"\s+", " ", html)
+    html = BLOCK_TAG.sub(r"\1", html)
+    html = re.sub(r"\0(\d+)\0", lambda m: protected[int(m.group(1))], html)
+    # Protected blocks were swapped back after the whitespace pass; trim around them too
+    html = re.sub(r"\s*(<(?:style|script)\b)", r"\1", html)
+    return html.strip() + "\n"
+
+
+def minify_svg(svg):
+    svg = re.sub(r"<\?xml.*?\?>", "", svg, flags=re.S)
+    svg = re.sub(r"<!--.*?-->", "", svg, flags=re.S)
+    svg = re.sub(r">\s+<", "><", svg)
+    svg = re.sub(r"\s+", " ", svg)
+    return svg.replace(" />", "/>").strip()
+
+
+def svg_data_uri(svg):
+    # Percent-encoding beats base64 for SVG, and the quote-free form survives href="..."
+    return "data:image/svg+xml," + urllib.parse.quote(minify_svg(svg).replace('"', "'"), safe=" /:=',;()")
+
+
+def build_page(html, assets):
+    for name, content in assets.items():
+        if name.endswith(".svg"):
+            html = html.replace(f'href="/{name}"', f'href="{svg_data_uri(content)}"')
+    # Browsers only look for <meta charset> in the first 1024 bytes, which the
+    # inlined icons would otherwise push it past
+    charset = re.search(r"<meta charset=[^>]*>", html, re.I)
+    if charset:
+        html = html.replace(charset.group(0), "", 1)
+        html = re.sub(r"<head>", lambda m: m.group(0) + charset.group(0), html, count=1, flags=re.I)
+    return minify_html(html)
+
+
+def write_if_changed(path, data):
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return
+    except OSError:
+        pass
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def write_variants(path, data):
+    """Write path plus .gz/.br siblings; returns {variant: size}"""
+    write_if_changed(path, data)
+    sizes = {"identity": len(data)}
+    # mtime=0 keeps the gzip bytes (and so their hash) stable across builds
+    sizes["gzip"] = len(compressed := gzip.compress(data, 9, mtime=0))
+    write_if_changed(path + ".gz", compressed)
+    if brotli is not None:
+        sizes["br"] = len(compressed := brotli.compress(data, quality=11))
+        write_if_changed(path + ".br", compressed)
+    elif os.path.exists(path + ".br"):
+        os.remove(path + ".br")  # stale: built from an older source
+    return sizes
+
+
+def touch_outputs(path, source):
+    """Give path and its .gz/.br siblings one mtime no older than source
+    (which may even lie in the future, e.g. copied from a skewed clock)"""
+    now = max(time.time_ns(), os.stat(source).st_mtime_ns)
+    for name in (path, path + ".gz", path + ".br"):
+        if os.path.exists(name):
+            os.utime(name, ns=(now, now))
+
+
+def build(src=HERE, out=None, force=False, quiet=False):
+    """Incrementally build every page in PAGES; returns the names that were rebuilt"""
+    out = out or os.path.join(src, BUILD_DIR)
+    os.makedirs(out, exist_ok=True)
+    manifest_path = os.path.join(out, MANIFEST)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    rebuilt = []
+    for page in PAGES:
+        sources = {}
+        for name in [page] + INLINE_ASSETS:
+            try:
+                with open(os.path.join(src, name), "rb") as f:
+                    sources[name] = f.read()
+            except FileNotFoundError:
+                if name == page:
+                    raise
+        inputs = {name: sha256(data) for name, data in sources.items()}
+        inputs["build_version"] = BUILD_VERSION
+        out_path = os.path.join(out, page)
+
+        entry = manifest.get(page)
+        if (not force and entry and entry.get("inputs") == inputs and os.path.exists(out_path)
+                and (brotli is None or os.path.exists(out_path + ".br"))):
+            # Same content, but a touch/checkout/copy may have made the source
+            # look newer, and wed_view.py only serves dist/ copies that are not
+            # older than their source
+            touch_outputs(out_path, os.path.join(src, page))
+            continue
+
+        assets = {name: data.decode("utf-8") for name, data in sources.items() if name != page}
+        built = build_page(sources[page].decode("utf-8"), assets).encode("utf-8")
+        sizes = write_variants(out_path, built)
+        manifest[page] = {"hash": sha256(built)[:16], "sizes": sizes, "inputs": inputs}
+        rebuilt.append(page)
+        if not quiet:
+            original = len(sources[page])
+            summary = ", ".join(f"{k} {v:,}" for k, v in sizes.items())
+            print(f"Built {page}: {original:,} -> {summary} bytes")
+
+    if rebuilt:
+        write_if_changed(manifest_path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    elif not quiet:
+        print("Everything up to date.")
+    return rebuilt
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--force", action="store_true", help="rebuild even if inputs are unchanged")
+    parser.add_argument("--out", help=f"output directory (default: {BUILD_DIR}/ next to this script)")
+    args = parser.parse_args()
+    build(out=args.out, force=args.force)
+
+
+if __name__ == "__main__":
+    main()
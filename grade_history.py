@@ -0,0 +1,419 @@
+"""
+Grade history storage shared by the v10, v11 and v12 graders.
+
+GradeHistory keeps grade_history.txt as JSON Lines records (legacy banner
+blocks are still read), with a sidecar offset index for paging and search,
+locked single-write appends, gzip rotation of closed segments and a
+checkpoint of per-segment aggregates.
+"""
+
+import bisect
+import gzip
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+try:
+    import fcntl
+except ImportError:  # Windows: appends still go out as one O_APPEND write
+    fcntl = None
+
+# ANSI codes used by GradeHistory.browse (the graders' Colors values)
+OKBLUE = '\033[94m'
+OKCYAN = '\033[96m'
+WARNING = '\033[93m'
+FAIL = '\033[91m'
+ENDC = '\033[0m'
+BOLD = '\033[1m'
+
+class GradeHistory:
+    """grade_history.txt with a sidecar index of report-block start offsets
+    
+    New reports are JSON Lines records, each appended with a single os.write
+    under an advisory lock. Legacy banner blocks are still indexed and parsed.
+    The active file is rotated into gzip segments once it grows past
+    max_bytes; each closed segment leaves its aggregates, entry count and
+    first/last timestamps in a small checkpoint file, so statistics never
+    re-read it and paging or date search only opens the segments it needs.
+    Entries are numbered across the closed segments (oldest first) and then
+    the active file.
+    """
+    BLOCK_MARKER = re.compile(rb"\r?\n={60}\r?\nTest Grader v|^\{", re.MULTILINE)
+    HEADER = struct.Struct("<q")       # size of the history file the index covers
+    RECORD = struct.Struct("<qd")      # block start offset, timestamp (epoch seconds)
+    LEGACY_FIELDS = {
+        "Timestamp": ("timestamp", str),
+        "Student": ("student", str),
+        "Subject": ("subject", str),
+        "Score": ("score", lambda v: float(v.split("/")[0])),
+        "Letter Grade": ("letter_grade", str),
+        "GPA": ("gpa", lambda v: float(v.split("/")[0])),
+    }
+    
+    def __init__(self, filename="grade_history.txt", max_bytes=1 << 20):
+        self.filename = filename
+        self.base = os.path.splitext(filename)[0]
+        self.index_file = self.base + ".idx"
+        self.checkpoint_file = self.base + ".checkpoint.json"
+        self.max_bytes = max_bytes
+        self._segment_cache = (None, [])  # (file, blocks) of the last segment opened
+    
+    @contextmanager
+    def _locked(self):
+        """Hold an exclusive advisory lock on the history file"""
+        fd = os.open(self.filename, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            yield fd
+        finally:
+            os.close(fd)
+    
+    def append_record(self, record):
+        """Append one JSON record as a single locked write and index it"""
+        self.append_records([record])
+    
+    def append_records(self, records):
+        """Append many JSON records under one lock, in buffered writes that each
+        fill the active file up to max_bytes before it is rotated"""
+        lines = [(json.dumps(r, ensure_ascii=False) + "\n").encode("utf-8") for r in records]
+        if not lines:
+            return
+        with self._locked() as fd:
+            first = 0
+            while first < len(lines):
+                room = self.max_bytes - os.path.getsize(self.filename)
+                last, size = first, 0
+                while last < len(lines) and size + len(lines[last]) <= room:
+                    size += len(lines[last])
+                    last += 1
+                if last == first:
+                    if self._should_rotate(len(lines[first])):
+                        self._rotate(fd)
+                        continue
+                    last = first + 1  # a single record larger than max_bytes
+                os.write(fd, b"".join(lines[first:last]))
+                first = last
+            self._sync_index()
+    
+    def _should_rotate(self, incoming):
+        size = os.path.getsize(self.filename)
+        return size > 0 and size + incoming > self.max_bytes
+    
+    def _rotate(self, fd):
+        """Compress the active segment, checkpoint its aggregates and truncate it (lock held)"""
+        count = self._sync_index()
+        entries = self.entries(0, count) if count else []
+        segment = f"{self.base}.{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt.gz"
+        suffix = 1
+        while os.path.exists(segment):
+            segment = f"{self.base}.{datetime.now().strftime('%Y%m%d-%H%M%S')}-{suffix}.txt.gz"
+            suffix += 1
+        with open(self.filename, "rb") as src, gzip.open(segment, "wb") as dst:
+            shutil.copyfileobj(src, dst, 1 << 20)
+        
+        summary = self._aggregate(self.parse_block(b) for b in self._raw_blocks(0, count, count))
+        summary["file"] = os.path.basename(segment)
+        summary["entries"] = count
+        summary["first"] = entries[0][1] if entries else None
+        summary["last"] = entries[-1][1] if entries else None
+        checkpoint = self.load_checkpoint()
+        checkpoint["segments"].append(summary)
+        tmp = self.checkpoint_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f, indent=2)
+        os.replace(tmp, self.checkpoint_file)
+        
+        # Truncate in place so writers already waiting on the lock append to the new segment
+        os.ftruncate(fd, 0)
+        self._sync_index()
+    
+    def load_checkpoint(self):
+        """Return the checkpoint of closed segments ({'segments': [...]})"""
+        try:
+            with open(self.checkpoint_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {"segments": []}
+    
+    @staticmethod
+    def _aggregate(records):
+        """Count, sum, min/max and letter histogram of the scores in records"""
+        summary = {"count": 0, "sum": 0.0, "min": None, "max": None, "letters": {}}
+        for record in records:
+            score = record.get("score")
+            if score is None:
+                continue
+            summary["count"] += 1
+            summary["sum"] += score
+            summary["min"] = score if summary["min"] is None else min(summary["min"], score)
+            summary["max"] = score if summary["max"] is None else max(summary["max"], score)
+            letter = record.get("letter_grade")
+            if letter:
+                summary["letters"][letter] = summary["letters"].get(letter, 0) + 1
+        return summary
+    
+    def statistics(self):
+        """All-time aggregates from the checkpoint plus the active segment only"""
+        count = self.sync_index()
+        totals = self._aggregate(self.parse_block(b) for b in self._raw_blocks(0, count, count))
+        for segment in self.load_checkpoint()["segments"]:
+            if not segment["count"]:
+                continue
+            totals["count"] += segment["count"]
+            totals["sum"] += segment["sum"]
+            totals["min"] = segment["min"] if totals["min"] is None else min(totals["min"], segment["min"])
+            totals["max"] = segment["max"] if totals["max"] is None else max(totals["max"], segment["max"])
+            for letter, n in segment["letters"].items():
+                totals["letters"][letter] = totals["letters"].get(letter, 0) + n
+        return totals
+    
+    def _parse_timestamp(self, record):
+        try:
+            return datetime.fromisoformat(record["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return None
+    
+    def _scan(self, start, end, last_timestamp=0.0):
+        """Find report blocks in the byte range [start, end) of the history file"""
+        records = []
+        with open(self.filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in self.BLOCK_MARKER.finditer(mm, start, end):
+                pos = match.start()
+                stop = mm.find(b"\n", pos, end) if mm[pos:pos + 1] == b"{" else pos + 200
+                timestamp = self._parse_timestamp(self.parse_block(mm[pos:stop]))
+                last_timestamp = timestamp if timestamp is not None else last_timestamp
+                records.append((pos, last_timestamp))
+        return records
+    
+    def sync_index(self):
+        """Index any blocks appended since the last sync; returns the number of entries"""
+        if not os.path.exists(self.filename):
+            return 0
+        with self._locked():
+            return self._sync_index()
+    
+    def _sync_index(self):
+        size = os.path.getsize(self.filename)
+        mode = "r+b" if os.path.exists(self.index_file) else "w+b"
+        with open(self.index_file, mode) as idx:
+            header = idx.read(self.HEADER.size)
+            indexed_size = self.HEADER.unpack(header)[0] if len(header) == self.HEADER.size else 0
+            idx.seek(0, os.SEEK_END)
+            count = max(idx.tell() - self.HEADER.size, 0) // self.RECORD.size
+            
+            if indexed_size > size:
+                # History file was truncated or replaced: drop the stale entries
+                # and header before rebuilding from scratch
+                indexed_size, count = 0, 0
+                idx.truncate(self.HEADER.size)
+                idx.seek(0)
+                idx.write(self.HEADER.pack(0))
+            if indexed_size == size:
+                return count
+            
+            last_timestamp = 0.0
+            if count:
+                idx.seek(self.HEADER.size + (count - 1) * self.RECORD.size)
+                last_timestamp = self.RECORD.unpack(idx.read(self.RECORD.size))[1]
+            records = self._scan(indexed_size, size, last_timestamp) if size else []
+            
+            idx.truncate(self.HEADER.size + count * self.RECORD.size)
+            idx.seek(self.HEADER.size + count * self.RECORD.size)
+            idx.write(b"".join(self.RECORD.pack(*r) for r in records))
+            idx.seek(0)
+            idx.write(self.HEADER.pack(size))
+        return count + len(records)
+    
+    def entries(self, first, last):
+        """Return [(offset, timestamp)] for entries first..last-1"""
+        with open(self.index_file, "rb") as idx:
+            idx.seek(self.HEADER.size + first * self.RECORD.size)
+            data = idx.read((last - first) * self.RECORD.size)
+        return list(self.RECORD.iter_unpack(data))
+    
+    def _raw_blocks(self, first, last, count):
+        """Return the raw bytes of entries first..last-1 without reading the whole file"""
+        first, last = max(first, 0), min(last, count)
+        if first >= last:
+            return []
+        offsets = [offset for offset, _ in self.entries(first, min(last + 1, count))]
+        if len(offsets) == last - first:
+            offsets.append(os.path.getsize(self.filename))
+        with open(self.filename, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return [mm[a:b] for a, b in zip(offsets, offsets[1:])]
+    
+    def parse_block(self, block):
+        """Parse a JSON record or a legacy banner block into a record dict"""
+        block = block.strip()
+        if block.startswith(b"{"):
+            try:
+                return json.loads(block.split(b"\n", 1)[0])
+            except ValueError:
+                return {}
+        record = {}
+        for line in block.decode("utf-8", errors="replace").splitlines():
+            key, sep, value = line.strip().partition(": ")
+            if line.startswith("Test Grader v"):
+                record["version"] = line[len("Test Grader v"):].split(" ", 1)[0]
+            elif sep and key in self.LEGACY_FIELDS:
+                field, convert = self.LEGACY_FIELDS[key]
+                try:
+                    record[field] = convert(value)
+                except ValueError:
+                    pass
+        return record
+    
+    def segments(self):
+        """Closed segments from the checkpoint, oldest first, each with its entry count"""
+        segments = self.load_checkpoint()["segments"]
+        for segment in segments:
+            if "entries" not in segment:  # checkpoint written before entry counts were kept
+                segment["entries"] = len(self._segment_blocks(segment))
+        return segments
+    
+    def _segment_blocks(self, segment):
+        """Raw report blocks of a closed gzip segment (empty if it has been deleted)"""
+        if self._segment_cache[0] == segment["file"]:
+            return self._segment_cache[1]
+        try:
+            with gzip.open(os.path.join(os.path.dirname(self.filename), segment["file"]), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return []
+        offsets = [match.start() for match in self.BLOCK_MARKER.finditer(data)] + [len(data)]
+        blocks = [data[a:b] for a, b in zip(offsets, offsets[1:])]
+        self._segment_cache = (segment["file"], blocks)
+        return blocks
+    
+    def count(self):
+        """Number of entries in the closed segments and the active file"""
+        return sum(segment["entries"] for segment in self.segments()) + self.sync_index()
+    
+    def _blocks(self, first, last):
+        """Raw bytes of entries first..last-1, opening only the segments they fall in"""
+        blocks = []
+        base = 0
+        for segment in self.segments():
+            if first < base + segment["entries"] and last > base:
+                blocks += self._segment_blocks(segment)[max(first - base, 0):last - base]
+            base += segment["entries"]
+        return blocks + self._raw_blocks(first - base, last - base, self.sync_index())
+    
+    def read_records(self, first=0, last=None):
+        """Return record dicts for entries first..last-1, whichever format they were written in"""
+        if last is None:
+            last = self.count()
+        return [self.parse_block(block) for block in self._blocks(first, last)]
+    
+    def format_record(self, record):
+        """Render a record as the classic report banner"""
+        lines = ["=" * 60, f"Test Grader v{record.get('version', '?')} - Grade Report",
+                 f"Timestamp: {record.get('timestamp', 'N/A')}", "=" * 60]
+        if "student" in record:
+            lines.append(f"Student: {record['student'] or 'Anonymous'}")
+        if "subject" in record:
+            lines.append(f"Subject: {record['subject'] or 'General'}")
+        if "score" in record:
+            lines.append(f"Score: {record['score']:.2f}/100")
+        if "letter_grade" in record:
+            lines.append(f"Letter Grade: {record['letter_grade']}")
+        if "gpa" in record:
+            lines.append(f"GPA: {record['gpa']:.2f}/4.00")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+    
+    def read_blocks(self, first, last):
+        """Return display text for entries first..last-1"""
+        blocks = []
+        for block in self._blocks(first, last):
+            if block.lstrip().startswith(b"{"):
+                blocks.append(self.format_record(self.parse_block(block)))
+            else:
+                blocks.append(block.decode("utf-8", errors="replace").replace("\r\n", "\n").strip("\n"))
+        return blocks
+    
+    def find_range(self, start_ts, end_ts):
+        """Return (first, last) for the entries with start_ts <= timestamp < end_ts"""
+        return self._position(start_ts), self._position(end_ts)
+    
+    def _position(self, target):
+        """Number of entries with a timestamp before target
+        
+        Closed segments are counted or skipped from their checkpointed
+        first/last timestamps; only a segment that straddles target is
+        opened. The active file is binary-searched in the index.
+        """
+        base = 0
+        for segment in self.segments():
+            if not segment["entries"] or segment["last"] < target:
+                base += segment["entries"]
+                continue
+            if segment["first"] >= target:
+                return base
+            timestamps, last_timestamp = [], 0.0
+            for block in self._segment_blocks(segment):
+                timestamp = self._parse_timestamp(self.parse_block(block))
+                last_timestamp = timestamp if timestamp is not None else last_timestamp
+                timestamps.append(last_timestamp)
+            return base + bisect.bisect_left(timestamps, target)
+        
+        lo, hi = 0, self.sync_index()
+        if not hi:
+            return base
+        with open(self.index_file, "rb") as idx:
+            while lo < hi:
+                mid = (lo + hi) // 2
+                idx.seek(self.HEADER.size + mid * self.RECORD.size)
+                if self.RECORD.unpack(idx.read(self.RECORD.size))[1] < target:
+                    lo = mid + 1
+                else:
+                    hi = mid
+        return base + lo
+    
+    def browse(self, page_size=5, width=60):
+        """Paged history viewer: last N entries, a given page, or a date range"""
+        total = self.count()
+        stats = self.statistics()
+        if stats["count"]:
+            print(f"\n{OKCYAN}📊 All-time: {stats['count']} report(s) | "
+                  f"Average: {stats['sum'] / stats['count']:.1f}% | "
+                  f"Range: {stats['min']:.1f}-{stats['max']:.1f}%{ENDC}")
+        if not total:
+            print(f"{WARNING}No grade history found.{ENDC}")
+            return
+        pages = (total + page_size - 1) // page_size
+        
+        print("\n" + BOLD + "📚 GRADE HISTORY" + ENDC)
+        print("─" * width)
+        print(f"{total} report(s) on {pages} page(s)")
+        print("L. Last N entries   P. Go to page   D. Search by date range")
+        mode = input(f"{OKBLUE}Choose view (L/P/D) [L]:{ENDC} ").strip().lower()
+        
+        try:
+            if mode == "p":
+                page = min(max(int(input(f"Page number (1-{pages}): ")), 1), pages)
+                first, last = (page - 1) * page_size, min(page * page_size, total)
+            elif mode == "d":
+                start = datetime.strptime(input("From date (YYYY-MM-DD): ").strip(), "%Y-%m-%d")
+                end = datetime.strptime(input("To date (YYYY-MM-DD): ").strip(), "%Y-%m-%d") + timedelta(days=1)
+                first, last = self.find_range(start.timestamp(), end.timestamp())
+                print(f"{last - first} report(s) found")
+            else:
+                count = int(input("How many recent entries? [5]: ").strip() or 5)
+                first, last = max(total - count, 0), total
+        except ValueError:
+            print(f"{FAIL}❌ Invalid input!{ENDC}")
+            return
+        
+        for start in range(first, last, page_size):
+            for block in self.read_blocks(start, min(start + page_size, last)):
+                print(block)
+                print()
+            if start + page_size < last:
+                if input(f"{OKBLUE}Enter for more, 'q' to stop:{ENDC} ").strip().lower() == "q":
+                    break
@@ -1,42 +1,111 @@
 """
-Generate square icon (icon.png 512x512) and favicon.ico (multiple sizes)
+Generate square icon (icon.png 512x512), favicon.ico (multiple sizes) and
+PWA / Apple touch icons.
 Design: centered "TG" text, background #4e54c8, white text.
 Run:
   pip install pillow
-  python make_icon.py
-Outputs: icon.png and favicon.ico in the current directory.
+  python make_icon.py            # skips rendering when nothing changed
+  python make_icon.py --force
+Outputs (current directory): icon.png, icon-192.png, apple-touch-icon.png,
+favicon.ico and .icon-stamp.json, which records a hash of the inputs
+(text, colors, size, font) so unchanged icons are not regenerated.
 """
 
 from PIL import Image, ImageDraw, ImageFont
+import argparse
+import hashlib
+import json
 import os
 
-def make_square_icon(text="TG", bg="#4e54c8", fg="#ffffff", size=512, out_png="icon.png", out_ico="favicon.ico"):
-    # Create base image
+FONT_CANDIDATES = ["DejaVuSans-Bold.ttf", "arialbd.ttf"]
+ICO_SIZES = [256, 128, 64, 48, 32, 16]
+# Extra PNGs: PWA manifest icons (192 and the 512 master) and iOS home screen
+PNG_SIZES = {"icon-192.png": 192, "apple-touch-icon.png": 180}
+STAMP_FILE = ".icon-stamp.json"
+GENERATOR_VERSION = 2  # bump when the drawing code changes
+
+
+def load_font(font_size):
+    """Return (font, font_id); font_id identifies the font file for the input hash"""
+    for name in FONT_CANDIDATES:
+        try:
+            font = ImageFont.truetype(name, font_size)
+        except OSError:
+            continue
+        with open(font.path, "rb") as f:
+            return font, f"{name}:{hashlib.sha256(f.read()).hexdigest()[:16]}"
+    return ImageFont.load_default(), "default"
+
+
+def input_hash(text, bg, fg, size, font_id, outputs):
+    key = json.dumps([GENERATOR_VERSION, text, bg, fg, size, font_id, outputs], sort_keys=True)
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+def render_master(text, bg, fg, size, font):
     img = Image.new("RGBA", (size, size), bg)
     draw = ImageDraw.Draw(img)
+    # textbbox replaces the removed textsize; its offsets also account for the
+    # font's side bearing and ascent, so the glyphs are truly centered
+    left, top, right, bottom = draw.textbbox((0, 0), text, font=font)
+    w, h = right - left, bottom - top
+    draw.text(((size - w) / 2 - left, (size - h) / 2 - top), text, font=font, fill=fg)
+    return img
+
+
+def derive_sizes(master, sizes):
+    """Downscale the master to every size, largest first, each from the master
+    with LANCZOS (reducing_gap does a fast box pre-shrink for large ratios)"""
+    return {s: master if s == master.width else
+            master.resize((s, s), Image.LANCZOS, reducing_gap=3.0)
+            for s in sorted(set(sizes), reverse=True)}
+
+
+def make_square_icon(text="TG", bg="#4e54c8", fg="#ffffff", size=512, out_png="icon.png",
+                     out_ico="favicon.ico", force=False, quiet=False):
+    font, font_id = load_font(int(size * 0.45))
+    outputs = {out_png: size, out_ico: ICO_SIZES, **PNG_SIZES}
+    digest = input_hash(text, bg, fg, size, font_id, outputs)
 
-    # Try to load a bold TTF, fall back to default
-    font_size = int(size * 0.45)
     try:
-        font = ImageFont.truetype("DejaVuSans-Bold.ttf", font_size)
-    except Exception:
-        try:
-            font = ImageFont.truetype("arialbd.ttf", font_size)
-        except Exception:
-            font = ImageFont.load_default()
+        with open(STAMP_FILE, encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        stamp = {}
+    if not force and stamp.get("hash") == digest and all(os.path.exists(name) for name in outputs):
+        if not quiet:
+            print(f"Icons up to date ({', '.join(outputs)})")
+        return False
+
+    # Render once, then derive every size from that one master
+    master = render_master(text, bg, fg, size, font)
+    images = derive_sizes(master, [size, *ICO_SIZES, *PNG_SIZES.values()])
+
+    master.save(out_png, optimize=True)
+    if not quiet:
+        print(f"Saved {out_png} ({size}x{size})")
+
+    for name, s in PNG_SIZES.items():
+        img = images[s]
+        if name.startswith("apple-touch-icon"):
+            img = img.convert("RGB")  # iOS fills transparency with black
+        img.save(name, optimize=True)
+        if not quiet:
+            print(f"Saved {name} ({s}x{s})")
 
-    # Measure and draw text centered
-    w, h = draw.textsize(text, font=font)
-    draw.text(((size - w) / 2, (size - h) / 2), text, font=font, fill=fg)
+    # ICO with multiple embedded sizes, using the frames derived above rather
+    # than letting Pillow resize the master again
+    ico_frames = [images[s] for s in ICO_SIZES]
+    ico_frames[0].save(out_ico, sizes=[(s, s) for s in ICO_SIZES], append_images=ico_frames[1:])
+    if not quiet:
+        print(f"Saved {out_ico} with sizes: {', '.join(str(s) for s in ICO_SIZES)}")
 
-    # Save PNG
-    img.save(out_png)
-    print(f"Saved {out_png} ({size}x{size})")
+    with open(STAMP_FILE, "w", encoding="utf-8") as f:
+        json.dump({"hash": digest, "outputs": list(outputs)}, f, indent=2)
+    return True
 
-    # Save ICO with multiple embedded sizes
-    sizes = [(256,256),(128,128),(64,64),(48,48),(32,32),(16,16)]
-    img.save(out_ico, sizes=sizes)
-    print(f"Saved {out_ico} with sizes: {', '.join(str(s[0]) for s in sizes)}")
 
 if __name__ == '__main__':
-    make_square_icon()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate the Test Grader icons")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the inputs are unchanged")
+    make_square_icon(force=parser.parse_args().force)
@@ -1,6 +1,11 @@
 import os
 import sys
+import argparse
+import bisect
+import csv
+import time
 from datetime import datetime
+from grade_history import GradeHistory
 
 # Test Grader v10.0.0 - Ultimate Edition
 # The most advanced test grading system with comprehensive features
@@ -17,9 +22,31 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# (minimum score, letter, message, emoji, color), highest first
+GRADE_SCALE = [
+    (97, "A+", "Outstanding! Exceptional mastery!", "🌟", Colors.OKGREEN),
+    (93, "A", "Excellent work! Superior performance!", "⭐", Colors.OKGREEN),
+    (90, "A-", "Great job! Strong understanding!", "✨", Colors.OKGREEN),
+    (87, "B+", "Very good! Above average work!", "🎯", Colors.OKCYAN),
+    (83, "B", "Good work! Solid performance!", "👍", Colors.OKCYAN),
+    (80, "B-", "Decent job! Room for growth!", "📈", Colors.OKCYAN),
+    (77, "C+", "Fair work! Satisfactory!", "✓", Colors.WARNING),
+    (73, "C", "Average performance!", "📝", Colors.WARNING),
+    (70, "C-", "Passing but needs improvement!", "⚠️", Colors.WARNING),
+    (67, "D+", "Below average. More study needed!", "📚", Colors.WARNING),
+    (63, "D", "Poor performance. Significant improvement needed!", "⚡", Colors.FAIL),
+    (60, "D-", "Barely passing. Critical improvement required!", "🚻", Colors.FAIL),
+    (0, "F", "Failed. Please seek help immediately!", "❌", Colors.FAIL),
+]
+GRADE_CUTOFFS = [min_score for min_score, *_ in reversed(GRADE_SCALE)]
+
 def clear_screen():
     """Clear the terminal screen"""
-    os.system('cls' if os.name == 'nt' else 'clear')
+    if os.name == 'nt':
+        os.system('cls')
+    else:
+        # ANSI clear + cursor home; avoids spawning a shell on every menu loop
+        print("\033[2J\033[H", end="", flush=True)
 
 def print_banner():
     """Display the application banner"""
@@ -57,32 +84,7 @@ def get_valid_grade():
 
 def determine_grade_advanced(score):
     """Advanced grading system with detailed categorization"""
-    if score >= 97:
-        return "A+", "Outstanding! Exceptional mastery!", "🌟", Colors.OKGREEN
-    elif score >= 93:
-        return "A", "Excellent work! Superior performance!", "⭐", Colors.OKGREEN
-    elif score >= 90:
-        return "A-", "Great job! Strong understanding!", "✨", Colors.OKGREEN
-    elif score >= 87:
-        return "B+", "Very good! Above average work!", "🎯", Colors.OKCYAN
-    elif score >= 83:
-        return "B", "Good work! Solid performance!", "👍", Colors.OKCYAN
-    elif score >= 80:
-        return "B-", "Decent job! Room for growth!", "📈", Colors.OKCYAN
-    elif score >= 77:
-        return "C+", "Fair work! Satisfactory!", "✓", Colors.WARNING
-    elif score >= 73:
-        return "C", "Average performance!", "📝", Colors.WARNING
-    elif score >= 70:
-        return "C-", "Passing but needs improvement!", "⚠️", Colors.WARNING
-    elif score >= 67:
-        return "D+", "Below average. More study needed!", "📚", Colors.WARNING
-    elif score >= 63:
-        return "D", "Poor performance. Significant improvement needed!", "⚡", Colors.FAIL
-    elif score >= 60:
-        return "D-", "Barely passing. Critical improvement required!", "🚻", Colors.FAIL
-    else:
-        return "F", "Failed. Please seek help immediately!", "❌", Colors.FAIL
+    return GRADE_SCALE[len(GRADE_SCALE) - bisect.bisect_right(GRADE_CUTOFFS, score)][1:]
 
 def calculate_gpa(letter_grade):
     """Calculate GPA equivalent"""
@@ -216,16 +218,13 @@ def display_comprehensive_boundaries():
 def save_grade_report(score, letter_grade, gpa, timestamp):
     """Save grade report to file"""
     try:
-        filename = "grade_history.txt"
-        with open(filename, "a", encoding="utf-8") as f:
-            f.write(f"\n{'='*60}\n")
-            f.write(f"Test Grader v10.0.0 - Grade Report\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"{'='*60}\n")
-            f.write(f"Score: {score:.2f}/100\n")
-            f.write(f"Letter Grade: {letter_grade}\n")
-            f.write(f"GPA: {gpa:.2f}/4.00\n")
-            f.write(f"{'='*60}\n\n")
+        GradeHistory().append_record({
+            "version": "10.0.0",
+            "timestamp": timestamp,
+            "score": score,
+            "letter_grade": letter_grade,
+            "gpa": gpa
+        })
         return True
     except Exception as e:
         print(f"{Colors.WARNING}Note: Could not save report to file: {e}{Colors.ENDC}")
@@ -241,6 +240,83 @@ def display_menu():
     print("4. Exit")
     print()
 
+def run_batch(source):
+    """Grade every score in source (a file path or '-' for stdin) without prompts
+    
+    Each line is `score[,name[,subject]]`; a non-numeric first line is treated
+    as a header. All reports go to grade_history.txt in buffered appends under
+    one lock, split where the file reaches its rotation size.
+    """
+    start = time.perf_counter()
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    records = []
+    invalid = 0
+    letter_counts = {}
+    
+    try:
+        stream = sys.stdin if source == "-" else open(source, "r", encoding="utf-8", newline="")
+    except OSError as e:
+        print(f"{Colors.FAIL}Could not read {source}: {e.strerror}{Colors.ENDC}")
+        return 1
+    try:
+        for line_number, row in enumerate(csv.reader(stream), 1):
+            if not row or not row[0].strip():
+                continue
+            try:
+                score = float(row[0])
+            except ValueError:
+                if line_number > 1:
+                    invalid += 1
+                continue
+            if not 0 <= score <= 100:
+                invalid += 1
+                continue
+            
+            letter_grade = GRADE_SCALE[len(GRADE_SCALE) - bisect.bisect_right(GRADE_CUTOFFS, score)][1]
+            record = {
+                "version": "10.0.0",
+                "timestamp": timestamp,
+                "score": score,
+                "letter_grade": letter_grade,
+                "gpa": calculate_gpa(letter_grade)
+            }
+            if len(row) > 1:
+                record["student"] = row[1].strip() or "Anonymous"
+            if len(row) > 2:
+                record["subject"] = row[2].strip() or "General"
+            records.append(record)
+            letter_counts[letter_grade] = letter_counts.get(letter_grade, 0) + 1
+    except (OSError, UnicodeDecodeError) as e:
+        print(f"{Colors.FAIL}Could not read {source}: {e}{Colors.ENDC}")
+        return 1
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    
+    if not records:
+        print(f"{Colors.WARNING}No valid scores found ({invalid} invalid line(s)).{Colors.ENDC}")
+        return 1
+    
+    try:
+        GradeHistory().append_records(records)
+    except Exception as e:
+        print(f"{Colors.FAIL}Could not save reports to file: {e}{Colors.ENDC}")
+        return 1
+    elapsed = time.perf_counter() - start
+    
+    scores = [r["score"] for r in records]
+    print(Colors.BOLD + "📊 BATCH SUMMARY" + Colors.ENDC)
+    print("─" * 60)
+    print(f"Graded:        {len(records)} test(s) ({invalid} invalid line(s) skipped)")
+    print(f"Average:       {sum(scores) / len(scores):.2f}%")
+    print(f"Range:         {min(scores):.2f} - {max(scores):.2f}")
+    print(f"Average GPA:   {sum(r['gpa'] for r in records) / len(records):.2f}/4.00")
+    for min_score, letter_grade, *_ in GRADE_SCALE:
+        if letter_grade in letter_counts:
+            print(f"  {letter_grade:<3} {letter_counts[letter_grade]}")
+    print(f"{Colors.OKGREEN}✓ Reports saved to grade_history.txt in {elapsed:.3f}s{Colors.ENDC}")
+    return 0
+
 def main():
     """Main application loop"""
     print_banner()
@@ -298,17 +374,9 @@ def main():
                 input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
                 print_banner()
             elif choice == "3":
-                try:
-                    with open("grade_history.txt", "r", encoding="utf-8") as f:
-                        print("\n" + Colors.BOLD + "📚 GRADE HISTORY" + Colors.ENDC)
-                        print("─" * 60)
-                        print(f.read())
-                        input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
-                        print_banner()
-                except FileNotFoundError:
-                    print(f"{Colors.WARNING}No grade history found.{Colors.ENDC}")
-                    input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
-                    print_banner()
+                GradeHistory().browse()
+                input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
+                print_banner()
             elif choice == "4":
                 print(f"\n{Colors.OKGREEN}Thank you for using Test Grader v10.0.0!{Colors.ENDC}")
                 print(f"{Colors.OKCYAN}Graded {grade_count} test(s) this session.{Colors.ENDC}")
@@ -328,4 +396,10 @@ def main():
             continue
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Test Grader v10.0.0 - Ultimate Edition")
+    parser.add_argument("--batch", nargs="?", const="-", metavar="FILE",
+                        help="grade scores from FILE (or stdin) without prompts")
+    args = parser.parse_args()
+    if args.batch:
+        sys.exit(run_batch(args.batch))
     main()
\ No newline at end of file
@@ -1,8 +1,11 @@
 import os
 import sys
 import json
+import queue
+from contextlib import contextmanager
 from datetime import datetime
 import sqlite3
+from grade_history import GradeHistory
 
 # Test Grader v11.0.0 - Database Edition
 # Advanced grading system with SQLite database storage
@@ -18,65 +21,85 @@ class Colors:
     BOLD = '\033[1m'
 
 class GradeDatabase:
-    def __init__(self, db_name="grades.db"):
+    def __init__(self, db_name="grades.db", pool_size=0):
         self.db_name = db_name
+        # With pool_size > 0, long-running callers (e.g. the web API) reuse
+        # connections instead of opening one per query
+        self.pool = None
+        if pool_size:
+            self.pool = queue.Queue()
+            for _ in range(pool_size):
+                self.pool.put(sqlite3.connect(db_name, check_same_thread=False))
         self.init_database()
     
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, or open a short-lived one if pooling is off"""
+        if self.pool is None:
+            conn = sqlite3.connect(self.db_name)
+            try:
+                yield conn
+            finally:
+                conn.close()
+        else:
+            conn = self.pool.get()
+            try:
+                yield conn
+            finally:
+                self.pool.put(conn)
+    
     def init_database(self):
         """Initialize the database with grades table"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS grades (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                score REAL NOT NULL,
-                letter_grade TEXT NOT NULL,
-                gpa REAL NOT NULL,
-                student_name TEXT,
-                subject TEXT,
-                timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
-                feedback TEXT
-            )
-        ''')
-        conn.commit()
-        conn.close()
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS grades (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    score REAL NOT NULL,
+                    letter_grade TEXT NOT NULL,
+                    gpa REAL NOT NULL,
+                    student_name TEXT,
+                    subject TEXT,
+                    timestamp DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    feedback TEXT
+                )
+            ''')
+            conn.commit()
     
     def save_grade(self, score, letter_grade, gpa, student_name="", subject="", feedback=""):
         """Save grade to database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO grades (score, letter_grade, gpa, student_name, subject, feedback)
-            VALUES (?, ?, ?, ?, ?, ?)
-        ''', (score, letter_grade, gpa, student_name, subject, feedback))
-        conn.commit()
-        conn.close()
+        self.save_grades([(score, letter_grade, gpa, student_name, subject, feedback)])
+    
+    def save_grades(self, rows):
+        """Save many (score, letter_grade, gpa, student_name, subject, feedback) rows in one transaction"""
+        with self.connection() as conn:
+            with conn:
+                conn.executemany('''
+                    INSERT INTO grades (score, letter_grade, gpa, student_name, subject, feedback)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', rows)
     
     def get_all_grades(self):
         """Retrieve all grades from database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM grades ORDER BY timestamp DESC')
-        grades = cursor.fetchall()
-        conn.close()
-        return grades
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('SELECT * FROM grades ORDER BY timestamp DESC')
+            return cursor.fetchall()
     
     def get_statistics(self):
         """Get grade statistics"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_grades,
-                AVG(score) as avg_score,
-                MAX(score) as highest_score,
-                MIN(score) as lowest_score,
-                AVG(gpa) as avg_gpa
-            FROM grades
-        ''')
-        stats = cursor.fetchone()
-        conn.close()
-        return stats
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT 
+                    COUNT(*) as total_grades,
+                    AVG(score) as avg_score,
+                    MAX(score) as highest_score,
+                    MIN(score) as lowest_score,
+                    AVG(gpa) as avg_gpa
+                FROM grades
+            ''')
+            return cursor.fetchone()
 
 def clear_screen():
     os.system('cls' if os.name == 'nt' else 'clear')
@@ -153,18 +176,15 @@ def save_grade_report(score, letter_grade, gpa, student_name="", subject="", tim
     try:
         if timestamp is None:
             timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        filename = "grade_history.txt"
-        with open(filename, "a", encoding="utf-8") as f:
-            f.write(f"\n{'='*60}\n")
-            f.write(f"Test Grader v11.0.0 - Grade Report\n")
-            f.write(f"Timestamp: {timestamp}\n")
-            f.write(f"{'='*60}\n")
-            f.write(f"Student: {student_name or 'Anonymous'}\n")
-            f.write(f"Subject: {subject or 'General'}\n")
-            f.write(f"Score: {score:.2f}/100\n")
-            f.write(f"Letter Grade: {letter_grade}\n")
-            f.write(f"GPA: {gpa:.2f}/4.00\n")
-            f.write(f"{'='*60}\n\n")
+        GradeHistory().append_record({
+            "version": "11.0.0",
+            "timestamp": timestamp,
+            "student": student_name or "Anonymous",
+            "subject": subject or "General",
+            "score": score,
+            "letter_grade": letter_grade,
+            "gpa": gpa
+        })
         return True
     except Exception as e:
         print(f"{Colors.FAIL}Error saving to file: {e}{Colors.ENDC}")
@@ -230,16 +250,8 @@ def main():
                 input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
                 
             elif choice == "4":
-                # View grade history from file
-                try:
-                    with open("grade_history.txt", "r", encoding="utf-8") as f:
-                        print("\n" + Colors.BOLD + "📚 GRADE HISTORY (from file)" + Colors.ENDC)
-                        print("─" * 60)
-                        print(f.read())
-                        input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
-                except FileNotFoundError:
-                    print(f"{Colors.WARNING}No grade history file found yet.{Colors.ENDC}")
-                    input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
+                GradeHistory().browse()
+                input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
                 
             elif choice == "5":
                 # Export to JSON
@@ -2,8 +2,20 @@ import os
 import sys
 import json
 import csv
+import glob
+import gzip
+import io
+import itertools
+import math
+import random
+import socket
+import tempfile
+import time
+from array import array
+from collections import deque
 from datetime import datetime
 import statistics
+from grade_history import GradeHistory
 
 # Test Grader v12.0.0 - Professional Plus Edition
 # Advanced grading with export features and analytics
@@ -20,11 +32,293 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+LETTER_GRADES = ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
+REPORT_PERCENTILES = (10, 25, 50, 75, 90)
+
+class QuantileSketch:
+    """Mergeable KLL-style quantile sketch with bounded memory"""
+    def __init__(self, k=200, seed=None):
+        self.k = k
+        self.count = 0
+        self.compactors = [[]]
+        self._rng = random.Random(seed)
+        self._max_size = self._capacity(0)
+    
+    def _capacity(self, level):
+        """Items a level may hold before it is compacted into the next one"""
+        depth = len(self.compactors) - level - 1
+        return 2 * int(math.ceil(self.k * (2 / 3) ** depth)) + 1
+    
+    def _grow(self):
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+    
+    def _size(self):
+        return sum(len(c) for c in self.compactors)
+    
+    def _compress(self):
+        """Halve full levels, promoting every other sorted item one level up"""
+        while self._size() >= self._max_size:
+            for h in range(len(self.compactors)):
+                if len(self.compactors[h]) >= self._capacity(h):
+                    if h + 1 >= len(self.compactors):
+                        self._grow()
+                    level = sorted(self.compactors[h])
+                    leftover = [level.pop()] if len(level) % 2 else []
+                    self.compactors[h + 1].extend(level[self._rng.randint(0, 1)::2])
+                    self.compactors[h] = leftover
+                    break
+    
+    def add(self, value):
+        """Add a single observation"""
+        self.compactors[0].append(value)
+        self.count += 1
+        if len(self.compactors[0]) >= self._capacity(0):
+            self._compress()
+    
+    def merge(self, other):
+        """Fold another sketch (e.g. from another station) into this one"""
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self.count += other.count
+        self._compress()
+        return self
+    
+    def _weighted_items(self):
+        items = [(v, 1 << h) for h, level in enumerate(self.compactors) for v in level]
+        items.sort()
+        return items
+    
+    def quantile(self, q):
+        """Approximate value at quantile q (0.0 - 1.0)"""
+        items = self._weighted_items()
+        if not items:
+            return None
+        total = sum(w for _, w in items)
+        target = q * total
+        cumulative = 0
+        for value, weight in items:
+            cumulative += weight
+            if cumulative >= target:
+                return value
+        return items[-1][0]
+    
+    def percentiles(self, points=REPORT_PERCENTILES):
+        """Return {p: value} for several percentiles in a single pass"""
+        items = self._weighted_items()
+        if not items:
+            return {}
+        total = sum(w for _, w in items)
+        result = {}
+        cumulative = 0
+        index = 0
+        for p in sorted(points):
+            target = p / 100 * total
+            while index < len(items) - 1 and cumulative + items[index][1] < target:
+                cumulative += items[index][1]
+                index += 1
+            result[p] = items[index][0]
+        return result
+    
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'compactors': self.compactors}
+    
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(k=data['k'])
+        sketch.compactors = [list(level) for level in data['compactors']]
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        sketch.count = data['count']
+        return sketch
+
+class ScoreHistogram:
+    """Fixed-bin histogram over the 0-100 score range"""
+    def __init__(self, bin_width=1.0):
+        self.bin_width = bin_width
+        self.counts = [0] * (int(100 / bin_width) + 1)
+    
+    def _bin(self, score):
+        return min(max(int(score / self.bin_width), 0), len(self.counts) - 1)
+    
+    def add(self, score):
+        self.counts[self._bin(score)] += 1
+    
+    def merge(self, other):
+        if other.bin_width != self.bin_width:
+            raise ValueError("Cannot merge histograms with different bin widths")
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        return self
+    
+    def mode(self):
+        """Lower edge of the most populated bin, or None if empty"""
+        best = max(range(len(self.counts)), key=self.counts.__getitem__)
+        if self.counts[best] == 0:
+            return None
+        return best * self.bin_width
+    
+    def fraction_at_or_below(self, score):
+        """Share of recorded scores that fall in or below the bin of score"""
+        total = sum(self.counts)
+        if total == 0:
+            return 0.0
+        return sum(self.counts[:self._bin(score) + 1]) / total
+
+class GradeAnalytics:
+    """Streaming, mergeable summary of graded scores with bounded memory"""
+    def __init__(self, k=200, bin_width=1.0):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = None
+        self.max = None
+        self.sketch = QuantileSketch(k)
+        self.histogram = ScoreHistogram(bin_width)
+        self.letter_counts = {}
+        self.recent = deque(maxlen=5)
+    
+    def add(self, score, letter_grade=None):
+        """Record one score (Welford update for mean/variance)"""
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        self.min = score if self.min is None else min(self.min, score)
+        self.max = score if self.max is None else max(self.max, score)
+        self.sketch.add(score)
+        self.histogram.add(score)
+        self.recent.append(score)
+        if letter_grade:
+            self.letter_counts[letter_grade] = self.letter_counts.get(letter_grade, 0) + 1
+    
+    def merge(self, other):
+        """Combine with another station's analytics"""
+        if other.count == 0:
+            return self
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / total
+        self.mean += delta * other.count / total
+        self.count = total
+        self.min = other.min if self.min is None else min(self.min, other.min)
+        self.max = other.max if self.max is None else max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+        self.histogram.merge(other.histogram)
+        for grade, count in other.letter_counts.items():
+            self.letter_counts[grade] = self.letter_counts.get(grade, 0) + count
+        return self
+    
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0
+    
+    def to_dict(self):
+        return {
+            'count': self.count, 'mean': self.mean, 'm2': self.m2,
+            'min': self.min, 'max': self.max,
+            'sketch': self.sketch.to_dict(),
+            'bin_width': self.histogram.bin_width,
+            'histogram': self.histogram.counts,
+            'letter_counts': self.letter_counts,
+            'recent': list(self.recent)
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        analytics = cls(bin_width=data['bin_width'])
+        analytics.count = data['count']
+        analytics.mean = data['mean']
+        analytics.m2 = data['m2']
+        analytics.min = data['min']
+        analytics.max = data['max']
+        analytics.sketch = QuantileSketch.from_dict(data['sketch'])
+        analytics.histogram.counts = list(data['histogram'])
+        analytics.letter_counts = dict(data['letter_counts'])
+        analytics.recent.extend(data.get('recent', []))
+        return analytics
+
+class SessionStore:
+    """Session grade entries: a recent window kept in arrays, older entries spilled to disk"""
+    def __init__(self, window=1000):
+        self.window = window
+        self._timestamps = array('d')
+        self._scores = array('d')
+        self._gpas = array('d')
+        self._letters = array('b')
+        self._info = []
+        self.spill_path = None
+        self._spilled = 0
+    
+    def append(self, entry):
+        """Add a grade entry dict (same keys the grader has always used)"""
+        self._timestamps.append(entry['timestamp'].timestamp())
+        self._scores.append(entry['score'])
+        self._gpas.append(entry['gpa'])
+        self._letters.append(LETTER_GRADES.index(entry['letter_grade']))
+        self._info.append((entry['name'], entry['student_id'], entry['subject']))
+        if len(self._scores) >= 2 * self.window:
+            self._spill(len(self._scores) - self.window)
+    
+    def _spill(self, n):
+        """Move the oldest n in-memory entries to the spill file in one write"""
+        if self.spill_path is None:
+            fd, self.spill_path = tempfile.mkstemp(prefix="tg12_session_", suffix=".csv")
+            os.close(fd)
+        with open(self.spill_path, 'a', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(
+                (self._timestamps[i], *self._info[i], self._scores[i],
+                 LETTER_GRADES[self._letters[i]], self._gpas[i])
+                for i in range(n)
+            )
+        for column in (self._timestamps, self._scores, self._gpas, self._letters, self._info):
+            del column[:n]
+        self._spilled += n
+    
+    @staticmethod
+    def _entry(timestamp, name, student_id, subject, score, letter_grade, gpa):
+        return {
+            'timestamp': datetime.fromtimestamp(float(timestamp)),
+            'name': name,
+            'student_id': student_id,
+            'subject': subject,
+            'score': float(score),
+            'letter_grade': letter_grade,
+            'gpa': float(gpa)
+        }
+    
+    def __iter__(self):
+        """Yield every entry oldest first, streaming spilled entries from disk"""
+        if self.spill_path:
+            with open(self.spill_path, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.reader(f):
+                    yield self._entry(*row)
+        for i in range(len(self._scores)):
+            yield self._entry(self._timestamps[i], *self._info[i], self._scores[i],
+                              LETTER_GRADES[self._letters[i]], self._gpas[i])
+    
+    def __len__(self):
+        return self._spilled + len(self._scores)
+    
+    def __bool__(self):
+        return len(self) > 0
+    
+    def clear(self):
+        """Drop all entries and remove the spill file"""
+        for column in (self._timestamps, self._scores, self._gpas, self._letters, self._info):
+            del column[:]
+        if self.spill_path and os.path.exists(self.spill_path):
+            os.remove(self.spill_path)
+        self.spill_path = None
+        self._spilled = 0
+
 class TestGraderV12:
     def __init__(self):
-        self.all_grades = []
+        self.all_grades = SessionStore()
+        self.analytics = GradeAnalytics()
         self.session_start = datetime.now()
         self.grade_history = []
+        self.history = GradeHistory()
+        self.station_name = socket.gethostname()
         
     def clear_screen(self):
         """Clear the terminal screen"""
@@ -97,51 +391,91 @@ class TestGraderV12:
         }
         return gpa_map.get(letter_grade, 0.0)
     
-    def calculate_statistics(self, grades_list):
-        """Calculate comprehensive statistics"""
-        if not grades_list:
+    def calculate_statistics(self, grades):
+        """Calculate comprehensive statistics from a GradeAnalytics or any iterable of scores"""
+        if not isinstance(grades, GradeAnalytics):
+            analytics = GradeAnalytics()
+            for score in grades:
+                analytics.add(score)
+            grades = analytics
+        if grades.count == 0:
             return None
-            
+        
+        percentiles = grades.sketch.percentiles()
+        mode = grades.histogram.mode()
         stats = {
-            'mean': statistics.mean(grades_list),
-            'median': statistics.median(grades_list),
-            'mode': None,
-            'std_dev': statistics.stdev(grades_list) if len(grades_list) > 1 else 0,
-            'variance': statistics.variance(grades_list) if len(grades_list) > 1 else 0,
-            'min': min(grades_list),
-            'max': max(grades_list),
-            'range': max(grades_list) - min(grades_list),
-            'count': len(grades_list)
+            'mean': grades.mean,
+            'median': percentiles[50],
+            'mode': f"{mode:g}-{mode + grades.histogram.bin_width:g}" if mode is not None else "N/A",
+            'std_dev': math.sqrt(grades.variance()),
+            'variance': grades.variance(),
+            'min': grades.min,
+            'max': grades.max,
+            'range': grades.max - grades.min,
+            'count': grades.count,
+            'percentiles': percentiles
         }
-        
-        try:
-            stats['mode'] = statistics.mode(grades_list)
-        except:
-            stats['mode'] = "N/A"
-            
         return stats
     
-    def export_to_csv(self, data, filename=None):
-        """Export grades to CSV file"""
+    def save_station_analytics(self, filename=None):
+        """Write this station's analytics so other stations can merge it"""
+        if not filename:
+            filename = f"analytics_{self.station_name}.json"
+        try:
+            with open(filename, 'w', encoding='utf-8') as f:
+                json.dump(self.analytics.to_dict(), f)
+            return filename
+        except Exception as e:
+            print(f"{Colors.FAIL}Error saving analytics: {e}{Colors.ENDC}")
+            return None
+    
+    def merge_station_analytics(self, pattern="analytics_*.json"):
+        """Merge every station's analytics file into one department-wide view"""
+        merged = GradeAnalytics()
+        stations = 0
+        for path in sorted(glob.glob(pattern)):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    merged.merge(GradeAnalytics.from_dict(json.load(f)))
+                stations += 1
+            except (OSError, ValueError, KeyError) as e:
+                print(f"{Colors.WARNING}Skipping {path}: {e}{Colors.ENDC}")
+        return merged, stations
+    
+    CSV_FIELDNAMES = ['Timestamp', 'Name', 'ID', 'Subject', 'Score', 'Grade', 'GPA']
+    
+    def _csv_row(self, entry):
+        """Map a grade entry dict to a CSV row; sequences (e.g. cursor rows) pass through"""
+        if isinstance(entry, dict):
+            return (entry['timestamp'], entry['name'], entry['student_id'], entry['subject'],
+                    entry['score'], entry['letter_grade'], entry['gpa'])
+        return entry
+    
+    def export_to_csv(self, data, filename=None, compress=False, chunk_size=10000, buffer_size=1 << 20):
+        """Stream grades from any iterable to a CSV file in chunks, optionally gzip-compressed"""
         if not filename:
             filename = f"grades_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+        if compress and not filename.endswith('.gz'):
+            filename += '.gz'
             
         try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['Timestamp', 'Name', 'ID', 'Subject', 'Score', 'Grade', 'GPA']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                for entry in data:
-                    writer.writerow({
-                        'Timestamp': entry['timestamp'],
-                        'Name': entry['name'],
-                        'ID': entry['student_id'],
-                        'Subject': entry['subject'],
-                        'Score': entry['score'],
-                        'Grade': entry['letter_grade'],
-                        'GPA': entry['gpa']
-                    })
+            start = time.perf_counter()
+            rows_written = 0
+            with open(filename, 'wb', buffering=buffer_size) as raw:
+                stream = gzip.GzipFile(fileobj=raw, mode='wb', compresslevel=6) if compress else raw
+                with io.TextIOWrapper(stream, encoding='utf-8', newline='') as csvfile:
+                    writer = csv.writer(csvfile)
+                    writer.writerow(self.CSV_FIELDNAMES)
+                    rows = map(self._csv_row, data)
+                    while True:
+                        chunk = list(itertools.islice(rows, chunk_size))
+                        if not chunk:
+                            break
+                        writer.writerows(chunk)
+                        rows_written += len(chunk)
+            elapsed = time.perf_counter() - start
+            rate = rows_written / elapsed if elapsed > 0 else float(rows_written)
+            print(f"{Colors.OKCYAN}Wrote {rows_written} rows in {elapsed:.2f}s ({rate:,.0f} rows/s){Colors.ENDC}")
             return filename
         except Exception as e:
             print(f"{Colors.FAIL}Error exporting to CSV: {e}{Colors.ENDC}")
@@ -154,22 +488,28 @@ class TestGraderV12:
             
         try:
             with open(filename, 'w', encoding='utf-8') as jsonfile:
-                json.dump(data, jsonfile, indent=4, default=str)
+                # Stream entries so a spilled session never has to fit in memory
+                jsonfile.write('[')
+                for i, entry in enumerate(data):
+                    jsonfile.write(',\n' if i else '\n')
+                    jsonfile.write(json.dumps(entry, indent=4, default=str))
+                jsonfile.write('\n]\n')
             return filename
         except Exception as e:
             print(f"{Colors.FAIL}Error exporting to JSON: {e}{Colors.ENDC}")
             return None
     
-    def display_analytics_dashboard(self):
+    def display_analytics_dashboard(self, analytics=None, title="📊 ANALYTICS DASHBOARD"):
         """Display comprehensive analytics dashboard"""
-        if not self.all_grades:
+        if analytics is None:
+            analytics = self.analytics
+        if analytics.count == 0:
             print(f"{Colors.WARNING}No grades to analyze yet.{Colors.ENDC}")
             return
             
-        scores = [g['score'] for g in self.all_grades]
-        stats = self.calculate_statistics(scores)
+        stats = self.calculate_statistics(analytics)
         
-        print("\n" + Colors.BOLD + Colors.OKCYAN + "📊 ANALYTICS DASHBOARD" + Colors.ENDC)
+        print("\n" + Colors.BOLD + Colors.OKCYAN + title + Colors.ENDC)
         print("="*65)
         
         # Basic Statistics
@@ -182,25 +522,27 @@ class TestGraderV12:
         print(f"  • Score Range:     {stats['min']:.2f} - {stats['max']:.2f}")
         print(f"  • Total Tests:     {stats['count']}")
         
+        # Percentiles
+        print(Colors.BOLD + "\n📏 Percentiles:" + Colors.ENDC)
+        print("  " + " | ".join(f"p{p}: {v:.1f}" for p, v in stats['percentiles'].items()))
+        
         # Grade Distribution
         print(Colors.BOLD + "\n📊 Grade Distribution:" + Colors.ENDC)
-        grade_counts = {}
-        for g in self.all_grades:
-            grade = g['letter_grade']
-            grade_counts[grade] = grade_counts.get(grade, 0) + 1
+        grade_counts = analytics.letter_counts
+        total = sum(grade_counts.values())
         
-        for grade in ['A+', 'A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']:
+        for grade in LETTER_GRADES:
             if grade in grade_counts:
                 count = grade_counts[grade]
-                percentage = (count / len(self.all_grades)) * 100
+                percentage = (count / total) * 100
                 bar = '█' * int(percentage / 2)
                 print(f"  {grade:3} [{count:2}] {bar} {percentage:.1f}%")
         
-        # Performance Trends
-        if len(self.all_grades) > 1:
+        # Performance Trends (merged department views have no single recent window)
+        if analytics.count > 1 and analytics.recent:
             print(Colors.BOLD + "\n📈 Performance Trend:" + Colors.ENDC)
-            recent_avg = statistics.mean(scores[-5:])
-            overall_avg = statistics.mean(scores)
+            recent_avg = statistics.mean(analytics.recent)
+            overall_avg = analytics.mean
             trend = recent_avg - overall_avg
             
             if trend > 0:
@@ -234,9 +576,8 @@ class TestGraderV12:
         print(f"[{bar_color}{'█' * filled_bars}{Colors.ENDC}{'░' * empty_bars}]")
         
         # Show percentile
-        if self.all_grades:
-            scores = [g['score'] for g in self.all_grades]
-            percentile = sum(1 for s in scores if s <= score) / len(scores) * 100
+        if self.analytics.count:
+            percentile = self.analytics.histogram.fraction_at_or_below(score) * 100
             print(f"Percentile: {percentile:.1f}th (better than {percentile:.0f}% of all grades)")
         
         print()
@@ -246,25 +587,28 @@ class TestGraderV12:
         try:
             if timestamp is None:
                 timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            filename = "grade_history.txt"
-            with open(filename, "a", encoding="utf-8") as f:
-                f.write(f"\n{'='*60}\n")
-                f.write(f"Test Grader v12.0.0 - Grade Report\n")
-                f.write(f"Timestamp: {timestamp}\n")
-                f.write(f"{'='*60}\n")
-                f.write(f"Student: {name or 'Anonymous'}\n")
-                f.write(f"Subject: {subject or 'General'}\n")
-                f.write(f"Score: {score:.2f}/100\n")
-                f.write(f"Letter Grade: {letter_grade}\n")
-                f.write(f"GPA: {gpa:.2f}/4.00\n")
-                f.write(f"{'='*60}\n\n")
+            self.history.append_record({
+                "version": "12.0.0",
+                "timestamp": timestamp,
+                "student": name or "Anonymous",
+                "subject": subject or "General",
+                "score": score,
+                "letter_grade": letter_grade,
+                "gpa": gpa
+            })
             return True
         except Exception as e:
             print(f"{Colors.FAIL}Error saving to file: {e}{Colors.ENDC}")
             return False
     
     def run(self):
-        """Main application loop"""
+        """Main application loop; the session's spill file is removed however it ends"""
+        try:
+            self.main_menu()
+        finally:
+            self.all_grades.clear()
+    
+    def main_menu(self):
         self.print_banner()
         
         while True:
@@ -277,9 +621,10 @@ class TestGraderV12:
             print("5. View all grades")
             print("6. View grade history (from file)")
             print("7. Clear session")
-            print("8. Exit")
+            print("8. Department analytics (merge stations)")
+            print("9. Exit")
             
-            choice = input(f"\n{Colors.OKBLUE}Select option (1-8):{Colors.ENDC} ").strip()
+            choice = input(f"\n{Colors.OKBLUE}Select option (1-9):{Colors.ENDC} ").strip()
             
             if choice == "1":
                 # Grade a new test
@@ -302,6 +647,7 @@ class TestGraderV12:
                         'gpa': gpa
                     }
                     self.all_grades.append(grade_entry)
+                    self.analytics.add(grade, letter_grade)
                     
                     # Display result
                     print("\n" + "="*65)
@@ -321,7 +667,8 @@ class TestGraderV12:
                 
             elif choice == "3":
                 if self.all_grades:
-                    filename = self.export_to_csv(self.all_grades)
+                    compress = input("Compress with gzip? (y/N): ").strip().lower() == 'y'
+                    filename = self.export_to_csv(self.all_grades, compress=compress)
                     if filename:
                         print(f"{Colors.OKGREEN}✓ Exported to {filename}{Colors.ENDC}")
                 else:
@@ -345,23 +692,25 @@ class TestGraderV12:
                     print(f"{Colors.WARNING}No grades recorded yet.{Colors.ENDC}")
             
             elif choice == "6":
-                # View grade history from file
-                try:
-                    with open("grade_history.txt", "r", encoding="utf-8") as f:
-                        print("\n" + Colors.BOLD + "📚 GRADE HISTORY (from file)" + Colors.ENDC)
-                        print("─" * 65)
-                        print(f.read())
-                        input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
-                except FileNotFoundError:
-                    print(f"{Colors.WARNING}No grade history file found yet.{Colors.ENDC}")
-                    input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
+                self.history.browse(width=65)
+                input(f"\n{Colors.OKBLUE}Press Enter to continue...{Colors.ENDC}")
                     
             elif choice == "7":
                 self.all_grades.clear()
+                self.analytics = GradeAnalytics()
                 self.print_banner()
                 print(f"{Colors.OKGREEN}✓ Session cleared!{Colors.ENDC}")
                 
             elif choice == "8":
+                if self.analytics.count:
+                    filename = self.save_station_analytics()
+                    if filename:
+                        print(f"{Colors.OKGREEN}✓ Station analytics saved to {filename}{Colors.ENDC}")
+                merged, stations = self.merge_station_analytics()
+                print(f"{Colors.OKCYAN}Merged analytics from {stations} station(s){Colors.ENDC}")
+                self.display_analytics_dashboard(merged, "🏫 DEPARTMENT ANALYTICS")
+                
+            elif choice == "9":
                 session_duration = datetime.now() - self.session_start
                 print(f"\n{Colors.OKGREEN}Thank you for using Test Grader v12.0.0!{Colors.ENDC}")
                 print(f"Session Duration: {session_duration}")
@@ -3,13 +3,42 @@ Grade Calculator v13.0.0
 Advanced Features: Graphical reporting, multiple students, weighted categories, PDF reports
 """
 
+import functools
+import glob
 import json
+import math
 import os
+import queue
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, List, Tuple # type: ignore
+from typing import Dict, List, Tuple, Union # type: ignore
+from xml.sax.saxutils import escape
 import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages 
+
+# matplotlib is imported on first use by the plotting methods, so the text,
+# statistics and SVG features start quickly and work without it
+plt = None
+
+def _pyplot():
+    global plt
+    if plt is None:
+        import matplotlib.pyplot
+        plt = matplotlib.pyplot
+    return plt
+
+# Minimum final grade for each letter, highest first; anything lower is an F
+LETTER_CUTOFFS = [(93, 'A'), (90, 'A-'), (87, 'B+'), (83, 'B'), (80, 'B-'), (77, 'C+'),
+                  (73, 'C'), (70, 'C-'), (67, 'D+'), (63, 'D'), (60, 'D-')]
+GRADE_LABELS = [letter for _, letter in LETTER_CUTOFFS] + ['F']
+GRADE_POINTS = {'A': 4.0, 'A-': 3.7, 'B+': 3.3, 'B': 3.0, 'B-': 2.7, 'C+': 2.3,
+                'C': 2.0, 'C-': 1.7, 'D+': 1.3, 'D': 1.0, 'D-': 0.7, 'F': 0.0}
+# save_data/load_data paths with these endings use GradeStore instead of JSON
+DB_SUFFIXES = ('.db', '.sqlite', '.sqlite3')
 
 class GradeCategory:
     """Represents a grading category with weight"""
@@ -17,6 +46,7 @@ class GradeCategory:
         self.name = name
         self.weight = weight
         self.assignments = []
+        self._on_change = None  # change listener, set by the owning Student
     
     def add_assignment(self, name: str, score: float, max_score: float):
         """Add an assignment to this category"""
@@ -26,6 +56,8 @@ class GradeCategory:
             'max_score': max_score,
             'percentage': (score / max_score) * 100
         })
+        if self._on_change:
+            self._on_change(self, name, None, score)
     
     def get_category_average(self) -> float:
         """Calculate average for this category"""
@@ -34,16 +66,95 @@ class GradeCategory:
         total_percentage = sum(a['percentage'] for a in self.assignments)
         return total_percentage / len(self.assignments)
 
+class CategorySchema:
+    """Course-level definition of a category: name, weight and assignment slots.
+
+    One instance is shared by every student in the course; students only
+    store their scores, one per slot."""
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.slot_names: List[str] = []
+        self.max_scores: List[float] = []
+        self.slot_index: Dict[str, int] = {}
+    
+    def add_slot(self, name: str, max_score: float = 100) -> int:
+        """Add an assignment slot (or return the existing one's index)"""
+        index = self.slot_index.get(name)
+        if index is None:
+            index = self.slot_index[name] = len(self.slot_names)
+            self.slot_names.append(name)
+            self.max_scores.append(max_score)
+        elif self.max_scores[index] != max_score:
+            raise ValueError(f"{self.name}/{name} is worth {self.max_scores[index]:g} points, not {max_score:g}")
+        return index
+
+def _number(x: float):
+    """Scores are stored as doubles; show whole numbers without the trailing .0"""
+    return int(x) if x.is_integer() else x
+
+class ScoredCategory:
+    """A student's scores in one schema category.
+
+    Behaves like GradeCategory (name, weight, assignments, add_assignment,
+    get_category_average) but keeps only an array of scores; NaN marks an
+    assignment that has not been graded yet."""
+    __slots__ = ('schema', 'scores', '_on_change')
+    
+    def __init__(self, schema: CategorySchema, scores=()):
+        self.schema = schema
+        self.scores = array('d', scores)
+        self._on_change = None
+    
+    @property
+    def name(self) -> str:
+        return self.schema.name
+    
+    @property
+    def weight(self) -> float:
+        return self.schema.weight
+    
+    @property
+    def assignments(self) -> List[dict]:
+        """Graded assignments in the same dict form GradeCategory uses"""
+        return [{'name': name, 'score': _number(score), 'max_score': max_score,
+                 'percentage': (score / max_score) * 100}
+                for name, max_score, score in zip(self.schema.slot_names, self.schema.max_scores, self.scores)
+                if not math.isnan(score)]
+    
+    def add_assignment(self, name: str, score: float, max_score: float = 100):
+        """Record a score, adding the slot to the course schema if it is new"""
+        index = self.schema.add_slot(name, max_score)
+        if len(self.scores) <= index:
+            self.scores.extend([math.nan] * (index + 1 - len(self.scores)))
+        old = self.scores[index]
+        self.scores[index] = score
+        if self._on_change:
+            self._on_change(self, name, None if math.isnan(old) else old, score)
+    
+    def get_category_average(self) -> float:
+        """Calculate average for this category"""
+        total, count = 0.0, 0
+        for max_score, score in zip(self.schema.max_scores, self.scores):
+            if not math.isnan(score):
+                total += (score / max_score) * 100
+                count += 1
+        return total / count if count else 0.0
+
 class Student:
     """Represents a student with their grades"""
     def __init__(self, name: str, student_id: str):
         self.name = name
         self.student_id = student_id
-        self.categories: Dict[str, GradeCategory] = {}
+        self.categories: Dict[str, Union[GradeCategory, ScoredCategory]] = {}
+        self._on_change = None  # set by the GradeCalculator the student belongs to
     
-    def add_category(self, category: GradeCategory):
+    def add_category(self, category: Union[GradeCategory, ScoredCategory]):
         """Add a grading category"""
         self.categories[category.name] = category
+        category._on_change = self._on_change
+        if self._on_change:
+            self._on_change(category)
     
     def calculate_final_grade(self) -> float:
         """Calculate weighted final grade"""
@@ -60,30 +171,654 @@ class Student:
     def get_letter_grade(self) -> str:
         """Convert numerical grade to letter grade"""
         grade = self.calculate_final_grade()
-        if grade >= 93: return 'A'
-        elif grade >= 90: return 'A-'
-        elif grade >= 87: return 'B+'
-        elif grade >= 83: return 'B'
-        elif grade >= 80: return 'B-'
-        elif grade >= 77: return 'C+'
-        elif grade >= 73: return 'C'
-        elif grade >= 70: return 'C-'
-        elif grade >= 67: return 'D+'
-        elif grade >= 63: return 'D'
-        elif grade >= 60: return 'D-'
-        else: return 'F'
+        for cutoff, letter in LETTER_CUTOFFS:
+            if grade >= cutoff:
+                return letter
+        return 'F'
+
+class GradeRankIndex:
+    """Order-statistics index of final grades.
+    
+    A Fenwick tree counts students per 0.01% grade bucket, so updating a
+    grade and asking for a rank, percentile or the k-th best student are all
+    O(log buckets) instead of sorting the class."""
+    RESOLUTION = 100  # buckets per percentage point
+    
+    def __init__(self, max_grade: float = 100):
+        self.size = int(max_grade * self.RESOLUTION) + 1
+        self.tree = [0] * (self.size + 1)
+        self.grades: Dict[str, float] = {}
+        self.members: Dict[int, set] = {}
+    
+    def __len__(self) -> int:
+        return len(self.grades)
+    
+    def _bucket(self, grade: float) -> int:
+        # floor, so a bucket never straddles a letter cutoff
+        return min(max(math.floor(grade * self.RESOLUTION), 0), self.size - 1)
+    
+    def _add(self, bucket: int, delta: int):
+        i = bucket + 1
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+    
+    def _count_upto(self, bucket: int) -> int:
+        """Number of students in buckets 0..bucket"""
+        total, i = 0, min(bucket + 1, self.size)
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+    
+    def _kth_bucket(self, k: int) -> int:
+        """Bucket holding the k-th lowest grade (1-based)"""
+        pos, step = 0, 1 << self.size.bit_length()
+        while step:
+            if pos + step <= self.size and self.tree[pos + step] < k:
+                pos += step
+                k -= self.tree[pos]
+            step >>= 1
+        return pos
+    
+    def update(self, student_id: str, grade: float):
+        """Insert a student or move them to a new grade"""
+        grade = float(grade)
+        old = self.grades.get(student_id)
+        if old is not None:
+            old_bucket = self._bucket(old)
+            if old_bucket == self._bucket(grade):
+                self.grades[student_id] = grade
+                return
+            self.remove(student_id)
+        bucket = self._bucket(grade)
+        self.grades[student_id] = grade
+        self.members.setdefault(bucket, set()).add(student_id)
+        self._add(bucket, 1)
+    
+    def remove(self, student_id: str):
+        grade = self.grades.pop(student_id, None)
+        if grade is None:
+            return
+        bucket = self._bucket(grade)
+        self.members[bucket].discard(student_id)
+        if not self.members[bucket]:
+            del self.members[bucket]
+        self._add(bucket, -1)
+    
+    def rebuild(self, grades: Dict[str, float]):
+        """Replace the whole index in O(n + buckets)"""
+        self.tree = [0] * (self.size + 1)
+        self.grades, self.members = {}, {}
+        for student_id, grade in grades.items():
+            grade = float(grade)  # plain floats out, even from a NumPy bulk rebuild
+            bucket = self._bucket(grade)
+            self.grades[student_id] = grade
+            self.members.setdefault(bucket, set()).add(student_id)
+            self.tree[bucket + 1] += 1
+        for i in range(1, self.size + 1):  # turn bucket counts into a Fenwick tree in place
+            parent = i + (i & -i)
+            if parent <= self.size:
+                self.tree[parent] += self.tree[i]
+    
+    def kth(self, k: int) -> float:
+        """Exact k-th lowest final grade (1-based)"""
+        bucket = self._kth_bucket(k)
+        within = sorted(self.grades[student_id] for student_id in self.members[bucket])
+        return within[k - self._count_upto(bucket - 1) - 1]
+    
+    def median(self) -> float:
+        n = len(self.grades)
+        return (self.kth((n + 1) // 2) + self.kth(n // 2 + 1)) / 2
+    
+    def count_below(self, grade: float) -> int:
+        """Students whose final grade is below grade (to bucket resolution)"""
+        return self._count_upto(self._bucket(grade) - 1)
+    
+    def rank(self, student_id: str) -> int:
+        """1 = best in class; tied students share a rank"""
+        return len(self.grades) - self._count_upto(self._bucket(self.grades[student_id])) + 1
+    
+    def percentile(self, student_id: str) -> float:
+        """Percentage of the class with a lower final grade"""
+        return self.count_below(self.grades[student_id]) / len(self.grades) * 100
+    
+    def _walk(self, k: int, descending: bool) -> List[Tuple[str, float]]:
+        result, n = [], len(self.grades)
+        position = n if descending else 1
+        while len(result) < min(k, n):
+            bucket = self._kth_bucket(position)
+            ids = sorted(self.members[bucket], key=self.grades.get, reverse=descending)
+            result.extend((student_id, self.grades[student_id]) for student_id in ids)
+            position = (position - len(ids)) if descending else (position + len(ids))
+        return result[:k]
+    
+    def top_k(self, k: int) -> List[Tuple[str, float]]:
+        """Highest k (student_id, grade) pairs, best first"""
+        return self._walk(k, descending=True)
+    
+    def bottom_k(self, k: int) -> List[Tuple[str, float]]:
+        """Lowest k (student_id, grade) pairs, lowest first"""
+        return self._walk(k, descending=False)
+
+class ClassAggregates:
+    """Class-wide statistics kept current from change events.
+    
+    Each change re-scores only the student concerned and adjusts running
+    sums, so per-category means, mean/std of final grades, the letter
+    histogram and the pass count are all O(1) reads. Sums are of (grade - 50)
+    to keep the variance numerically stable."""
+    SHIFT = 50.0
+    
+    def __init__(self):
+        self.count = 0
+        self.grade_sum = 0.0
+        self.grade_sq_sum = 0.0
+        self.passing = 0
+        self.letters: Dict[str, int] = dict.fromkeys(GRADE_LABELS, 0)
+        self.category_sums: Dict[str, float] = {}
+        self.category_counts: Dict[str, int] = {}
+        self._grades: Dict[str, float] = {}
+        self._averages: Dict[str, Dict[str, float]] = {}
+    
+    @staticmethod
+    def _letter(grade: float) -> str:
+        for cutoff, letter in LETTER_CUTOFFS:
+            if grade >= cutoff:
+                return letter
+        return 'F'
+    
+    def _apply(self, grade: float, averages: Dict[str, float], sign: int):
+        shifted = grade - self.SHIFT
+        self.count += sign
+        self.grade_sum += sign * shifted
+        self.grade_sq_sum += sign * shifted * shifted
+        self.passing += sign * (grade >= 70)
+        self.letters[self._letter(grade)] += sign
+        for name, average in averages.items():
+            self.category_sums[name] = self.category_sums.get(name, 0.0) + sign * average
+            self.category_counts[name] = self.category_counts.get(name, 0) + sign
+    
+    def update(self, student_id: str, grade: float, averages: Dict[str, float]):
+        """Replace one student's contribution"""
+        if student_id in self._grades:
+            self._apply(self._grades[student_id], self._averages[student_id], -1)
+        self._grades[student_id] = grade
+        self._averages[student_id] = averages
+        self._apply(grade, averages, +1)
+    
+    def rebuild(self, student_ids: List[str], grades: np.ndarray, averages: Dict[str, np.ndarray]):
+        """Recompute from scratch (after a weight change), from bulk arrays"""
+        self.__init__()
+        for row, student_id in enumerate(student_ids):
+            self._grades[student_id] = float(grades[row])
+            self._averages[student_id] = {name: float(values[row]) for name, values in averages.items()
+                                          if not np.isnan(values[row])}
+        shifted = np.asarray(grades, dtype=float) - self.SHIFT
+        self.count = len(student_ids)
+        self.grade_sum = float(shifted.sum())
+        self.grade_sq_sum = float((shifted * shifted).sum())
+        self.passing = int((np.asarray(grades) >= 70).sum())
+        for grade in self._grades.values():
+            self.letters[self._letter(grade)] += 1
+        for name, values in averages.items():
+            present = ~np.isnan(values)
+            self.category_sums[name] = float(values[present].sum())
+            self.category_counts[name] = int(present.sum())
+    
+    def mean(self) -> float:
+        return self.grade_sum / self.count + self.SHIFT if self.count else 0.0
+    
+    def std(self) -> float:
+        if not self.count:
+            return 0.0
+        mean = self.grade_sum / self.count
+        return math.sqrt(max(self.grade_sq_sum / self.count - mean * mean, 0.0))
+    
+    def passing_rate(self) -> float:
+        return self.passing / self.count * 100 if self.count else 0.0
+    
+    def category_means(self) -> Dict[str, float]:
+        return {name: total / self.category_counts[name]
+                for name, total in self.category_sums.items() if self.category_counts[name]}
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer.
+    
+    Waiting writers block new readers, and readers that were already waiting
+    get the next turn when a writer finishes, so neither side starves.
+    
+    Re-entrant per thread: a thread that holds the write lock may read or
+    write again, and a reader may nest reads, so locked methods can call
+    each other freely."""
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+        self._readers_waiting = 0
+        self._reader_turn = False
+        self._local = threading.local()
+    
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        depth = getattr(self._local, 'reads', 0)
+        if self._writer == me or depth:
+            self._local.reads = depth + 1
+            try:
+                yield
+            finally:
+                self._local.reads = depth
+            return
+        with self._cond:
+            self._readers_waiting += 1
+            while self._writer is not None or (self._writers_waiting and not self._reader_turn):
+                self._cond.wait()
+            self._readers_waiting -= 1
+            if not self._readers_waiting:
+                self._reader_turn = False
+            self._readers += 1
+        self._local.reads = 1
+        try:
+            yield
+        finally:
+            self._local.reads = 0
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+    
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer != me:
+                if getattr(self._local, 'reads', 0):
+                    raise RuntimeError("cannot upgrade a read lock to a write lock")
+                self._writers_waiting += 1
+                while self._writer is not None or self._readers or self._reader_turn:
+                    self._cond.wait()
+                self._writers_waiting -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._reader_turn = self._readers_waiting > 0
+                    self._cond.notify_all()
+
+def _reads(method):
+    """Run a GradeCalculator method under its read lock"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.lock.read():
+            return method(self, *args, **kwargs)
+    return locked
+
+def _writes(method):
+    """Run a GradeCalculator method under its write lock (refused on snapshots)"""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        if self.read_only:
+            raise RuntimeError(f"{self.course_name}: snapshots are read-only")
+        with self.lock.write():
+            self.version += 1
+            return method(self, *args, **kwargs)
+    return locked
 
 class GradeCalculator:
-    """Main grade calculator with reporting features"""
+    """Main grade calculator with reporting features.
+    
+    Thread-safe when shared: reports, charts and statistics take a read lock
+    and run in parallel, while add_student/add_assignment/define_category take
+    the write lock. Concurrent writers must go through
+    GradeCalculator.add_assignment rather than a category's own
+    add_assignment. snapshot() returns a frozen copy for long-running readers;
+    the matplotlib charts and PDF export draw from it and hold no lock."""
     def __init__(self, course_name: str):
         self.course_name = course_name
         self.students: Dict[str, Student] = {}
+        self.schema: Dict[str, CategorySchema] = {}
+        self.rank_index = GradeRankIndex()
+        self.aggregates = ClassAggregates()
+        self.listeners = []
+        self.lock = ReadWriteLock()
+        self.version = 0  # bumped on every change; snapshots are reused while it is unchanged
+        self.read_only = False
+        self._snapshot = None
+        self._snapshot_lock = threading.Lock()
         self.data_file = f"{course_name.replace(' ', '_')}_grades.json"
     
+    @_writes
+    def define_category(self, name: str, weight: float,
+                        assignments: List[Union[str, Tuple[str, float]]] = ()) -> CategorySchema:
+        """Define a category once for the whole course.
+        
+        assignments are slot names or (name, max_score) pairs (default 100 points).
+        Students added afterwards store only their scores for these slots.
+        Students still holding old per-student categories are moved onto the
+        schema first (as build_schema does), so the weight applies to them too;
+        ValueError if their own weights disagree with the course's."""
+        legacy = [student for student in self.students.values()
+                  if not all(isinstance(c, ScoredCategory) for c in student.categories.values())]
+        for student in legacy:
+            self._adopt(student)
+            self._watch(student, reindex=False)
+        category = self.schema.get(name)
+        if category is None:
+            category = self.schema[name] = CategorySchema(name, weight)
+            for student in self.students.values():
+                student.add_category(ScoredCategory(category))
+        if category.weight != weight:
+            category.weight = weight
+            self._reindex()
+        elif legacy:
+            self._reindex()
+        for slot in assignments:
+            slot_name, max_score = (slot, 100) if isinstance(slot, str) else slot
+            category.add_slot(slot_name, max_score)
+        return category
+    
+    @_writes
+    def set_category_weight(self, name: str, weight: float):
+        """Change a category's weight for every student at once"""
+        self.schema[name].weight = weight
+        self._reindex()
+    
+    @_writes
+    def build_schema(self):
+        """Derive the course schema from the students' own categories and
+        convert every student to score-only storage (e.g. after loading an
+        old per-student JSON file)"""
+        for student in self.students.values():
+            self._adopt(student)
+            self._watch(student, reindex=False)
+        self._reindex()
+    
+    def _adopt(self, student: Student):
+        """Move a student's categories onto the course schema"""
+        categories = {}
+        for cat_name, category in student.categories.items():
+            schema = self.schema.get(cat_name)
+            if schema is None:
+                schema = self.schema[cat_name] = CategorySchema(cat_name, category.weight)
+            elif schema.weight != category.weight:
+                raise ValueError(f"{student.student_id}: {cat_name} weight {category.weight} "
+                                 f"differs from the course weight {schema.weight}")
+            if isinstance(category, ScoredCategory) and category.schema is schema:
+                categories[cat_name] = category
+                continue
+            scored = ScoredCategory(schema)
+            for assignment in category.assignments:
+                scored.add_assignment(assignment['name'], assignment['score'], assignment['max_score'])
+            categories[cat_name] = scored
+        for cat_name, schema in self.schema.items():
+            if cat_name not in categories:
+                categories[cat_name] = ScoredCategory(schema)
+        student.categories = categories
+    
+    @_writes
     def add_student(self, student: Student):
         """Add a student to the course"""
+        if self.schema:
+            self._adopt(student)
         self.students[student.student_id] = student
+        self._watch(student)
+    
+    def _watch(self, student: Student, reindex: bool = True):
+        """Route the student's change events into the calculator"""
+        def changed(category, assignment=None, old=None, new=None):
+            event = 'score_changed' if assignment is not None else 'category_added'
+            self._student_changed(student, event, category=category.name,
+                                  assignment=assignment, old_score=old, new_score=new)
+        student._on_change = changed
+        for category in student.categories.values():
+            category._on_change = changed
+        if reindex:
+            self._student_changed(student, 'student_added')
+    
+    def _student_changed(self, student: Student, event: str, **details):
+        """Re-score one student, update the rank index and aggregates, and notify listeners"""
+        self.version += 1
+        grade = student.calculate_final_grade()
+        self.rank_index.update(student.student_id, grade)
+        self.aggregates.update(student.student_id, grade,
+                               {name: cat.get_category_average() for name, cat in student.categories.items()})
+        self._emit({'type': event, 'student_id': student.student_id, 'final_grade': grade, **details})
+    
+    def _emit(self, event: dict):
+        for listener in list(self.listeners):
+            listener(event)
+    
+    def subscribe(self, listener):
+        """Call listener(event) after every change.
+        
+        event is a dict with 'type' ('student_added', 'score_changed',
+        'category_added' or 'weights_changed') and, for per-student events,
+        'student_id' and the new 'final_grade'; score changes also carry
+        'category', 'assignment', 'old_score' and 'new_score'. Listeners run
+        under the write lock, so they should be quick."""
+        self.listeners.append(listener)
+        return listener
+    
+    def unsubscribe(self, listener):
+        self.listeners.remove(listener)
+    
+    @_writes
+    def add_assignment(self, student_id: str, category: str, name: str, score: float, max_score: float = 100):
+        """Record a score (thread-safe counterpart of category.add_assignment)"""
+        self.students[student_id].categories[category].add_assignment(name, score, max_score)
+    
+    def snapshot(self) -> "GradeCalculator":
+        """A consistent, read-only copy of the course as of now.
+        
+        Readers that run for a long time (PDF export, bulk charts) can work on
+        the snapshot without holding the lock. The copy is cached until the
+        next change, so many readers share one snapshot."""
+        with self.lock.read():
+            with self._snapshot_lock:
+                if self._snapshot is not None and self._snapshot.version == self.version:
+                    return self._snapshot
+            snap = GradeCalculator(self.course_name)
+            snap.data_file = self.data_file
+            for name, cat in self.schema.items():
+                copy = snap.schema[name] = CategorySchema(name, cat.weight)
+                copy.slot_names, copy.max_scores = list(cat.slot_names), list(cat.max_scores)
+                copy.slot_index = dict(cat.slot_index)
+            for student_id, student in self.students.items():
+                clone = Student(student.name, student_id)
+                for cat_name, category in student.categories.items():
+                    if isinstance(category, ScoredCategory):
+                        clone.categories[cat_name] = ScoredCategory(snap.schema[cat_name], category.scores)
+                    else:
+                        copy = clone.categories[cat_name] = GradeCategory(cat_name, category.weight)
+                        copy.assignments = [dict(a) for a in category.assignments]
+                snap.students[student_id] = clone
+            snap._reindex()
+            snap.version = self.version
+            snap.read_only = True
+            with self._snapshot_lock:
+                self._snapshot = snap
+            return snap
+    
+    def _reindex(self):
+        """Rebuild the rank index and aggregates in bulk (after a weight change)"""
+        grades = self.final_grades()
+        self.rank_index.rebuild(dict(zip(self.students, grades)))
+        names = {name for student in self.students.values() for name in student.categories}
+        averages = {}
+        for name in names:
+            if name in self.schema and all(isinstance(s.categories.get(name), ScoredCategory)
+                                           for s in self.students.values()):
+                averages[name] = self._category_averages(self.score_matrix(name))
+            else:
+                averages[name] = np.array([s.categories[name].get_category_average() if name in s.categories
+                                           else np.nan for s in self.students.values()])
+        self.aggregates.rebuild(list(self.students), grades, averages)
+        self._emit({'type': 'weights_changed'})
+    
+    @_reads
+    def class_rank(self, student_id: str) -> int:
+        """Position in the class by final grade, 1 = highest"""
+        return self.rank_index.rank(student_id)
+    
+    @_reads
+    def class_percentile(self, student_id: str) -> float:
+        """Percentage of classmates with a lower final grade"""
+        return self.rank_index.percentile(student_id)
+    
+    @_reads
+    def top_students(self, k: int = 10) -> List[Tuple[str, float]]:
+        """(student_id, final grade) of the k best students"""
+        return self.rank_index.top_k(k)
     
+    @_reads
+    def bottom_students(self, k: int = 10) -> List[Tuple[str, float]]:
+        """(student_id, final grade) of the k lowest students"""
+        return self.rank_index.bottom_k(k)
+    
+    @_reads
+    def letter_counts(self) -> Dict[str, int]:
+        """Students per letter grade (maintained incrementally)"""
+        return dict(self.aggregates.letters)
+    
+    @_reads
+    def class_statistics(self) -> dict:
+        """Current class statistics without a pass over the class: O(1) from
+        the running aggregates, plus O(log n) order statistics"""
+        aggregates, ranks = self.aggregates, self.rank_index
+        if not aggregates.count:
+            return {'count': 0}
+        return {
+            'count': aggregates.count,
+            'mean': aggregates.mean(),
+            'median': ranks.median(),
+            'std': aggregates.std(),
+            'max': ranks.kth(len(ranks)),
+            'min': ranks.kth(1),
+            'passing_rate': aggregates.passing_rate(),
+            'letter_counts': dict(aggregates.letters),
+            'category_means': aggregates.category_means(),
+        }
+    
+    @_reads
+    def score_matrix(self, category: str) -> np.ndarray:
+        """Percentages for one schema category: a row per student, a column
+        per assignment slot, NaN where not graded"""
+        schema = self.schema[category]
+        matrix = np.full((len(self.students), len(schema.slot_names)), np.nan)
+        for row, student in enumerate(self.students.values()):
+            scores = student.categories[category].scores
+            if scores:
+                matrix[row, :len(scores)] = np.frombuffer(scores, dtype=np.float64)
+        return matrix / np.array(schema.max_scores) * 100
+    
+    @_reads
+    def final_grades(self) -> np.ndarray:
+        """Final grade of every student (in self.students order), computed in
+        bulk from the schema; matches Student.calculate_final_grade"""
+        if not self.schema or not all(isinstance(c, ScoredCategory) for s in self.students.values()
+                                      for c in s.categories.values()):
+            return np.array([s.calculate_final_grade() for s in self.students.values()], dtype=float)
+        total_weight = sum(cat.weight for cat in self.schema.values())
+        grades = np.zeros(len(self.students))
+        if total_weight == 0:
+            return grades
+        for name, cat in self.schema.items():
+            grades += self._category_averages(self.score_matrix(name)) * cat.weight
+        return grades / total_weight
+    
+    @staticmethod
+    def _category_averages(matrix: np.ndarray) -> np.ndarray:
+        """Row means over graded cells; 0 for a student with nothing graded"""
+        graded = (~np.isnan(matrix)).sum(axis=1)
+        return np.divide(np.nansum(matrix, axis=1), graded, out=np.zeros(len(matrix)), where=graded > 0)
+    
+    @_reads
+    def score_needed(self, category: str, assignment: str = None,
+                     letters: List[str] = None) -> Tuple[List[str], List[str], np.ndarray]:
+        """What-if solver: the minimum score every student needs to reach each letter.
+        
+        With an assignment, the answer is in points on that assignment (any
+        current score on it is replaced). Without one, it is the percentage
+        needed on each of the category's still-ungraded assignments. Returns
+        (student_ids, letters, needed) where needed[i, j] is for student i
+        and letter j. A value <= 0 means the letter is already secured, a
+        value above the maximum means it is out of reach, and NaN means there
+        is nothing pending in the category.
+        
+        The weighted model of calculate_final_grade is linear in the pending
+        score, so the whole class is solved in one pass, with no trial scores."""
+        if not self.schema or category not in self.schema:
+            raise ValueError(f"{category!r} is not a schema category (define_category/build_schema first)")
+        cutoffs = [(cutoff, letter) for cutoff, letter in LETTER_CUTOFFS if letters is None or letter in letters]
+        targets = np.array([cutoff for cutoff, _ in cutoffs], dtype=float)
+        schema = self.schema[category]
+        total_weight = sum(cat.weight for cat in self.schema.values())
+        
+        # Weighted contribution of every other category stays fixed
+        fixed = np.zeros(len(self.students))
+        for name, cat in self.schema.items():
+            if name != category:
+                fixed += self._category_averages(self.score_matrix(name)) * cat.weight
+        
+        matrix = self.score_matrix(category)
+        if assignment is not None:
+            slot = schema.slot_index[assignment]
+            matrix[:, slot] = np.nan
+            pending = np.ones(len(matrix))
+            scale = schema.max_scores[slot] / 100  # percentage -> points
+        else:
+            pending = np.isnan(matrix).sum(axis=1).astype(float)
+            scale = 1.0
+        graded_sum = np.nansum(matrix, axis=1)[:, None]
+        graded_count = (~np.isnan(matrix)).sum(axis=1)[:, None]
+        
+        # final >= target  <=>  category average >= needed_average, and the
+        # average is (graded_sum + pending * p) / (graded_count + pending)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            needed_average = (targets[None, :] * total_weight - fixed[:, None]) / schema.weight
+            needed = (needed_average * (graded_count + pending[:, None]) - graded_sum) / pending[:, None]
+        needed[pending == 0] = np.nan
+        return list(self.students), [letter for _, letter in cutoffs], needed * scale
+    
+    @_reads
+    def generate_what_if_report(self, category: str, assignment: str = None,
+                                letters: List[str] = None) -> str:
+        """Table of the score each student needs for each letter grade"""
+        student_ids, letters, needed = self.score_needed(category, assignment, letters)
+        target = f"{category} / {assignment}" if assignment else f"each remaining {category} assignment"
+        maximum = self.schema[category].max_scores[self.schema[category].slot_index[assignment]] if assignment else 100
+        unit = "pts" if assignment else "%"
+        
+        report = f"\n{'='*60}\n"
+        report += f"WHAT-IF: score needed on {target} ({unit}) - {self.course_name}\n"
+        report += f"{'='*60}\n"
+        report += f"{'Student':<24}" + "".join(f"{letter:>8}" for letter in letters) + "\n"
+        for row, student_id in enumerate(student_ids):
+            cells = []
+            for value in needed[row]:
+                if np.isnan(value):
+                    cells.append("-")
+                elif value <= 0:
+                    cells.append("done")
+                elif value > maximum:
+                    cells.append("n/a")
+                else:
+                    cells.append(f"{math.ceil(value * 100) / 100:.2f}")
+            name = f"{self.students[student_id].name} ({student_id})"
+            report += f"{name[:23]:<24}" + "".join(f"{cell:>8}" for cell in cells) + "\n"
+        report += f"{'='*60}\n"
+        report += "done = already secured, n/a = out of reach, - = nothing pending\n"
+        return report
+    
+    @_reads
     def generate_student_report(self, student_id: str) -> str:
         """Generate text report for a student"""
         if student_id not in self.students:
@@ -118,12 +853,18 @@ class GradeCalculator:
         return report
     
     def plot_student_performance(self, student_id: str, save_path: str = None):
-        """Create visual charts for student performance"""
+        """Create visual charts for student performance.
+        
+        Drawn from snapshot(), so no lock is held while plt.show() waits for
+        the window to close."""
+        if not self.read_only:
+            return self.snapshot().plot_student_performance(student_id, save_path)
         if student_id not in self.students:
             print("Student not found")
             return
         
         student = self.students[student_id]
+        plt = _pyplot()
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle(f'Grade Report: {student.name} - {self.course_name}', 
                      fontsize=16, fontweight='bold')
@@ -187,25 +928,26 @@ class GradeCalculator:
             ax3.legend()
             ax3.grid(True, alpha=0.3)
         
-        # 4. Grade Distribution (if comparing to class)
+        # 4. Class Grade Distribution with the student's real position
         letter_grade = student.get_letter_grade()
-        grade_labels = ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']
+        grade_labels = GRADE_LABELS
         student_index = grade_labels.index(letter_grade)
         
-        # Create a mock distribution highlighting student's position
-        distribution = [0] * len(grade_labels)
-        distribution[student_index] = 1
+        distribution = list(self.letter_counts().values())
+        rank = self.class_rank(student_id)
+        percentile = self.class_percentile(student_id)
         
         colors_dist = ['lightgray'] * len(grade_labels)
         colors_dist[student_index] = 'gold'
         
         ax4.bar(grade_labels, distribution, color=colors_dist, edgecolor='black')
-        ax4.set_ylabel('Student Position', fontsize=12)
-        ax4.set_title(f'Current Letter Grade: {letter_grade}', 
+        ax4.set_ylabel('Number of Students', fontsize=12)
+        ax4.set_title(f'Current Letter Grade: {letter_grade}\n'
+                      f'Rank {rank} of {len(self.students)} (above {percentile:.0f}% of class)',
                      fontsize=14, fontweight='bold')
-        ax4.set_ylim(0, 1.5)
-        ax4.text(student_index, 1.1, 'YOU ARE HERE', ha='center', 
-                fontsize=12, fontweight='bold', color='darkred')
+        ax4.set_ylim(0, max(distribution) * 1.3)
+        ax4.text(student_index, distribution[student_index] + max(distribution) * 0.08, 'YOU ARE HERE',
+                ha='center', fontsize=12, fontweight='bold', color='darkred')
         
         plt.tight_layout()
         
@@ -216,20 +958,24 @@ class GradeCalculator:
             plt.show()
     
     def generate_class_report(self):
-        """Generate class-wide statistics"""
+        """Generate class-wide statistics (drawn from snapshot(), like plot_student_performance)"""
+        if not self.read_only:
+            return self.snapshot().generate_class_report()
         if not self.students:
             print("No students in the course")
             return
         
-        grades = [s.calculate_final_grade() for s in self.students.values()]
+        grades = self.final_grades()
+        stats = self.class_statistics()
         
+        plt = _pyplot()
         fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
         fig.suptitle(f'Class Report: {self.course_name}', fontsize=16, fontweight='bold')
         
         # 1. Grade Distribution Histogram
         ax1.hist(grades, bins=10, color='steelblue', edgecolor='black', alpha=0.7)
-        ax1.axvline(np.mean(grades), color='red', linestyle='--', 
-                   label=f'Mean: {np.mean(grades):.2f}%')
+        ax1.axvline(stats['mean'], color='red', linestyle='--', 
+                   label=f"Mean: {stats['mean']:.2f}%")
         ax1.set_xlabel('Grade (%)', fontsize=12)
         ax1.set_ylabel('Number of Students', fontsize=12)
         ax1.set_title('Grade Distribution', fontsize=14, fontweight='bold')
@@ -237,10 +983,7 @@ class GradeCalculator:
         ax1.grid(axis='y', alpha=0.3)
         
         # 2. Letter Grade Distribution
-        letter_grades = [s.get_letter_grade() for s in self.students.values()]
-        grade_counts = {}
-        for lg in ['A', 'A-', 'B+', 'B', 'B-', 'C+', 'C', 'C-', 'D+', 'D', 'D-', 'F']:
-            grade_counts[lg] = letter_grades.count(lg)
+        grade_counts = self.letter_counts()
         
         ax2.bar(grade_counts.keys(), grade_counts.values(), 
                color='lightcoral', edgecolor='black')
@@ -260,16 +1003,16 @@ class GradeCalculator:
         CLASS STATISTICS
         ═══════════════════════════════
         
-        Total Students: {len(self.students)}
+        Total Students: {stats['count']}
         
-        Mean Grade: {np.mean(grades):.2f}%
-        Median Grade: {np.median(grades):.2f}%
-        Std Deviation: {np.std(grades):.2f}%
+        Mean Grade: {stats['mean']:.2f}%
+        Median Grade: {stats['median']:.2f}%
+        Std Deviation: {stats['std']:.2f}%
         
-        Highest Grade: {np.max(grades):.2f}%
-        Lowest Grade: {np.min(grades):.2f}%
+        Highest Grade: {stats['max']:.2f}%
+        Lowest Grade: {stats['min']:.2f}%
         
-        Passing Rate: {sum(1 for g in grades if g >= 70)/len(grades)*100:.1f}%
+        Passing Rate: {stats['passing_rate']:.1f}%
         """
         ax4.text(0.1, 0.5, stats_text, fontsize=12, family='monospace',
                 verticalalignment='center')
@@ -278,7 +1021,9 @@ class GradeCalculator:
         plt.show()
     
     def export_to_pdf(self, student_id: str, filename: str = None):
-        """Export student report to PDF"""
+        """Export student report to PDF (from snapshot(), like plot_student_performance)"""
+        if not self.read_only:
+            return self.snapshot().export_to_pdf(student_id, filename)
         if student_id not in self.students:
             print("Student not found")
             return
@@ -286,6 +1031,8 @@ class GradeCalculator:
         if filename is None:
             filename = f"{self.students[student_id].name.replace(' ', '_')}_report.pdf"
         
+        from matplotlib.backends.backend_pdf import PdfPages
+        plt = _pyplot()
         with PdfPages(filename) as pdf:
             # Create the plot
             self.plot_student_performance(student_id, save_path=None)
@@ -302,13 +1049,47 @@ class GradeCalculator:
         
         print(f"PDF report saved to {filename}")
     
-    def save_data(self):
-        """Save all data to JSON file"""
+    @_reads
+    def student_report_svg(self, student_id: str) -> str:
+        """plot_student_performance's four panels as an SVG string, without matplotlib"""
+        if student_id not in self.students:
+            raise KeyError(f"student {student_id!r} not found")
+        return SvgReport.student_report(self, student_id)
+    
+    @_reads
+    def class_report_svg(self) -> str:
+        """generate_class_report's four panels as an SVG string, without matplotlib"""
+        if not self.students:
+            raise ValueError("no students in the course")
+        return SvgReport.class_report(self)
+    
+    @_reads
+    def to_dict(self) -> dict:
+        """The course as save_data() JSON: the schema format when there is a
+        course schema, otherwise per-student categories"""
+        if self.schema:
+            # Schema format: categories, weights and slots once; students carry only scores
+            return {
+                'course_name': self.course_name,
+                'schema': {
+                    name: {'weight': cat.weight,
+                           'assignments': [[slot, max_score] for slot, max_score in zip(cat.slot_names, cat.max_scores)]}
+                    for name, cat in self.schema.items()
+                },
+                'students': {
+                    student_id: {
+                        'name': student.name,
+                        'scores': {name: [None if math.isnan(x) else _number(x) for x in category.scores]
+                                   for name, category in student.categories.items()}
+                    }
+                    for student_id, student in self.students.items()
+                }
+            }
+        
         data = {
             'course_name': self.course_name,
             'students': {}
         }
-        
         for student_id, student in self.students.items():
             student_data = {
                 'name': student.name,
@@ -322,20 +1103,56 @@ class GradeCalculator:
                 }
             
             data['students'][student_id] = student_data
-        
-        with open(self.data_file, 'w') as f:
-            json.dump(data, f, indent=2)
-        
-        print(f"Data saved to {self.data_file}")
+        return data
+    
+    def save_data(self, path: str = None):
+        """Save all data to the JSON file, or to a SQLite database when path
+        (default self.data_file) ends in .db/.sqlite/.sqlite3"""
+        path = path or self.data_file
+        data = self.to_dict()
+        if path.endswith(DB_SUFFIXES):
+            GradeStore(path).save_course(data)
+        else:
+            with open(path, 'w') as f:
+                if 'schema' in data:
+                    json.dump(data, f, separators=(',', ':'))
+                else:
+                    json.dump(data, f, indent=2)
+        print(f"Data saved to {path}")
     
-    def load_data(self):
-        """Load data from JSON file"""
-        if not os.path.exists(self.data_file):
+    def load_data(self, path: str = None):
+        """Load data from the JSON file, or from this course's rows in a
+        SQLite database when path ends in .db/.sqlite/.sqlite3"""
+        path = path or self.data_file
+        if not os.path.exists(path):
             print("No saved data found")
             return
         
-        with open(self.data_file, 'r') as f:
-            data = json.load(f)
+        if path.endswith(DB_SUFFIXES):
+            data = GradeStore(path).load_course(self.course_name)
+            if data is None:
+                print(f"No saved data for {self.course_name} in {path}")
+                return
+        else:
+            with open(path, 'r') as f:
+                data = json.load(f)
+        
+        self.load_dict(data)
+        print(f"Data loaded from {path}")
+    
+    @_writes
+    def load_dict(self, data: dict):
+        """Add the students from parsed save_data() JSON (either format)"""
+        if 'schema' in data:
+            for cat_name, cat_data in data['schema'].items():
+                self.define_category(cat_name, cat_data['weight'], [tuple(slot) for slot in cat_data['assignments']])
+            for student_id, student_data in data['students'].items():
+                student = Student(student_data['name'], student_id)
+                for cat_name, schema in self.schema.items():
+                    scores = student_data['scores'].get(cat_name, [])
+                    student.add_category(ScoredCategory(schema, [math.nan if x is None else x for x in scores]))
+                self.add_student(student)
+            return
         
         for student_id, student_data in data['students'].items():
             student = Student(student_data['name'], student_id)
@@ -351,8 +1168,888 @@ class GradeCalculator:
                 student.add_category(category)
             
             self.add_student(student)
+
+# Anchor colors of matplotlib's viridis map, for plt.cm.viridis look-alike bars
+VIRIDIS = [(68, 1, 84), (71, 45, 123), (59, 82, 139), (44, 114, 142), (33, 145, 140),
+           (40, 174, 128), (94, 201, 98), (173, 220, 48), (253, 231, 37)]
+
+def _viridis(n: int) -> List[str]:
+    """n colors evenly spaced over viridis, like plt.cm.viridis(np.linspace(0, 1, n))"""
+    colors = []
+    for i in range(n):
+        t = i / (n - 1) * (len(VIRIDIS) - 1) if n > 1 else 0
+        j = min(int(t), len(VIRIDIS) - 2)
+        f = t - j
+        colors.append('#%02x%02x%02x' % tuple(round(a + (b - a) * f) for a, b in zip(VIRIDIS[j], VIRIDIS[j + 1])))
+    return colors
+
+def _nice_ticks(low: float, high: float, target: int = 5) -> List[float]:
+    """Round-numbered axis ticks covering low..high"""
+    if high <= low:
+        high = low + 1
+    raw = (high - low) / target
+    magnitude = 10 ** math.floor(math.log10(raw))
+    step = next(m * magnitude for m in (1, 2, 2.5, 5, 10) if m * magnitude >= raw)
+    first = math.ceil(low / step - 1e-9) * step
+    return [round(first + i * step, 10) for i in range(int((high - first) / step + 1e-9) + 1)]
+
+class _SvgAxes:
+    """One chart panel: maps data coordinates into its plot area"""
+    def __init__(self, x: float, y: float, w: float, h: float,
+                 xlim: Tuple[float, float], ylim: Tuple[float, float]):
+        self.x, self.y, self.w, self.h = x, y, w, h
+        self.xlim, self.ylim = xlim, ylim
+    
+    def px(self, value: float) -> float:
+        return self.x + (value - self.xlim[0]) / (self.xlim[1] - self.xlim[0]) * self.w
+    
+    def py(self, value: float) -> float:
+        return self.y + self.h - (value - self.ylim[0]) / (self.ylim[1] - self.ylim[0]) * self.h
+
+class SvgReport:
+    """Writes the four-panel student and class reports directly as SVG text.
+    
+    Same panels as plot_student_performance and generate_class_report, built
+    with plain string formatting instead of matplotlib, so thousands of charts
+    render per second. The matplotlib versions remain for PDF export."""
+    WIDTH, HEIGHT = 1000, 820
+    CELLS = [(0, 45), (500, 45), (0, 432), (500, 432)]  # top-left corner of each panel
+    CELL_W, CELL_H = 500, 388
+    LEFT, RIGHT, TOP, BOTTOM = 62, 18, 48, 62
+    
+    def __init__(self, title: str):
+        self.parts = [
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.WIDTH}" height="{self.HEIGHT}" '
+            f'viewBox="0 0 {self.WIDTH} {self.HEIGHT}" font-family="DejaVu Sans, Arial, sans-serif">',
+            '<rect width="100%" height="100%" fill="white"/>',
+        ]
+        self.text(self.WIDTH / 2, 28, title, size=18, weight='bold')
+    
+    def render(self) -> str:
+        return ''.join(self.parts) + '</svg>'
+    
+    def text(self, x: float, y: float, content: str, size: int = 12, anchor: str = 'middle',
+             weight: str = None, color: str = None, rotate: float = None, family: str = None):
+        attrs = f' font-size="{size}" text-anchor="{anchor}"'
+        if weight:
+            attrs += f' font-weight="{weight}"'
+        if color:
+            attrs += f' fill="{color}"'
+        if family:
+            attrs += f' font-family="{family}" xml:space="preserve"'
+        if rotate is not None:
+            attrs += f' transform="rotate({rotate} {x:.1f} {y:.1f})"'
+        self.parts.append(f'<text x="{x:.1f}" y="{y:.1f}"{attrs}>{escape(content)}</text>')
+    
+    def title(self, index: int, title: str):
+        """Panel title; a second line (after \\n) goes below the first"""
+        cx, cy = self.CELLS[index]
+        lines = title.split('\n')
+        for i, line in enumerate(lines):
+            self.text(cx + (self.LEFT + self.CELL_W - self.RIGHT) / 2, cy + 24 + 17 * (i - len(lines) + 1),
+                      line, size=14, weight='bold')
+    
+    def panel(self, index: int, title: str, xlim=(0, 1), ylim=(0, 100), ylabel: str = None,
+              xlabel: str = None, grid: str = 'y') -> _SvgAxes:
+        """Frame, title, y ticks and grid for panel index (0-3)"""
+        cx, cy = self.CELLS[index]
+        ax = _SvgAxes(cx + self.LEFT, cy + self.TOP, self.CELL_W - self.LEFT - self.RIGHT,
+                      self.CELL_H - self.TOP - self.BOTTOM, xlim, ylim)
+        self.title(index, title)
+        for tick in _nice_ticks(*ylim):
+            if tick > ylim[1] + 1e-9:
+                continue
+            y = ax.py(tick)
+            if grid:
+                self.parts.append(f'<line x1="{ax.x:.1f}" y1="{y:.1f}" x2="{ax.x + ax.w:.1f}" y2="{y:.1f}" '
+                                  f'stroke="#b0b0b0" stroke-opacity="0.3"/>')
+            self.text(ax.x - 5, y + 4, f'{tick:g}', size=10, anchor='end')
+        if ylabel:
+            self.text(cx + 16, ax.y + ax.h / 2, ylabel, size=12, rotate=-90)
+        if xlabel:
+            self.text(ax.x + ax.w / 2, ax.y + ax.h + 36, xlabel, size=12)
+        self.parts.append(f'<rect x="{ax.x:.1f}" y="{ax.y:.1f}" width="{ax.w:.1f}" height="{ax.h:.1f}" '
+                          f'fill="none" stroke="black"/>')
+        return ax
+    
+    def bars(self, ax: _SvgAxes, labels: List[str], values: List[float], colors: List[str],
+             value_format: str = None, opacity: float = 1.0):
+        """Categorical bar chart, bar i centred at x = i"""
+        ax.xlim = (-0.6, len(values) - 0.4)
+        width = ax.px(0.4) - ax.px(-0.4)
+        for i, (label, value, color) in enumerate(zip(labels, values, colors)):
+            top, bottom = ax.py(max(value, ax.ylim[0])), ax.py(ax.ylim[0])
+            self.parts.append(f'<rect x="{ax.px(i) - width / 2:.1f}" y="{top:.1f}" width="{width:.1f}" '
+                              f'height="{bottom - top:.1f}" fill="{color}" fill-opacity="{opacity}" stroke="black"/>')
+            if value_format:
+                self.text(ax.px(i), top - 4, value_format.format(value), size=10)
+            self.text(ax.px(i), ax.y + ax.h + 16, label, size=11)
+    
+    def hline(self, ax: _SvgAxes, value: float, color: str):
+        y = ax.py(value)
+        self.parts.append(f'<line x1="{ax.x:.1f}" y1="{y:.1f}" x2="{ax.x + ax.w:.1f}" y2="{y:.1f}" '
+                          f'stroke="{color}" stroke-width="1.5" stroke-dasharray="6 4"/>')
+    
+    def vline(self, ax: _SvgAxes, value: float, color: str):
+        x = ax.px(value)
+        self.parts.append(f'<line x1="{x:.1f}" y1="{ax.y:.1f}" x2="{x:.1f}" y2="{ax.y + ax.h:.1f}" '
+                          f'stroke="{color}" stroke-width="1.5" stroke-dasharray="6 4"/>')
+    
+    def legend(self, ax: _SvgAxes, entries: List[Tuple[str, str]]):
+        """Dashed-line legend in the panel's top-right corner; entries are (color, label)"""
+        width = 34 + 7 * max(len(label) for _, label in entries)
+        x, y = ax.x + ax.w - width - 6, ax.y + 6
+        self.parts.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{width}" height="{8 + 18 * len(entries)}" '
+                          f'fill="white" fill-opacity="0.8" stroke="#cccccc"/>')
+        for i, (color, label) in enumerate(entries):
+            ly = y + 17 + 18 * i
+            self.parts.append(f'<line x1="{x + 6:.1f}" y1="{ly - 4:.1f}" x2="{x + 26:.1f}" y2="{ly - 4:.1f}" '
+                              f'stroke="{color}" stroke-width="1.5" stroke-dasharray="6 4"/>')
+            self.text(x + 30, ly, label, size=11, anchor='start')
+    
+    def pie(self, index: int, title: str, labels: List[str], values: List[float], colors: List[str]):
+        """Pie from 12 o'clock, counter-clockwise, with percentage labels (startangle=90)"""
+        cx, cy = self.CELLS[index]
+        self.title(index, title)
+        ox, oy, r = cx + self.CELL_W / 2, cy + self.CELL_H / 2 + 20, 130
+        total = sum(values)
+        if total <= 0:
+            self.parts.append(f'<circle cx="{ox}" cy="{oy}" r="{r}" fill="none" stroke="#cccccc"/>')
+            return
+        angle = math.pi / 2
+        for label, value, color in zip(labels, values, colors):
+            sweep = value / total * 2 * math.pi
+            end = angle + sweep
+            if sweep >= 2 * math.pi - 1e-9:
+                self.parts.append(f'<circle cx="{ox}" cy="{oy}" r="{r}" fill="{color}"/>')
+            elif value > 0:
+                x1, y1 = ox + r * math.cos(angle), oy - r * math.sin(angle)
+                x2, y2 = ox + r * math.cos(end), oy - r * math.sin(end)
+                self.parts.append(f'<path d="M{ox:.1f},{oy:.1f} L{x1:.1f},{y1:.1f} '
+                                  f'A{r},{r} 0 {int(sweep > math.pi)} 0 {x2:.1f},{y2:.1f} Z" fill="{color}"/>')
+            middle = angle + sweep / 2
+            dx, dy = math.cos(middle), -math.sin(middle)
+            self.text(ox + 0.6 * r * dx, oy + 0.6 * r * dy + 4, f'{value / total * 100:.1f}%', size=11,
+                      color='white')
+            self.text(ox + 1.1 * r * dx, oy + 1.1 * r * dy + 4, label, size=11,
+                      anchor='start' if dx > 0.1 else 'end' if dx < -0.1 else 'middle')
+            angle = end
+    
+    @classmethod
+    def student_report(cls, calc: "GradeCalculator", student_id: str) -> str:
+        """SVG version of plot_student_performance"""
+        student = calc.students[student_id]
+        categories = list(student.categories.values())
+        names = [cat.name for cat in categories]
+        averages = [cat.get_category_average() for cat in categories]
+        colors = _viridis(len(categories))
+        final_grade = student.calculate_final_grade()
+        letter = student.get_letter_grade()
+        svg = cls(f'Grade Report: {student.name} - {calc.course_name}')
+        
+        # 1. Category averages
+        ax = svg.panel(0, 'Category Averages', ylim=(0, 100), ylabel='Average (%)')
+        svg.bars(ax, names, averages, colors, value_format='{:.1f}%', opacity=0.7)
+        svg.hline(ax, 70, 'red')
+        svg.legend(ax, [('red', 'Passing (70%)')])
+        
+        # 2. Weighted contribution
+        svg.pie(1, f'Grade Contribution\nFinal: {final_grade:.2f}% ({letter})', names,
+                [avg * cat.weight / 100 for avg, cat in zip(averages, categories)], colors)
+        
+        # 3. Assignment timeline
+        points = [(f"{cat.name[:3]}-{a['name'][:10]}", a['percentage'])
+                  for cat in categories for a in cat.assignments]
+        ax = svg.panel(2, 'Assignment Performance Timeline', ylim=(0, 100), ylabel='Score (%)')
+        if points:
+            ax.xlim = (-0.5, len(points) - 0.5)
+            path = ' '.join(f'{ax.px(i):.1f},{ax.py(p):.1f}' for i, (_, p) in enumerate(points))
+            svg.parts.append(f'<polyline points="{path}" fill="none" stroke="#1f77b4" stroke-width="2"/>')
+            for i, (label, p) in enumerate(points):
+                svg.parts.append(f'<circle cx="{ax.px(i):.1f}" cy="{ax.py(p):.1f}" r="4" fill="#1f77b4"/>')
+                svg.text(ax.px(i), ax.y + ax.h + 12, label, size=8, anchor='end', rotate=-45)
+            svg.hline(ax, final_grade, 'green')
+            svg.hline(ax, 70, 'red')
+            svg.legend(ax, [('green', f'Final Average ({final_grade:.1f}%)'), ('red', 'Passing (70%)')])
+        
+        # 4. Class letter distribution with the student's position
+        counts = list(calc.letter_counts().values())
+        index = GRADE_LABELS.index(letter)
+        rank, percentile = calc.class_rank(student_id), calc.class_percentile(student_id)
+        top = max(counts) * 1.3 or 1
+        ax = svg.panel(3, f'Current Letter Grade: {letter}\n'
+                          f'Rank {rank} of {len(calc.students)} (above {percentile:.0f}% of class)',
+                       ylim=(0, top), ylabel='Number of Students', grid=None)
+        svg.bars(ax, GRADE_LABELS, counts, ['gold' if i == index else 'lightgray' for i in range(len(counts))])
+        svg.text(ax.px(index), ax.py(counts[index]) - 8, 'YOU ARE HERE', size=12, weight='bold', color='darkred')
+        return svg.render()
+    
+    @classmethod
+    def class_report(cls, calc: "GradeCalculator") -> str:
+        """SVG version of generate_class_report"""
+        grades = calc.final_grades()
+        stats = calc.class_statistics()
+        svg = cls(f'Class Report: {calc.course_name}')
+        
+        # 1. Grade distribution (the same 10 bins as plt.hist)
+        counts, edges = np.histogram(grades, bins=10)
+        ax = svg.panel(0, 'Grade Distribution', xlim=(edges[0], edges[-1]), ylim=(0, max(counts) * 1.1),
+                       ylabel='Number of Students', xlabel='Grade (%)')
+        for count, left, right in zip(counts, edges[:-1], edges[1:]):
+            svg.parts.append(f'<rect x="{ax.px(left):.1f}" y="{ax.py(count):.1f}" '
+                             f'width="{ax.px(right) - ax.px(left):.1f}" height="{ax.py(0) - ax.py(count):.1f}" '
+                             f'fill="steelblue" fill-opacity="0.7" stroke="black"/>')
+        for tick in _nice_ticks(edges[0], edges[-1]):
+            if edges[0] <= tick <= edges[-1]:
+                svg.text(ax.px(tick), ax.y + ax.h + 16, f'{tick:g}', size=10)
+        svg.vline(ax, stats['mean'], 'red')
+        svg.legend(ax, [('red', f"Mean: {stats['mean']:.2f}%")])
+        
+        # 2. Letter grade distribution
+        letters = stats['letter_counts']
+        ax = svg.panel(1, 'Letter Grade Distribution', ylim=(0, max(letters.values()) * 1.1),
+                       ylabel='Number of Students')
+        svg.bars(ax, list(letters), list(letters.values()), ['lightcoral'] * len(letters), opacity=0.7)
+        
+        # 3. Box plot: quartiles, whiskers to the last point within 1.5 IQR, outliers
+        q1, median, q3 = np.percentile(grades, [25, 50, 75])
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = grades[(grades >= low) & (grades <= high)]
+        outliers = grades[(grades < low) | (grades > high)]
+        pad = (grades.max() - grades.min()) * 0.05 or 1
+        ax = svg.panel(2, 'Grade Statistics (Box Plot)', xlim=(0.5, 1.5),
+                       ylim=(grades.min() - pad, grades.max() + pad), ylabel='Grade (%)')
+        x0, x1, xc = ax.px(0.925), ax.px(1.075), ax.px(1)
+        svg.parts.append(f'<rect x="{x0:.1f}" y="{ax.py(q3):.1f}" width="{x1 - x0:.1f}" '
+                         f'height="{ax.py(q1) - ax.py(q3):.1f}" fill="none" stroke="black"/>')
+        svg.parts.append(f'<line x1="{x0:.1f}" y1="{ax.py(median):.1f}" x2="{x1:.1f}" y2="{ax.py(median):.1f}" '
+                         f'stroke="orange" stroke-width="2"/>')
+        for edge, end in ((q1, inside.min()), (q3, inside.max())):
+            svg.parts.append(f'<line x1="{xc:.1f}" y1="{ax.py(edge):.1f}" x2="{xc:.1f}" y2="{ax.py(end):.1f}" '
+                             f'stroke="black"/>')
+            svg.parts.append(f'<line x1="{ax.px(0.9625):.1f}" y1="{ax.py(end):.1f}" x2="{ax.px(1.0375):.1f}" '
+                             f'y2="{ax.py(end):.1f}" stroke="black"/>')
+        for value in outliers:
+            svg.parts.append(f'<circle cx="{xc:.1f}" cy="{ax.py(value):.1f}" r="3" fill="none" stroke="black"/>')
+        svg.text(xc, ax.y + ax.h + 16, '1', size=10)
+        
+        # 4. Statistics summary
+        cx, cy = cls.CELLS[3]
+        lines = [
+            'CLASS STATISTICS', '═' * 31, '',
+            f"Total Students: {stats['count']}", '',
+            f"Mean Grade: {stats['mean']:.2f}%",
+            f"Median Grade: {stats['median']:.2f}%",
+            f"Std Deviation: {stats['std']:.2f}%", '',
+            f"Highest Grade: {stats['max']:.2f}%",
+            f"Lowest Grade: {stats['min']:.2f}%", '',
+            f"Passing Rate: {stats['passing_rate']:.1f}%",
+        ]
+        for i, line in enumerate(lines):
+            svg.text(cx + 60, cy + 70 + 20 * i, line, size=13, anchor='start', family='DejaVu Sans Mono, monospace')
+        return svg.render()
+
+class GradeStore:
+    """SQLite storage for v13 courses: one row per course, category, assignment
+    slot, student and recorded score, so a large course can be updated and
+    queried without loading the whole gradebook.
+    
+    Category averages and weighted final grades are computed by SQL aggregate
+    queries with the same rules as Student.calculate_final_grade. Ungraded
+    slots have no score row. GradeCalculator.save_data/load_data migrate
+    courses in and out with a .db path."""
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS courses (
+            id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE
+        );
+        CREATE TABLE IF NOT EXISTS categories (
+            id INTEGER PRIMARY KEY,
+            course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            weight REAL NOT NULL,
+            position INTEGER NOT NULL,
+            UNIQUE (course_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS assignments (
+            id INTEGER PRIMARY KEY,
+            category_id INTEGER NOT NULL REFERENCES categories(id) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            max_score REAL NOT NULL,
+            position INTEGER NOT NULL,
+            UNIQUE (category_id, name)
+        );
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY,
+            course_id INTEGER NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+            student_id TEXT NOT NULL,
+            name TEXT NOT NULL,
+            UNIQUE (course_id, student_id)
+        );
+        CREATE TABLE IF NOT EXISTS scores (
+            student_pk INTEGER NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+            assignment_id INTEGER NOT NULL REFERENCES assignments(id) ON DELETE CASCADE,
+            score REAL NOT NULL,
+            PRIMARY KEY (student_pk, assignment_id)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS scores_by_assignment ON scores (assignment_id);
+    '''
+    # Every (student, category) pair of a course with the category average:
+    # mean percentage over graded slots, 0 when nothing is graded.
+    # student_filter narrows it to one student through the students index.
+    CATEGORY_AVERAGES = '''
+        SELECT st.id AS student_pk, st.student_id, c.name AS category, c.weight, c.position,
+               COALESCE(AVG(sc.score * 100.0 / a.max_score), 0.0) AS average
+        FROM students st
+        JOIN courses co ON co.id = st.course_id
+        LEFT JOIN categories c ON c.course_id = st.course_id
+        LEFT JOIN assignments a ON a.category_id = c.id
+        LEFT JOIN scores sc ON sc.student_pk = st.id AND sc.assignment_id = a.id
+        WHERE co.name = ?{student_filter}
+        GROUP BY st.id, c.id
+    '''
+    
+    def __init__(self, db_name: str = "grades.db", pool_size: int = 0):
+        self.db_name = db_name
+        # With pool_size > 0, long-running callers reuse connections instead
+        # of opening one per query
+        self.pool = None
+        if pool_size:
+            self.pool = queue.Queue()
+            for _ in range(pool_size):
+                self.pool.put(self._connect(check_same_thread=False))
+        self.init_database()
+    
+    def _connect(self, **kwargs) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_name, **kwargs)
+        conn.execute('PRAGMA foreign_keys = ON')
+        return conn
+    
+    @contextmanager
+    def connection(self):
+        """Borrow a pooled connection, or open a short-lived one if pooling is off"""
+        if self.pool is None:
+            conn = self._connect()
+            try:
+                yield conn
+            finally:
+                conn.close()
+        else:
+            conn = self.pool.get()
+            try:
+                yield conn
+            finally:
+                self.pool.put(conn)
+    
+    def init_database(self):
+        """Create the tables and indexes if they do not exist"""
+        with self.connection() as conn:
+            conn.executescript(self.SCHEMA)
+    
+    def courses(self) -> List[str]:
+        with self.connection() as conn:
+            return [name for name, in conn.execute('SELECT name FROM courses ORDER BY name')]
+    
+    def save_course(self, data: dict):
+        """Replace one course with parsed save_data() JSON (either format) in a
+        single transaction"""
+        if 'schema' not in data:
+            calc = GradeCalculator(data['course_name'])
+            calc.load_dict(data)
+            calc.build_schema()
+            data = calc.to_dict()
+        with self.connection() as conn:
+            with conn:
+                conn.execute('DELETE FROM courses WHERE name = ?', (data['course_name'],))
+                course_id = conn.execute('INSERT INTO courses (name) VALUES (?)', (data['course_name'],)).lastrowid
+                slot_ids = {}
+                for position, (cat_name, cat_data) in enumerate(data['schema'].items()):
+                    category_id = conn.execute(
+                        'INSERT INTO categories (course_id, name, weight, position) VALUES (?, ?, ?, ?)',
+                        (course_id, cat_name, cat_data['weight'], position)).lastrowid
+                    conn.executemany(
+                        'INSERT INTO assignments (category_id, name, max_score, position) VALUES (?, ?, ?, ?)',
+                        [(category_id, slot, max_score, i) for i, (slot, max_score) in enumerate(cat_data['assignments'])])
+                    slot_ids[cat_name] = [row[0] for row in conn.execute(
+                        'SELECT id FROM assignments WHERE category_id = ? ORDER BY position', (category_id,))]
+                conn.executemany(
+                    'INSERT INTO students (course_id, student_id, name) VALUES (?, ?, ?)',
+                    [(course_id, student_id, student['name']) for student_id, student in data['students'].items()])
+                student_pks = dict(conn.execute('SELECT student_id, id FROM students WHERE course_id = ?', (course_id,)))
+                conn.executemany(
+                    'INSERT INTO scores (student_pk, assignment_id, score) VALUES (?, ?, ?)',
+                    ((student_pks[student_id], slot_ids[cat_name][i], score)
+                     for student_id, student in data['students'].items()
+                     for cat_name, scores in student['scores'].items()
+                     for i, score in enumerate(scores) if score is not None))
+    
+    def load_course(self, course_name: str) -> dict:
+        """The course as schema-format save_data() JSON, or None if it is not stored"""
+        with self.connection() as conn:
+            row = conn.execute('SELECT id FROM courses WHERE name = ?', (course_name,)).fetchone()
+            if row is None:
+                return None
+            course_id = row[0]
+            schema, slots = {}, {}
+            for cat_name, weight, assignment_id, slot, max_score in conn.execute('''
+                    SELECT c.name, c.weight, a.id, a.name, a.max_score
+                    FROM categories c LEFT JOIN assignments a ON a.category_id = c.id
+                    WHERE c.course_id = ? ORDER BY c.position, a.position''', (course_id,)):
+                category = schema.setdefault(cat_name, {'weight': _number(weight), 'assignments': []})
+                if assignment_id is not None:
+                    slots[assignment_id] = (cat_name, len(category['assignments']))
+                    category['assignments'].append([slot, _number(max_score)])
+            students = {
+                student_id: {'name': name, 'scores': {cat_name: [] for cat_name in schema}}
+                for student_id, name in conn.execute(
+                    'SELECT student_id, name FROM students WHERE course_id = ? ORDER BY id', (course_id,))
+            }
+            for student_id, assignment_id, score in conn.execute('''
+                    SELECT st.student_id, sc.assignment_id, sc.score
+                    FROM scores sc JOIN students st ON st.id = sc.student_pk
+                    WHERE st.course_id = ?''', (course_id,)):
+                cat_name, index = slots[assignment_id]
+                scores = students[student_id]['scores'][cat_name]
+                if len(scores) <= index:
+                    scores.extend([None] * (index + 1 - len(scores)))
+                scores[index] = _number(score)
+        return {'course_name': course_name, 'schema': schema, 'students': students}
+    
+    def add_student(self, course_name: str, student_id: str, name: str):
+        with self.connection() as conn:
+            with conn:
+                row = conn.execute('SELECT id FROM courses WHERE name = ?', (course_name,)).fetchone()
+                if row is None:
+                    raise KeyError(f"course {course_name!r} not found")
+                conn.execute('INSERT INTO students (course_id, student_id, name) VALUES (?, ?, ?)',
+                             (row[0], student_id, name))
+    
+    def set_score(self, course_name: str, student_id: str, category: str, assignment: str,
+                  score: float, max_score: float = 100) -> float:
+        """Record one score in a single transaction, adding the assignment slot
+        if it is new (same rules as ScoredCategory.add_assignment); returns
+        the previous score, or None if the slot was ungraded"""
+        with self.connection() as conn:
+            with conn:
+                # Take the write lock up front so the read-then-write below is atomic
+                conn.execute('BEGIN IMMEDIATE')
+                row = conn.execute('''
+                    SELECT st.id, c.id FROM courses co
+                    JOIN students st ON st.course_id = co.id
+                    JOIN categories c ON c.course_id = co.id
+                    WHERE co.name = ? AND st.student_id = ? AND c.name = ?''',
+                    (course_name, student_id, category)).fetchone()
+                if row is None:
+                    raise KeyError(f"{course_name!r}: no student {student_id!r} or category {category!r}")
+                student_pk, category_id = row
+                conn.execute('''
+                    INSERT OR IGNORE INTO assignments (category_id, name, max_score, position)
+                    SELECT ?, ?, ?, COALESCE(MAX(position) + 1, 0) FROM assignments WHERE category_id = ?''',
+                    (category_id, assignment, max_score, category_id))
+                assignment_id, slot_max = conn.execute(
+                    'SELECT id, max_score FROM assignments WHERE category_id = ? AND name = ?',
+                    (category_id, assignment)).fetchone()
+                if slot_max != max_score:
+                    raise ValueError(f"{category}/{assignment} is worth {slot_max:g} points, not {max_score:g}")
+                old = conn.execute('SELECT score FROM scores WHERE student_pk = ? AND assignment_id = ?',
+                                   (student_pk, assignment_id)).fetchone()
+                conn.execute('''
+                    INSERT INTO scores (student_pk, assignment_id, score) VALUES (?, ?, ?)
+                    ON CONFLICT (student_pk, assignment_id) DO UPDATE SET score = excluded.score''',
+                    (student_pk, assignment_id, score))
+        return old[0] if old else None
+    
+    def set_category_weight(self, course_name: str, category: str, weight: float):
+        with self.connection() as conn:
+            with conn:
+                updated = conn.execute('''
+                    UPDATE categories SET weight = ?
+                    WHERE name = ? AND course_id = (SELECT id FROM courses WHERE name = ?)''',
+                    (weight, category, course_name)).rowcount
+        if not updated:
+            raise KeyError(f"{course_name!r}: no category {category!r}")
+    
+    def _averages_query(self, course_name: str, student_id: str = None) -> Tuple[str, tuple]:
+        if student_id is None:
+            return self.CATEGORY_AVERAGES.format(student_filter=''), (course_name,)
+        return self.CATEGORY_AVERAGES.format(student_filter=' AND st.student_id = ?'), (course_name, student_id)
+    
+    def category_averages(self, course_name: str, student_id: str = None) -> Dict[str, Dict[str, float]]:
+        """{student_id: {category: average}}, for one student or the whole course"""
+        query, params = self._averages_query(course_name, student_id)
+        averages = {}
+        with self.connection() as conn:
+            for _, sid, category, _, _, average in conn.execute(query + ' ORDER BY st.id, c.position', params):
+                averages.setdefault(sid, {})
+                if category is not None:
+                    averages[sid][category] = average
+        return averages
+    
+    def final_grades(self, course_name: str, student_id: str = None) -> Dict[str, float]:
+        """{student_id: weighted final grade}, for one student or the whole course"""
+        query, params = self._averages_query(course_name, student_id)
+        with self.connection() as conn:
+            return dict(conn.execute(f'''
+                SELECT student_id, COALESCE(SUM(average * weight) / NULLIF(SUM(weight), 0), 0.0)
+                FROM ({query})
+                GROUP BY student_pk ORDER BY student_pk''', params))
+
+class CourseCatalog:
+    """Index of many `<course>_grades.json` files with lazily loaded courses.
+    
+    A small JSON index (course_catalog.json in the same directory) keeps each
+    course's roster, every student's final grade and letter, and summary
+    statistics, so cross-course questions such as a student's GPA are
+    answered without loading any course. Only files whose size or mtime
+    changed are re-read, in parallel, on refresh(). Full GradeCalculators are
+    loaded on first access and kept in an LRU cache bounded by course count
+    and by total file size."""
+    INDEX_FILE = "course_catalog.json"
+    PATTERN = "*_grades.json"
+    
+    def __init__(self, directory: str = ".", max_courses: int = 16,
+                 max_bytes: int = 256 * 1024 * 1024, workers: int = 4):
+        self.directory = directory
+        self.max_courses = max_courses
+        self.max_bytes = max_bytes  # budget for cached courses, measured by file size
+        self.workers = workers
+        self.index: Dict[str, dict] = {}  # course name -> summary
+        self.by_student: Dict[str, List[str]] = {}
+        self.cache: "OrderedDict[str, Tuple[int, int, GradeCalculator]]" = OrderedDict()  # (mtime_ns, size, course)
+        self.cached_bytes = 0
+        self.lock = threading.Lock()
+        index_path = os.path.join(directory, self.INDEX_FILE)
+        if os.path.exists(index_path):
+            with open(index_path, 'r') as f:
+                self.index = json.load(f)
+        self.refresh()
+    
+    @staticmethod
+    def _read_course(path: str) -> GradeCalculator:
+        with open(path, 'r') as f:
+            data = json.load(f)
+        calc = GradeCalculator(data['course_name'])
+        calc.data_file = path
+        calc.load_dict(data)
+        return calc
+    
+    @classmethod
+    def _summarize(cls, path: str, stat: os.stat_result) -> dict:
+        calc = cls._read_course(path)
+        grades = calc.final_grades()
+        letters = [calc.students[sid].get_letter_grade() for sid in calc.students]
+        summary = {
+            'course_name': calc.course_name,
+            'file': os.path.basename(path),
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'students': {sid: [s.name, round(float(g), 4), letter]
+                         for (sid, s), g, letter in zip(calc.students.items(), grades, letters)},
+            'letter_counts': calc.letter_counts(),
+            'count': len(grades),
+        }
+        if len(grades):
+            summary.update(mean=float(np.mean(grades)), median=float(np.median(grades)),
+                           std=float(np.std(grades)), min=float(np.min(grades)), max=float(np.max(grades)),
+                           passing_rate=float(np.mean(grades >= 70) * 100))
+        return summary
+    
+    def refresh(self) -> int:
+        """Re-index course files that are new or changed; returns how many were re-read"""
+        stats = {}
+        for path in glob.glob(os.path.join(self.directory, self.PATTERN)):
+            stats[os.path.basename(path)] = (path, os.stat(path))
+        known = {summary['file']: summary for summary in self.index.values()}
+        stale = [(path, st) for name, (path, st) in stats.items()
+                 if name not in known or known[name]['mtime_ns'] != st.st_mtime_ns
+                 or known[name]['size'] != st.st_size]
         
-        print(f"Data loaded from {self.data_file}")
+        index = {name: summary for name, summary in self.index.items() if summary['file'] in stats}
+        if stale:
+            # File reads overlap; JSON parsing itself still takes turns on the GIL
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                for summary in pool.map(lambda item: self._summarize(*item), stale):
+                    index = {name: s for name, s in index.items() if s['file'] != summary['file']}
+                    index[summary['course_name']] = summary
+        changed = bool(stale) or len(index) != len(self.index)
+        self.index = index
+        self.by_student = {}
+        for course, summary in sorted(index.items()):
+            for student_id in summary['students']:
+                self.by_student.setdefault(student_id, []).append(course)
+        if changed:
+            index_path = os.path.join(self.directory, self.INDEX_FILE)
+            with open(index_path + '.tmp', 'w') as f:
+                json.dump(index, f, separators=(',', ':'))
+            os.replace(index_path + '.tmp', index_path)
+        return len(stale)
+    
+    def courses(self) -> List[str]:
+        return sorted(self.index)
+    
+    def summary(self, course: str) -> dict:
+        """Indexed statistics for a course (no loading)"""
+        return self.index[course]
+    
+    def get(self, course: str) -> GradeCalculator:
+        """The full GradeCalculator for a course, loaded on first use"""
+        summary = self.index[course]
+        path = os.path.join(self.directory, summary['file'])
+        st = os.stat(path)
+        with self.lock:
+            cached = self.cache.get(course)
+            if cached is not None and cached[0] == st.st_mtime_ns:
+                self.cache.move_to_end(course)
+                return cached[2]
+        calc = self._read_course(path)
+        with self.lock:
+            old = self.cache.pop(course, None)
+            if old is not None:
+                self.cached_bytes -= old[1]
+            self.cache[course] = (st.st_mtime_ns, st.st_size, calc)
+            self.cached_bytes += st.st_size
+            while len(self.cache) > 1 and (len(self.cache) > self.max_courses or self.cached_bytes > self.max_bytes):
+                _, (_, size, _) = self.cache.popitem(last=False)
+                self.cached_bytes -= size
+        return calc
+    
+    def load_many(self, courses: List[str]) -> Dict[str, GradeCalculator]:
+        """Load several courses in parallel (cached ones are returned at once)"""
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return dict(zip(courses, pool.map(self.get, courses)))
+    
+    def courses_for(self, student_id: str) -> List[str]:
+        return self.by_student.get(student_id, [])
+    
+    def student_grades(self, student_id: str) -> Dict[str, Tuple[float, str]]:
+        """Final grade and letter in every course the student is enrolled in, from the index"""
+        return {course: tuple(self.index[course]['students'][student_id][1:])
+                for course in self.courses_for(student_id)}
+    
+    def student_gpa(self, student_id: str) -> float:
+        """Unweighted 4.0-scale GPA across all indexed courses"""
+        grades = self.student_grades(student_id)
+        if not grades:
+            raise KeyError(f"student {student_id!r} is not enrolled in any indexed course")
+        return sum(GRADE_POINTS[letter] for _, letter in grades.values()) / len(grades)
+    
+    def student_reports(self, student_id: str) -> str:
+        """Full text reports from every course the student takes (courses loaded in parallel)"""
+        loaded = self.load_many(self.courses_for(student_id))
+        return "".join(calc.generate_student_report(student_id) for calc in loaded.values())
+
+class _JsonStream:
+    """Minimal incremental reader for one JSON document: values are decoded
+    one at a time from a sliding buffer, so a huge "students" object never
+    has to be in memory at once"""
+    def __init__(self, f, read_size: int = 1 << 20):
+        self.f = f
+        self.read_size = read_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+    
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.read_size)
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        self.eof = not chunk
+        return bool(chunk)
+    
+    def peek(self) -> str:
+        """Next non-whitespace character ('' at end of file)"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+    
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"expected one of {chars!r} in course file, found {char!r}")
+        self.pos += 1
+        return char
+    
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # A number that ends exactly at the buffer edge may continue in the next read
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+def iter_course_file(path: str):
+    """Stream a save_data() file: yields ('schema', {...}) if present, then
+    ('student', student_id, data) for each student. In the schema format the
+    schema must come before the students, as save_data() writes it."""
+    with open(path, 'r') as f:
+        stream = _JsonStream(f)
+        stream.expect('{')
+        while stream.peek() != '}':
+            key = stream.value()
+            stream.expect(':')
+            if key == 'students':
+                stream.expect('{')
+                while stream.peek() != '}':
+                    student_id = stream.value()
+                    stream.expect(':')
+                    yield 'student', student_id, stream.value()
+                    if stream.expect(',}') == '}':
+                        break
+                else:
+                    stream.expect('}')
+            else:
+                value = stream.value()
+                if key == 'schema':
+                    yield 'schema', value
+            if stream.expect(',}') == '}':
+                break
+
+def _letter_indices(grades: np.ndarray) -> np.ndarray:
+    """Index into GRADE_LABELS for each grade (same cutoffs as get_letter_grade)"""
+    ascending = np.array([cutoff for cutoff, _ in reversed(LETTER_CUTOFFS)], dtype=float)
+    return len(LETTER_CUTOFFS) - np.searchsorted(ascending, grades, side='right')
+
+def _chunk_final_grades(schema: dict, students: List[dict]) -> np.ndarray:
+    """Final grades for one chunk of students in the schema format"""
+    total_weight = sum(cat['weight'] for cat in schema.values())
+    grades = np.zeros(len(students))
+    if total_weight == 0:
+        return grades
+    for name, cat in schema.items():
+        max_scores = np.array([max_score for _, max_score in cat['assignments']], dtype=float)
+        matrix = np.full((len(students), len(max_scores)), np.nan)
+        for row, student in enumerate(students):
+            scores = student['scores'].get(name)
+            if scores:
+                matrix[row, :len(scores)] = [np.nan if x is None else x for x in scores]
+        grades += GradeCalculator._category_averages(matrix / max_scores * 100) * cat['weight']
+    return grades / total_weight
+
+def _legacy_final_grade(student: dict) -> float:
+    """calculate_final_grade for one student in the per-student JSON format"""
+    categories = student['categories'].values()
+    total_weight = sum(cat['weight'] for cat in categories)
+    if total_weight == 0:
+        return 0.0
+    weighted = 0.0
+    for cat in categories:
+        if cat['assignments']:
+            average = sum(a['score'] / a['max_score'] * 100 for a in cat['assignments']) / len(cat['assignments'])
+            weighted += average * cat['weight']
+    return weighted / total_weight
+
+class ChunkedClassStatistics:
+    """Class statistics computed by streaming students in fixed-size chunks.
+    
+    Memory use depends on chunk_size, not on the number of students: counts,
+    mean and variance are merged chunk by chunk (Chan et al.), and the median
+    and percentiles come from a fixed histogram of final grades at 0.001%
+    resolution."""
+    RESOLUTION = 1000  # histogram buckets per percentage point
+    
+    def __init__(self, chunk_size: int = 10000):
+        self.chunk_size = chunk_size
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.passing = 0
+        self.letter_counts = np.zeros(len(GRADE_LABELS), dtype=np.int64)
+        self.histogram = np.zeros(100 * self.RESOLUTION + 1, dtype=np.int64)
+    
+    def add_grades(self, grades: np.ndarray):
+        """Merge one chunk of final grades"""
+        n = len(grades)
+        if n == 0:
+            return
+        chunk_mean = float(grades.mean())
+        chunk_m2 = float(((grades - chunk_mean) ** 2).sum())
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += chunk_m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, float(grades.min()))
+        self.max = max(self.max, float(grades.max()))
+        self.passing += int((grades >= 70).sum())
+        self.letter_counts += np.bincount(_letter_indices(grades), minlength=len(GRADE_LABELS))
+        buckets = np.clip(np.floor(grades * self.RESOLUTION), 0, len(self.histogram) - 1).astype(np.int64)
+        self.histogram += np.bincount(buckets, minlength=len(self.histogram))
+    
+    def add_file(self, path: str):
+        """Stream one course file (either save_data() format)"""
+        schema, chunk = None, []
+        for item in iter_course_file(path):
+            if item[0] == 'schema':
+                schema = item[1]
+                continue
+            chunk.append(item[2])
+            if len(chunk) >= self.chunk_size:
+                self._add_students(schema, chunk)
+                chunk = []
+        self._add_students(schema, chunk)
+    
+    def add_directory(self, directory: str, pattern: str = "*_grades.json"):
+        for path in sorted(glob.glob(os.path.join(directory, pattern))):
+            self.add_file(path)
+    
+    def _add_students(self, schema, students: List[dict]):
+        if schema is not None:
+            self.add_grades(_chunk_final_grades(schema, students))
+        else:
+            self.add_grades(np.array([_legacy_final_grade(s) for s in students], dtype=float))
+    
+    def percentile(self, p: float) -> float:
+        """p-th percentile (numpy's linear interpolation, to histogram resolution)"""
+        if self.count == 0:
+            return math.nan
+        position = (self.count - 1) * p / 100
+        cumulative = np.cumsum(self.histogram)
+        low = int(np.searchsorted(cumulative, math.floor(position) + 1))
+        high = int(np.searchsorted(cumulative, math.ceil(position) + 1))
+        value = lambda bucket: min(max(bucket / self.RESOLUTION, self.min), self.max)
+        return value(low) + (value(high) - value(low)) * (position - math.floor(position))
+    
+    def statistics(self) -> dict:
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else math.nan,
+            'median': self.percentile(50),
+            'std': math.sqrt(self.m2 / self.count) if self.count else math.nan,
+            'min': self.min,
+            'max': self.max,
+            'passing_rate': self.passing / self.count * 100 if self.count else math.nan,
+            'letter_counts': dict(zip(GRADE_LABELS, self.letter_counts.tolist())),
+            'percentiles': {p: self.percentile(p) for p in (10, 25, 75, 90)},
+        }
+    
+    def report(self) -> str:
+        """The same summary as generate_class_report's statistics panel"""
+        stats = self.statistics()
+        report = "CLASS STATISTICS\n"
+        report += "═══════════════════════════════\n\n"
+        report += f"Total Students: {stats['count']}\n\n"
+        report += f"Mean Grade: {stats['mean']:.2f}%\n"
+        report += f"Median Grade: {stats['median']:.2f}%\n"
+        report += f"Std Deviation: {stats['std']:.2f}%\n\n"
+        report += f"Highest Grade: {stats['max']:.2f}%\n"
+        report += f"Lowest Grade: {stats['min']:.2f}%\n\n"
+        report += f"Passing Rate: {stats['passing_rate']:.1f}%\n\n"
+        report += "  ".join(f"{letter}: {n}" for letter, n in stats['letter_counts'].items()) + "\n"
+        return report
 
 def demo_version_13():
     """Demo of version 13.0.0 features"""
@@ -363,53 +2060,36 @@ def demo_version_13():
     # Create course
     calc = GradeCalculator("Introduction to Python Programming")
     
-    # Create students
+    # Define the course structure once; every student shares it
+    calc.define_category("Homework", 30, ["HW1", "HW2", "HW3"])
+    calc.define_category("Quizzes", 20, ["Quiz1", "Quiz2"])
+    calc.define_category("Midterm", 25, ["Midterm Exam"])
+    calc.define_category("Final", 25, ["Final Exam"])
+    
+    # Create students (only their scores are stored)
     student1 = Student("Alice Johnson", "S001")
     student2 = Student("Bob Smith", "S002")
     student3 = Student("Carol White", "S003")
+    exams = {"S001": (95, 92), "S002": (78, 82), "S003": (88, 85)}
     
-    # Add categories for each student
     for student in [student1, student2, student3]:
-        # Homework (30%)
-        homework = GradeCategory("Homework", 30)
-        homework.add_assignment("HW1", 95, 100)
-        homework.add_assignment("HW2", 88, 100)
-        homework.add_assignment("HW3", 92, 100)
-        student.add_category(homework)
-        
-        # Quizzes (20%)
-        quizzes = GradeCategory("Quizzes", 20)
-        quizzes.add_assignment("Quiz1", 85, 100)
-        quizzes.add_assignment("Quiz2", 90, 100)
-        student.add_category(quizzes)
-        
-        # Midterm (25%)
-        midterm = GradeCategory("Midterm", 25)
-        if student.name == "Alice Johnson":
-            midterm.add_assignment("Midterm Exam", 95, 100)
-        elif student.name == "Bob Smith":
-            midterm.add_assignment("Midterm Exam", 78, 100)
-        else:
-            midterm.add_assignment("Midterm Exam", 88, 100)
-        student.add_category(midterm)
-        
-        # Final (25%)
-        final = GradeCategory("Final", 25)
-        if student.name == "Alice Johnson":
-            final.add_assignment("Final Exam", 92, 100)
-        elif student.name == "Bob Smith":
-            final.add_assignment("Final Exam", 82, 100)
-        else:
-            final.add_assignment("Final Exam", 85, 100)
-        student.add_category(final)
-        
         calc.add_student(student)
+        for hw, score in zip(["HW1", "HW2", "HW3"], [95, 88, 92]):
+            student.categories["Homework"].add_assignment(hw, score, 100)
+        student.categories["Quizzes"].add_assignment("Quiz1", 85, 100)
+        student.categories["Quizzes"].add_assignment("Quiz2", 90, 100)
+        midterm, final = exams[student.student_id]
+        student.categories["Midterm"].add_assignment("Midterm Exam", midterm, 100)
+        student.categories["Final"].add_assignment("Final Exam", final, 100)
     
     # Generate reports
     print("\n1. Text Report for Alice Johnson:")
     print(calc.generate_student_report("S001"))
     
-    print("\n2. Generating visual report for Alice Johnson...")
+    print("\n2. What does each student need on the Final Exam?")
+    print(calc.generate_what_if_report("Final", "Final Exam", ["A", "B", "C-"]))
+    
+    print("\n2b. Generating visual report for Alice Johnson...")
     calc.plot_student_performance("S001")
     
     print("\n3. Generating class report...")
@@ -418,6 +2098,13 @@ def demo_version_13():
     print("\n4. Exporting PDF report for Alice Johnson...")
     calc.export_to_pdf("S001", "Alice_Johnson_report.pdf")
     
+    print("\n4b. Writing SVG reports (no matplotlib needed)...")
+    with open("Alice_Johnson_report.svg", "w", encoding="utf-8") as f:
+        f.write(calc.student_report_svg("S001"))
+    with open("class_report.svg", "w", encoding="utf-8") as f:
+        f.write(calc.class_report_svg())
+    print("Saved Alice_Johnson_report.svg and class_report.svg")
+    
     print("\n5. Saving all data...")
     calc.save_data()
     
@@ -426,4 +2113,19 @@ def demo_version_13():
     print("="*60)
 
 if __name__ == "__main__":
-    demo_version_13()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Grade Calculator v13.0.0")
+    parser.add_argument("--stats", metavar="PATH",
+                        help="print class statistics for a course file or a directory of them, "
+                             "streaming students in chunks instead of running the demo")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    args = parser.parse_args()
+    if args.stats:
+        stats = ChunkedClassStatistics(args.chunk_size)
+        if os.path.isdir(args.stats):
+            stats.add_directory(args.stats)
+        else:
+            stats.add_file(args.stats)
+        print(stats.report())
+    else:
+        demo_version_13()
\ No newline at end of file
@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import shutil
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_build_assets():
+    spec = importlib.util.spec_from_file_location("build_assets", os.path.join(ROOT, "build_assets.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_skipped_build_keeps_outputs_newer_than_touched_source(tmp_path):
+    build_assets = load_build_assets()
+    for name in ("index.html", "icon.svg"):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / name)
+    assert build_assets.build(src=str(tmp_path), quiet=True) == ["index.html"]
+
+    later = time.time_ns() + 10 ** 9
+    os.utime(tmp_path / "index.html", ns=(later, later))
+    assert build_assets.build(src=str(tmp_path), quiet=True) == []  # content unchanged: no rebuild
+
+    source_mtime = os.stat(tmp_path / "index.html").st_mtime_ns
+    for suffix in ("", ".gz"):
+        assert os.stat(tmp_path / "dist" / f"index.html{suffix}").st_mtime_ns >= source_mtime
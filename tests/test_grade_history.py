@@ -0,0 +1,125 @@
+import gzip
+import importlib.util
+import json
+import os
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def grade_history():
+    spec = importlib.util.spec_from_file_location("grade_history", os.path.join(ROOT, "grade_history.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def records(n, score=75.0, day=1, **extra):
+    return [dict({"version": "10.0.0", "timestamp": f"2024-01-{day:02d} 09:00:{i % 60:02d}",
+                  "score": score, "letter_grade": "C"}, **extra) for i in range(n)]
+
+
+def encoded_size(record):
+    return len((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def test_rotation_resets_index_before_larger_batch(grade_history, tmp_path):
+    short = records(1, score=90.0)[0]
+    long = records(1, score=60.0, student="Student With A Longer Name")[0]
+    s, l = encoded_size(short), encoded_size(long)
+    # room for 10 long records; the 11th rotates the file, and the chunk written
+    # after the rotation is larger than the file was, with differently sized
+    # records so stale offsets from before the rotation would land mid-record
+    history = grade_history.GradeHistory(str(tmp_path / "grade_history.txt"), max_bytes=11 * l - 1)
+    history.append_records([long] * 10)
+    old_size = os.path.getsize(history.filename)
+
+    batch = [long] + [short] * ((history.max_bytes - l) // s)
+    history.append_records(batch)
+    assert len(history.segments()) == 1
+    assert os.path.getsize(history.filename) > old_size
+    assert history.sync_index() == len(batch)
+    assert [r["score"] for r in history.read_records(10)] == [r["score"] for r in batch]
+
+    stats = history.statistics()
+    assert stats["count"] == 10 + len(batch)
+    assert stats["sum"] == pytest.approx(10 * 60.0 + sum(r["score"] for r in batch))
+
+
+def test_large_batch_is_split_at_max_bytes(grade_history, tmp_path):
+    history = grade_history.GradeHistory(str(tmp_path / "grade_history.txt"), max_bytes=4000)
+    history.append_records(records(500))
+    segments = history.segments()
+    assert len(segments) > 1
+    for segment in segments:
+        with gzip.open(tmp_path / segment["file"]) as f:
+            assert len(f.read()) <= 4000
+    assert os.path.getsize(history.filename) <= 4000
+    assert history.count() == 500
+    assert history.statistics()["count"] == 500
+
+
+def test_paging_and_date_search_span_rotated_segments(grade_history, tmp_path):
+    history = grade_history.GradeHistory(str(tmp_path / "grade_history.txt"), max_bytes=4000)
+    for day in range(1, 11):
+        history.append_records(records(20, score=float(day), day=day))
+    segments = history.segments()
+    assert len(segments) >= 3
+    assert history.count() == 200 == sum(s["entries"] for s in segments) + history.sync_index()
+
+    assert [r["score"] for r in history.read_records()] == [float(day) for day in range(1, 11) for _ in range(20)]
+    assert history.read_blocks(0, 1)[0].startswith("=" * 60 + "\nTest Grader v10.0.0")
+
+    start = datetime(2024, 1, 3).timestamp()
+    end = datetime(2024, 1, 6).timestamp()
+    first, last = history.find_range(start, end)
+    assert (first, last) == (40, 100)
+    assert {r["score"] for r in history.read_records(first, last)} == {3.0, 4.0, 5.0}
+    assert history.find_range(0, datetime(2025, 1, 1).timestamp()) == (0, 200)
+
+
+def test_browse_pages_back_into_rotated_segments(grade_history, tmp_path, monkeypatch, capsys):
+    history = grade_history.GradeHistory(str(tmp_path / "grade_history.txt"), max_bytes=4000)
+    for day in range(1, 6):
+        history.append_records(records(20, score=float(day), day=day))
+    answers = iter(["p", "1"])
+    monkeypatch.setattr("builtins.input", lambda prompt="": next(answers))
+    history.browse()
+    out = capsys.readouterr().out
+    assert "100 report(s) on 20 page(s)" in out
+    assert out.count("Score: 1.00/100") == 5
+
+
+LEGACY = (b"\r\n" + b"=" * 60 + b"\r\nTest Grader v10.0.0 - Grade Report\r\nTimestamp: 2024-02-01 10:00:00\r\n"
+          + b"=" * 60 + b"\r\nStudent: Ada\r\nSubject: Math\r\nScore: 78.00/100\r\nLetter Grade: C+\r\n"
+          b"GPA: 2.30/4.00\r\n" + b"=" * 60 + b"\r\n\r\n")
+
+
+def test_legacy_banner_and_json_records_are_both_parsed(grade_history, tmp_path):
+    path = tmp_path / "grade_history.txt"
+    path.write_bytes(LEGACY + LEGACY.replace(b"78.00", b"91.50").replace(b"10:00:00", b"11:00:00"))
+    history = grade_history.GradeHistory(str(path))
+    history.append_record({"version": "12.0.0", "timestamp": "2024-02-02T09:30:00", "student": "Grace",
+                           "subject": "Physics", "score": 88.0, "letter_grade": "B+", "gpa": 3.3})
+
+    assert history.read_records() == [
+        {"version": "10.0.0", "timestamp": "2024-02-01 10:00:00", "student": "Ada", "subject": "Math",
+         "score": 78.0, "letter_grade": "C+", "gpa": 2.3},
+        {"version": "10.0.0", "timestamp": "2024-02-01 11:00:00", "student": "Ada", "subject": "Math",
+         "score": 91.5, "letter_grade": "C+", "gpa": 2.3},
+        {"version": "12.0.0", "timestamp": "2024-02-02T09:30:00", "student": "Grace", "subject": "Physics",
+         "score": 88.0, "letter_grade": "B+", "gpa": 3.3},
+    ]
+    assert [t for _, t in history.entries(0, 3)] == [datetime(2024, 2, 1, 10).timestamp(),
+                                                      datetime(2024, 2, 1, 11).timestamp(),
+                                                      datetime(2024, 2, 2, 9, 30).timestamp()]
+    # both are shown as the classic banner
+    legacy_text, _, json_text = history.read_blocks(0, 3)
+    assert legacy_text.startswith("=" * 60 + "\nTest Grader v10.0.0") and "\r" not in legacy_text
+    assert json_text.splitlines() == ["=" * 60, "Test Grader v12.0.0 - Grade Report", "Timestamp: 2024-02-02T09:30:00",
+                                      "=" * 60, "Student: Grace", "Subject: Physics", "Score: 88.00/100",
+                                      "Letter Grade: B+", "GPA: 3.30/4.00", "=" * 60]
+    assert history.statistics()["count"] == 3
@@ -0,0 +1,18 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+V10 = os.path.join(ROOT, "test grader v10.0.0.py")
+
+
+def run_batch(tmp_path, *args, stdin=None):
+    return subprocess.run([sys.executable, V10, "--batch", *args], cwd=tmp_path, input=stdin,
+                          capture_output=True, text=True, encoding="utf-8", timeout=60)
+
+
+def test_batch_missing_file_reports_one_line_error(tmp_path):
+    result = run_batch(tmp_path, "missing.csv")
+    assert result.returncode == 1
+    assert "Could not read missing.csv" in result.stdout
+    assert "Traceback" not in result.stderr
@@ -0,0 +1,131 @@
+import bisect
+import csv
+import gzip
+import importlib.util
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+from datetime import datetime
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def v12():
+    sys.path.insert(0, ROOT)  # for grade_history
+    spec = importlib.util.spec_from_file_location("test_grader_v12", os.path.join(ROOT, "test grader v12.0.0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def entry(score, i=0):
+    return {"timestamp": datetime(2024, 1, 1, 9, 0, i % 60), "name": f"Student {i}", "student_id": str(i),
+            "subject": "Math", "score": score, "letter_grade": "B", "gpa": 3.0}
+
+
+def test_interrupted_session_removes_spill_file(v12, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    grader = v12.TestGraderV12()
+    grader.all_grades = v12.SessionStore(window=2)
+    for i in range(5):
+        grader.all_grades.append(entry(80.0, i))
+    spill_path = grader.all_grades.spill_path
+    assert spill_path and os.path.exists(spill_path)
+
+    def interrupt(prompt=""):
+        raise KeyboardInterrupt
+    monkeypatch.setattr(grader, "clear_screen", lambda: None)
+    monkeypatch.setattr("builtins.input", interrupt)
+    with pytest.raises(KeyboardInterrupt):
+        grader.run()
+    assert not os.path.exists(spill_path)
+
+
+def rank_error(sorted_values, value, q):
+    rank = bisect.bisect_left(sorted_values, value) / len(sorted_values)
+    high = bisect.bisect_right(sorted_values, value) / len(sorted_values)
+    return 0.0 if rank <= q <= high else min(abs(rank - q), abs(high - q))
+
+
+def test_merged_sketch_percentiles_match_sorted_baseline(v12):
+    rng = random.Random(26)
+    stations = [[rng.gauss(70 + 5 * i, 12) for _ in range(20000)] for i in range(3)]
+    merged = v12.QuantileSketch(seed=1)
+    for i, scores in enumerate(stations):
+        sketch = v12.QuantileSketch(seed=10 + i)
+        for score in scores:
+            sketch.add(score)
+        merged.merge(v12.QuantileSketch.from_dict(json.loads(json.dumps(sketch.to_dict()))))
+
+    baseline = sorted(s for scores in stations for s in scores)
+    assert merged.count == len(baseline)
+    assert merged._size() < 2000  # bounded, far below the 60 000 scores seen
+    for p, value in merged.percentiles().items():
+        assert rank_error(baseline, value, p / 100) < 0.02
+    assert rank_error(baseline, merged.quantile(0.5), 0.5) < 0.02
+
+
+def test_merged_analytics_moments_are_exact(v12):
+    rng = random.Random(7)
+    parts = [[round(rng.uniform(0, 100), 1) for _ in range(n)] for n in (500, 1, 1200)]
+    merged = v12.GradeAnalytics()
+    for scores in parts:
+        analytics = v12.GradeAnalytics()
+        for score in scores:
+            analytics.add(score, "B")
+        merged.merge(v12.GradeAnalytics.from_dict(analytics.to_dict()))
+    every = [s for scores in parts for s in scores]
+    assert merged.count == len(every)
+    assert merged.mean == pytest.approx(statistics.fmean(every))
+    assert merged.variance() == pytest.approx(statistics.variance(every))
+    assert (merged.min, merged.max) == (min(every), max(every))
+    assert merged.letter_counts == {"B": len(every)}
+    assert sum(merged.histogram.counts) == len(every)
+
+
+def varied_entries(n):
+    letters = ["A", "B+", "C-", "F"]
+    return [{"timestamp": datetime(2024, 3, 1, 8, i // 60 % 60, i % 60), "name": f"Student {i}",
+             "student_id": f"ID{i}", "subject": "Math" if i % 2 else "Physics, Lab",
+             "score": 40.0 + i % 61, "letter_grade": letters[i % 4], "gpa": (i % 5) * 0.75} for i in range(n)]
+
+
+def test_session_store_spills_and_iterates_in_order(v12, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    store = v12.SessionStore(window=3)
+    entries = varied_entries(10)
+    for e in entries:
+        store.append(e)
+        assert len(store._scores) < 2 * store.window  # memory stays bounded
+    assert len(store) == 10 and store
+    assert os.path.exists(store.spill_path)
+    assert list(store) == entries
+
+    spill_path = store.spill_path
+    store.clear()
+    assert len(store) == 0 and not store
+    assert not os.path.exists(spill_path)
+
+
+def test_export_to_csv_compressed_streams_every_row(v12, tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    store = v12.SessionStore(window=4)
+    entries = varied_entries(25)
+    for e in entries:
+        store.append(e)
+    grader = v12.TestGraderV12()
+    filename = grader.export_to_csv(store, "export.csv", compress=True, chunk_size=7)
+    assert filename == "export.csv.gz"
+    with gzip.open(tmp_path / filename, "rt", encoding="utf-8", newline="") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == grader.CSV_FIELDNAMES
+    assert rows[1:] == [[str(e["timestamp"]), e["name"], e["student_id"], e["subject"],
+                         str(e["score"]), e["letter_grade"], str(e["gpa"])] for e in entries]
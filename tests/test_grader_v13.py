@@ -0,0 +1,266 @@
+import importlib.util
+import json
+import math
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(scope="module")
+def v13():
+    spec = importlib.util.spec_from_file_location("test_grader_v13", os.path.join(ROOT, "test grader v13.0.0.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_course(v13):
+    """A course whose one student still holds an old per-student GradeCategory"""
+    calc = v13.GradeCalculator("Legacy")
+    student = v13.Student("Ada", "S1")
+    homework = v13.GradeCategory("Homework", 40)
+    homework.add_assignment("HW1", 80, 100)
+    student.add_category(homework)
+    calc.add_student(student)
+    return calc, student
+
+
+def test_define_category_migrates_legacy_student(v13):
+    calc, student = legacy_course(v13)
+    calc.define_category("Exam", 60, ["Final"])
+    assert all(isinstance(c, v13.ScoredCategory) for c in student.categories.values())
+    assert student.calculate_final_grade() == pytest.approx((80 * 40 + 0 * 60) / 100)
+
+    calc.add_assignment("S1", "Exam", "Final", 90)
+    assert calc.final_grades()[0] == pytest.approx((80 * 40 + 90 * 60) / 100)
+    assert calc.class_statistics()["mean"] == pytest.approx((80 * 40 + 90 * 60) / 100)
+
+
+def test_define_category_reweights_legacy_category(v13):
+    calc, student = legacy_course(v13)
+    calc.define_category("Exam", 60, ["Final"])
+    calc.add_assignment("S1", "Exam", "Final", 90)
+    calc.define_category("Homework", 10)
+    assert student.categories["Homework"].weight == 10
+    assert calc.top_students(1) == [("S1", pytest.approx((80 * 10 + 90 * 60) / 70))]
+
+
+def test_rank_queries_return_plain_floats_after_reindex(v13):
+    calc = v13.GradeCalculator("Ranks")
+    calc.define_category("Homework", 100, ["HW1"])
+    for i, score in enumerate([70, 85, 92]):
+        calc.add_student(v13.Student(f"N{i}", f"S{i}"))
+        calc.add_assignment(f"S{i}", "Homework", "HW1", score)
+    calc.set_category_weight("Homework", 50)  # bulk _reindex from NumPy grades
+    for _, grade in calc.top_students(3) + calc.bottom_students(3):
+        assert type(grade) is float
+    assert type(calc.class_statistics()["median"]) is float
+
+
+def test_open_plot_window_does_not_block_writers(v13, monkeypatch):
+    matplotlib = pytest.importorskip("matplotlib")
+    matplotlib.use("Agg")
+    import threading
+    calc, _ = legacy_course(v13)
+    calc.build_schema()
+    plt = v13._pyplot()
+    showing, release = threading.Event(), threading.Event()
+
+    def show():  # stands in for an interactive window the user has not closed yet
+        showing.set()
+        release.wait(10)
+    monkeypatch.setattr(plt, "show", show)
+
+    plotter = threading.Thread(target=calc.plot_student_performance, args=("S1",))
+    plotter.start()
+    try:
+        assert showing.wait(10)
+        writer = threading.Thread(target=calc.add_assignment, args=("S1", "Homework", "HW2", 100))
+        writer.start()
+        writer.join(2)
+        assert not writer.is_alive()
+    finally:
+        release.set()
+        plotter.join(10)
+        plt.close("all")
+    assert calc.students["S1"].calculate_final_grade() == pytest.approx(90)
+
+
+# Exam has a 50-point midterm and an ungraded 40-point final; project is half graded
+COURSE = {
+    "S1": {"Homework": [95, 88], "Exam": [41], "Project": [90]},
+    "S2": {"Homework": [70, 65], "Exam": [30], "Project": [60]},
+    "S3": {"Homework": [100, 100], "Exam": [50], "Project": []},
+    "S4": {"Homework": [40], "Exam": [], "Project": [20]},
+}
+
+
+def what_if_course(v13, extra=None):
+    """COURSE with extra = (student_id, category, {slot: score}) applied on top"""
+    calc = v13.GradeCalculator("WhatIf")
+    calc.define_category("Homework", 30, ["HW1", "HW2"])
+    calc.define_category("Exam", 50, [("Midterm", 50), ("Final", 40)])
+    calc.define_category("Project", 20, ["P1", "P2"])
+    slots = {name: schema.slot_names for name, schema in calc.schema.items()}
+    for sid, scores in COURSE.items():
+        calc.add_student(v13.Student(f"Name {sid}", sid))
+        for category, values in scores.items():
+            for slot, score in zip(slots[category], values):
+                max_score = calc.schema[category].max_scores[calc.schema[category].slot_index[slot]]
+                calc.add_assignment(sid, category, slot, score, max_score)
+    if extra:
+        sid, category, trial = extra
+        for slot, score in trial.items():
+            max_score = calc.schema[category].max_scores[calc.schema[category].slot_index[slot]]
+            calc.add_assignment(sid, category, slot, score, max_score)
+    return calc
+
+
+def brute_force_needed(v13, sid, category, cutoff, trial_scores, top):
+    """Smallest trial t in [0, top] (bisection on the real final grade) reaching cutoff"""
+    def final(t):
+        return what_if_course(v13, (sid, category, trial_scores(t))).students[sid].calculate_final_grade()
+    if final(0) >= cutoff:
+        return 0.0
+    if final(top) < cutoff:
+        return math.inf
+    lo, hi = 0.0, top
+    for _ in range(40):
+        mid = (lo + hi) / 2
+        lo, hi = (lo, mid) if final(mid) >= cutoff else (mid, hi)
+    return hi
+
+
+@pytest.mark.parametrize("assignment", ["Final", None])
+def test_score_needed_matches_brute_force(v13, assignment):
+    calc = what_if_course(v13)
+    letters = ["A", "B", "C-", "D-"]
+    student_ids, got_letters, needed = calc.score_needed("Exam", assignment, letters)
+    assert student_ids == list(COURSE) and got_letters == letters
+    cutoffs = dict((letter, cutoff) for cutoff, letter in v13.LETTER_CUTOFFS)
+    for i, sid in enumerate(student_ids):
+        if assignment:
+            top, trial = 40.0, lambda t: {"Final": t}
+        else:
+            pending = calc.schema["Exam"].slot_names[len(COURSE[sid]["Exam"]):]
+            if not pending:
+                assert np.isnan(needed[i]).all()
+                continue
+            maxima = {slot: calc.schema["Exam"].max_scores[calc.schema["Exam"].slot_index[slot]] for slot in pending}
+            top, trial = 100.0, lambda t, maxima=maxima: {slot: t / 100 * m for slot, m in maxima.items()}
+        for j, letter in enumerate(letters):
+            expected = brute_force_needed(v13, sid, "Exam", cutoffs[letter], trial, top)
+            if expected == 0.0:
+                assert needed[i, j] <= 1e-9
+            elif expected == math.inf:
+                assert needed[i, j] > top
+            else:
+                assert needed[i, j] == pytest.approx(expected, abs=1e-6)
+
+
+def write_course_files(directory, rng):
+    """A schema-format and a legacy-format course; returns every final grade computed with numpy"""
+    slots = {"Homework": [100, 100, 50, 20], "Exam": [100, 60]}
+    weights = {"Homework": 40, "Exam": 60}
+    students, grades = {}, []
+    for i in range(2500):
+        scores, averages = {}, {}
+        for category, maxima in slots.items():
+            graded = rng.integers(0, len(maxima) + 1)
+            values = [float(rng.uniform(0, m)) if j < graded and rng.random() > 0.1 else None
+                      for j, m in enumerate(maxima)]
+            scores[category] = values
+            percents = np.array([np.nan if v is None else v / m * 100 for v, m in zip(values, maxima)])
+            averages[category] = 0.0 if np.isnan(percents).all() else np.nanmean(percents)
+        students[f"S{i}"] = {"name": f"Student {i}", "scores": scores}
+        grades.append(sum(averages[c] * weights[c] for c in slots) / sum(weights.values()))
+    schema = {c: {"weight": weights[c], "assignments": [[f"{c}{j}", m] for j, m in enumerate(maxima)]}
+              for c, maxima in slots.items()}
+    with open(directory / "big_grades.json", "w") as f:
+        json.dump({"course_name": "Big", "schema": schema, "students": students}, f)
+
+    legacy = {}
+    for i in range(300):
+        hw = [float(rng.uniform(50, 100)) for _ in range(rng.integers(0, 4))]
+        exam = float(rng.uniform(0, 100))
+        legacy[f"L{i}"] = {"name": f"Legacy {i}", "categories": {
+            "Homework": {"weight": 30, "assignments": [{"name": f"HW{j}", "score": s, "max_score": 100}
+                                                      for j, s in enumerate(hw)]},
+            "Exam": {"weight": 70, "assignments": [{"name": "Exam", "score": exam, "max_score": 100}]}}}
+        grades.append(((np.mean(hw) if hw else 0.0) * 30 + exam * 70) / 100)
+    with open(directory / "old_grades.json", "w") as f:
+        json.dump({"course_name": "Old", "students": legacy}, f)
+    return np.array(grades)
+
+
+def test_chunked_statistics_match_numpy(v13, tmp_path):
+    expected = write_course_files(tmp_path, np.random.default_rng(46))
+    chunked = v13.ChunkedClassStatistics(chunk_size=333)
+    chunked.add_directory(str(tmp_path))
+    stats = chunked.statistics()
+
+    assert stats["count"] == len(expected)
+    assert stats["mean"] == pytest.approx(expected.mean())
+    assert stats["std"] == pytest.approx(expected.std())
+    assert (stats["min"], stats["max"]) == (pytest.approx(expected.min()), pytest.approx(expected.max()))
+    assert stats["passing_rate"] == pytest.approx((expected >= 70).mean() * 100)
+    assert stats["median"] == pytest.approx(np.median(expected), abs=2e-3)
+    for p, value in stats["percentiles"].items():
+        assert value == pytest.approx(np.percentile(expected, p), abs=2e-3)
+    letters = [next((letter for cutoff, letter in v13.LETTER_CUTOFFS if g >= cutoff), "F") for g in expected]
+    assert stats["letter_counts"] == {label: letters.count(label) for label in v13.GRADE_LABELS}
+
+
+def without_trailing_none(data):
+    for student in data["students"].values():
+        for scores in student["scores"].values():
+            while scores and scores[-1] is None:
+                scores.pop()
+    return data
+
+
+def test_grade_store_round_trip_and_sql_final_grades(v13, tmp_path):
+    db = str(tmp_path / "grades.db")
+    calc = what_if_course(v13)
+    calc.save_data(db)
+
+    loaded = v13.GradeCalculator("WhatIf")
+    loaded.load_data(db)
+    assert without_trailing_none(loaded.to_dict()) == without_trailing_none(calc.to_dict())
+
+    store = v13.GradeStore(db)
+    assert store.courses() == ["WhatIf"]
+    expected = {sid: s.calculate_final_grade() for sid, s in calc.students.items()}
+    assert store.final_grades("WhatIf") == pytest.approx(expected)
+    assert list(store.final_grades("WhatIf").values()) == pytest.approx(list(calc.final_grades()))
+    assert store.final_grades("WhatIf", "S2") == pytest.approx({"S2": expected["S2"]})
+    assert store.category_averages("WhatIf", "S4")["S4"] == pytest.approx({"Homework": 40.0, "Exam": 0.0, "Project": 20.0})
+
+    # writes go straight to SQL and agree with the in-memory model
+    assert store.set_score("WhatIf", "S4", "Exam", "Midterm", 45, 50) is None
+    assert store.set_score("WhatIf", "S4", "Exam", "Midterm", 25, 50) == 45
+    store.set_score("WhatIf", "S4", "Exam", "Bonus", 8, 10)  # new slot
+    store.set_category_weight("WhatIf", "Project", 40)
+    calc.add_assignment("S4", "Exam", "Midterm", 25, 50)
+    calc.add_assignment("S4", "Exam", "Bonus", 8, 10)
+    calc.set_category_weight("Project", 40)
+    assert store.final_grades("WhatIf") == pytest.approx(
+        {sid: s.calculate_final_grade() for sid, s in calc.students.items()})
+
+    with pytest.raises(KeyError):
+        store.set_score("WhatIf", "nobody", "Exam", "Midterm", 1)
+    with pytest.raises(KeyError):
+        store.set_category_weight("WhatIf", "Nope", 10)
+    assert store.load_course("Missing") is None
+
+
+def test_grade_store_converts_legacy_courses(v13, tmp_path):
+    calc, student = legacy_course(v13)
+    store = v13.GradeStore(str(tmp_path / "grades.db"))
+    store.save_course(calc.to_dict())
+    assert store.final_grades("Legacy") == pytest.approx({"S1": student.calculate_final_grade()})
+    assert store.load_course("Legacy")["schema"] == {"Homework": {"weight": 40, "assignments": [["HW1", 100]]}}
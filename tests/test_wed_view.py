@@ -0,0 +1,373 @@
+import gzip
+import http.client
+import importlib.util
+import json
+import os
+import re
+import shutil
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+WED_VIEW = os.path.join(ROOT, "wed_view.py")
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def descendants(pid):
+    """PIDs of every process below pid, read from /proc"""
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    found, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            found.append(child)
+            stack.append(child)
+    return found
+
+
+@pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT") or not os.path.isdir("/proc"),
+                    reason="needs SO_REUSEPORT and /proc")
+def test_supervisor_starts_exact_worker_count(tmp_path):
+    port = free_port()
+    # PROCESSES in the environment is inherited by the workers and must not make them supervise
+    env = dict(os.environ, PROCESSES="2")
+    supervisor = subprocess.Popen(
+        [sys.executable, WED_VIEW, "--port", str(port), "--workers", "2", "--processes", "2"],
+        cwd=tmp_path, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port)
+        time.sleep(2)  # long enough for runaway workers to have forked more
+        assert len(descendants(supervisor.pid)) == 2
+    finally:
+        supervisor.send_signal(signal.SIGTERM)
+        try:
+            supervisor.wait(20)
+        except subprocess.TimeoutExpired:
+            supervisor.kill()
+            supervisor.wait()
+
+
+def test_blank_request_line_is_counted_and_closed(tmp_path):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port)
+        for _ in range(2):
+            with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+                sock.sendall(b"\r\n")
+                sock.recv(1024)  # the server closes the connection
+        with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+            sock.sendall(b"GET /metrics HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+            response = b""
+            while chunk := sock.recv(65536):
+                response += chunk
+        assert b" 200 " in response.split(b"\r\n", 1)[0]
+        # only the /metrics request itself is in flight
+        assert b"wed_view_requests_in_flight 1\n" in response
+    finally:
+        server.terminate()
+        server.wait(20)
+
+
+def raw_request(port, request):
+    with socket.create_connection(("127.0.0.1", port), timeout=5) as sock:
+        sock.sendall(request)
+        response = b""
+        while chunk := sock.recv(65536):
+            response += chunk
+    return response
+
+
+def test_bad_content_length_and_private_files(tmp_path):
+    (tmp_path / "grades.db").write_bytes(b"secret")
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port)
+        for length in (b"abc", b"-1"):
+            response = raw_request(port, b"POST /grade HTTP/1.1\r\nHost: test\r\nContent-Length: " + length +
+                                   b"\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 400 ")
+        response = raw_request(port, b"POST /grade HTTP/1.1\r\nHost: test\r\nContent-Length: 999999999\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 413 ")
+        # no Content-Length: 411 and the body is not parsed as a second request
+        response = raw_request(port, b"POST /grade HTTP/1.1\r\nHost: test\r\n\r\n"
+                                     b"GET /metrics HTTP/1.1\r\nHost: test\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 411 ")
+        assert response.count(b"HTTP/1.1 ") == 1
+        for method in (b"GET", b"HEAD"):
+            response = raw_request(port, method + b" /grades.db HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+            assert response.startswith(b"HTTP/1.1 404 ")
+            assert b"secret" not in response
+    finally:
+        server.terminate()
+        server.wait(20)
+
+
+def header(response, name):
+    for line in response.split(b"\r\n\r\n", 1)[0].split(b"\r\n")[1:]:
+        key, _, value = line.partition(b":")
+        if key.strip().lower() == name.lower():
+            return value.strip()
+    return None
+
+
+def test_range_matches_full_get_of_built_page(tmp_path):
+    for name in ("index.html", "icon.svg"):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / name)
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port)
+        full = raw_request(port, b"GET /index.html HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        length, etag = header(full, b"Content-Length"), header(full, b"ETag")
+        assert int(length) == os.path.getsize(tmp_path / "dist" / "index.html")
+
+        partial = raw_request(port, b"GET /index.html HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+                                    b"Range: bytes=0-99\r\nIf-Range: " + etag + b"\r\n\r\n")
+        assert partial.startswith(b"HTTP/1.1 206 ")
+        assert header(partial, b"Content-Range") == b"bytes 0-99/" + length
+        assert header(partial, b"ETag") == etag
+        assert partial.split(b"\r\n\r\n", 1)[1] == full.split(b"\r\n\r\n", 1)[1][:100]
+    finally:
+        server.terminate()
+        server.wait(20)
+
+
+def test_idle_keep_alive_connections_do_not_hold_workers(tmp_path):
+    (tmp_path / "index.html").write_text("<p>hi</p>")
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "2"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    idle = []
+    try:
+        assert wait_for_port(port)
+        request = b"GET /index.html HTTP/1.1\r\nHost: test\r\n\r\n"
+        for _ in range(4):  # more idle keep-alive connections than worker threads
+            sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+            sock.sendall(request)
+            assert sock.recv(65536).startswith(b"HTTP/1.1 200 ")
+            idle.append(sock)
+
+        start = time.monotonic()
+        response = raw_request(port, b"GET /index.html HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 200 ")
+        assert time.monotonic() - start < 2
+
+        # a parked connection is served again, including pipelined requests
+        idle[0].sendall(request * 2)
+        response = b""
+        while response.count(b"HTTP/1.1 200 ") < 2:
+            response += idle[0].recv(65536)
+    finally:
+        for sock in idle:
+            sock.close()
+        server.terminate()
+        server.wait(20)
+
+
+def test_linked_apple_touch_icon_is_served(tmp_path):
+    pytest.importorskip("PIL")
+    for name in ("index.html", "icon.svg"):
+        shutil.copy(os.path.join(ROOT, name), tmp_path / name)
+    assert b'href="/apple-touch-icon.png"' in (tmp_path / "index.html").read_bytes()
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port, timeout=30)
+        response = raw_request(port, b"GET /apple-touch-icon.png HTTP/1.1\r\nHost: test\r\nConnection: close\r\n\r\n")
+        assert response.startswith(b"HTTP/1.1 200 ")
+        body = response.split(b"\r\n\r\n", 1)[1]
+        assert body.startswith(b"\x89PNG")
+        assert int.from_bytes(body[16:20], "big") == int.from_bytes(body[20:24], "big") == 180
+    finally:
+        server.terminate()
+        server.wait(20)
+
+
+def load_wed_view():
+    spec = importlib.util.spec_from_file_location("wed_view", WED_VIEW)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_accept_encoding_negotiation(tmp_path):
+    wed_view = load_wed_view()
+    path = tmp_path / "notes.txt"
+    path.write_text("grade " * 500)
+    asset = wed_view.StaticAsset(str(path), os.stat(path), "text/plain")
+    best = "br" if "br" in asset.variants else "gzip"
+    assert asset.select("") == "identity"
+    assert asset.select("gzip") == "gzip"
+    assert asset.select("deflate, gzip;q=0.5") == "gzip"
+    assert asset.select("gzip;q=0") == "identity"
+    assert asset.select("GZIP, br") == best
+    assert asset.select("*") == best
+    assert gzip.decompress(asset.variants["gzip"][0]) == path.read_bytes()
+
+    png = tmp_path / "icon.png"
+    png.write_bytes(b"\x89PNG" + bytes(2000))
+    assert wed_view.StaticAsset(str(png), os.stat(png), "image/png").select("gzip, br") == "identity"
+
+
+def test_etag_revalidation_and_gzip_responses(tmp_path):
+    path = tmp_path / "notes.txt"
+    path.write_text("grade " * 500)
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        assert wait_for_port(port)
+        get = b"GET /notes.txt HTTP/1.1\r\nHost: test\r\nConnection: close\r\n"
+        plain = raw_request(port, get + b"\r\n")
+        assert plain.startswith(b"HTTP/1.1 200 ") and header(plain, b"Content-Encoding") is None
+        assert plain.split(b"\r\n\r\n", 1)[1] == path.read_bytes()
+
+        zipped = raw_request(port, get + b"Accept-Encoding: gzip\r\n\r\n")
+        assert header(zipped, b"Content-Encoding") == b"gzip"
+        assert header(zipped, b"Vary") == b"Accept-Encoding"
+        assert gzip.decompress(zipped.split(b"\r\n\r\n", 1)[1]) == path.read_bytes()
+        etag = header(zipped, b"ETag")
+        assert etag != header(plain, b"ETag")
+
+        for tag in (etag, header(plain, b"ETag"), b'"other", ' + etag):
+            cached = raw_request(port, get + b"Accept-Encoding: gzip\r\nIf-None-Match: " + tag + b"\r\n\r\n")
+            assert cached.startswith(b"HTTP/1.1 304 ")
+            assert header(cached, b"ETag") == etag
+            assert cached.split(b"\r\n\r\n", 1)[1] == b""
+
+        path.write_text("changed " * 500)
+        later = time.time_ns() + 10 ** 9
+        os.utime(path, ns=(later, later))
+        fresh = raw_request(port, get + b"If-None-Match: " + header(plain, b"ETag") + b"\r\n\r\n")
+        assert fresh.startswith(b"HTTP/1.1 200 ")
+        assert fresh.split(b"\r\n\r\n", 1)[1] == path.read_bytes()
+    finally:
+        server.terminate()
+        server.wait(20)
+
+
+def test_grade_and_stats_api(tmp_path):
+    port = free_port()
+    server = subprocess.Popen([sys.executable, WED_VIEW, "--port", str(port), "--workers", "4"],
+                              cwd=tmp_path, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    try:
+        assert wait_for_port(port)
+
+        def call(method, path, payload=None):
+            body = None if payload is None else json.dumps(payload)
+            conn.request(method, path, body=body, headers={"Content-Type": "application/json"})
+            response = conn.getresponse()
+            return response.status, json.loads(response.read())
+
+        status, result = call("POST", "/grade", 95)
+        assert status == 200
+        assert (result["score"], result["letter_grade"], result["gpa"]) == (95, "A", 4.0)
+        assert result["message"] and isinstance(result["feedback"], list)
+
+        status, result = call("POST", "/grade", {"scores": [91, 72.5, 40], "save": True})
+        assert status == 200 and result["count"] == 3
+        assert [r["letter_grade"] for r in result["results"]] == ["A-", "C-", "F"]
+
+        status, result = call("POST", "/grade", [50, 101])
+        assert status == 400 and "scores[1]" in result["error"]
+        status, result = call("POST", "/grade", [True])
+        assert status == 400
+
+        status, stats = call("GET", "/stats")
+        assert status == 200
+        assert stats["total_grades"] == 3
+        assert stats["highest_score"] == 91 and stats["lowest_score"] == 40
+        assert stats["avg_score"] == pytest.approx((91 + 72.5 + 40) / 3)
+    finally:
+        conn.close()
+        server.terminate()
+        server.wait(20)
+
+
+SAMPLE = re.compile(r'^([a-zA-Z_:][a-zA-Z0-9_:]*)(\{(?:[a-zA-Z_][a-zA-Z0-9_]*="(?:[^"\\\n]|\\.)*",?)*\})? (\S+)$')
+
+
+def test_metrics_render_prometheus_text_format():
+    wed_view = load_wed_view()
+    metrics = wed_view.Metrics()
+
+    def traffic(path, seconds):
+        for _ in range(50):
+            metrics.begin()
+            metrics.end(path, "GET", 200, 100, seconds)
+    threads = [threading.Thread(target=traffic, args=("/index.html", 0.003)),
+               threading.Thread(target=traffic, args=('/we"ird\\path', 20.0))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    metrics.begin()  # one request still in flight
+
+    text = metrics.render()
+    assert text.endswith("\n")
+    typed, samples = {}, {}
+    for line in text.splitlines():
+        if line.startswith("# TYPE "):
+            _, _, name, kind = line.split(" ")
+            typed[name] = kind
+        elif not line.startswith("# HELP "):
+            match = SAMPLE.match(line)
+            assert match, line
+            name = match.group(1)
+            assert name in typed or name.rsplit("_", 1)[0] in typed, name  # TYPE precedes its samples
+            samples[name + (match.group(2) or "")] = float(match.group(3))
+
+    assert typed == {"wed_view_requests_in_flight": "gauge", "wed_view_requests_total": "counter",
+                     "wed_view_response_bytes_total": "counter", "wed_view_request_duration_seconds": "histogram"}
+    assert samples["wed_view_requests_in_flight"] == 1
+    assert samples['wed_view_requests_total{path="/index.html",method="GET",code="200"}'] == 50
+    assert samples['wed_view_response_bytes_total{path="/we\\"ird\\\\path"}'] == 5000
+
+    buckets = [(float(le), n) for key, n in samples.items()
+               if key.startswith('wed_view_request_duration_seconds_bucket{path="/index.html"')
+               for le in re.findall(r'le="([^"]+)"', key)]
+    assert buckets[-1][0] == float("inf")
+    assert [n for _, n in buckets] == sorted(n for _, n in buckets)  # cumulative
+    assert dict(buckets)[0.0025] == 0 and dict(buckets)[0.005] == 50
+    assert samples['wed_view_request_duration_seconds_count{path="/index.html"}'] == 50
+    assert samples['wed_view_request_duration_seconds_sum{path="/index.html"}'] == pytest.approx(0.15)
+    assert samples['wed_view_request_duration_seconds_bucket{path="/we\\"ird\\\\path",le="10.0"}'] == 0
+    assert samples['wed_view_request_duration_seconds_bucket{path="/we\\"ird\\\\path",le="+Inf"}'] == 50
@@ -1,14 +1,1076 @@
 # simple_server.py
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+"""
+Serve the Test Grader download page (index.html, icons, scripts).
+
+Run:
+  python wed_view.py                  # thread-pool server on 0.0.0.0:5000
+  python wed_view.py --workers 32     # handle up to 32 requests at once
+  python wed_view.py --single         # original one-connection-at-a-time server
+  python wed_view.py --processes 4    # pre-fork: 4 worker processes share the port
+Environment: PORT, WORKERS and PROCESSES override the defaults below.
+
+With --processes N a supervisor starts N worker processes that each bind the
+port with SO_REUSEPORT (the kernel spreads connections across them), restarts
+any worker that dies, and on SIGHUP replaces workers one at a time (rolling
+reload). SIGTERM stops all workers gracefully. /metrics then describes the
+worker that answered the scrape.
+
+Small static files are held in memory with gzip (and brotli, if the
+`brotli` package is installed) variants, strong ETags and Cache-Control.
+Pages built by build_assets.py (run incrementally at startup) are served
+from dist/ with their prebuilt .gz/.br siblings while they are up to date.
+The icons index.html links (icon.png, favicon.ico, apple-touch-icon.png) are
+generated by make_icon.py at startup, also incrementally, when Pillow is
+installed (it comes with matplotlib).
+Larger files (and any Range request) are sent straight from the page cache
+with sendfile, with single-range Range/If-Range support for resumable and
+parallel downloads.
+
+JSON API (pooled server only):
+  POST /grade   body: 87.5 | [87.5, 62, ...] | {"scores": [...], "save": true}
+                -> letter grade, GPA and feedback per score (v10 grading rules);
+                   "save" also records them in grades.db (v11 database),
+                   which like every *.db/*.sqlite file is never served
+  GET  /stats   -> GradeDatabase.get_statistics() summary of grades.db
+  GET  /chart/student?course=<name>&id=<student id>[&format=png|svg]
+  GET  /chart/class?course=<name>[&format=png|svg]
+                -> v13 charts for <name>_grades.json, cached in memory. SVG
+                   is drawn in the request thread by v13's native renderer
+                   (add &engine=matplotlib for the old output); PNG is
+                   rendered by matplotlib in worker processes
+  GET  /metrics -> request counters, response bytes, in-flight gauge and
+                   latency histograms in Prometheus text format
+"""
+import argparse
+import bisect
+import contextlib
+import email.utils
+import gzip
+import hashlib
+import importlib.util
+import io
+import json
+import multiprocessing
+import os
+import selectors
+import signal
+import socket
 import socketserver
+import stat
+import subprocess
+import sys
+import threading
+import time
+import warnings
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import HTTPServer, SimpleHTTPRequestHandler
+from urllib.parse import parse_qs, urlsplit
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+PORT = int(os.environ.get("PORT", 5000))
+WORKERS = int(os.environ.get("WORKERS", 16))
+PROCESSES = int(os.environ.get("PROCESSES", 1))
+WORKER_READY_WAIT = 1.0  # seconds a replacement worker gets to bind before the old one stops
+KEEP_ALIVE_TIMEOUT = 10  # seconds an idle keep-alive connection is kept open (or a read may stall)
+KEEP_ALIVE_MAX_IDLE = 1024  # idle keep-alive connections kept open; the oldest are closed beyond this
+CACHE_MAX_BYTES = 32 * 1024 * 1024   # total size of cached assets (all variants)
+CACHE_MAX_FILE = 2 * 1024 * 1024     # larger files are streamed from disk instead
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+BUILD_DIR = "dist"  # build_assets.py output, relative to the served directory
+GRADES_DB = os.environ.get("GRADES_DB", "grades.db")
+# Database files (grades.db and friends) live in the served directory but are never served
+PRIVATE_SUFFIXES = (".db", ".db-journal", ".db-wal", ".db-shm", ".sqlite", ".sqlite3")
+MAX_API_BODY = 8 * 1024 * 1024
+CHART_WORKERS = int(os.environ.get("CHART_WORKERS", 2))
+CHART_CACHE_BYTES = 64 * 1024 * 1024
+CHART_CACHE_ENTRIES = 512
+CHART_COURSES = int(os.environ.get("CHART_COURSES", 8))  # loaded courses kept per process
+CHART_TIMEOUT = 60
+CHART_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+CHART_ENGINES = ("native", "matplotlib")
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Metrics:
+    """Request metrics kept in per-thread shards (no locking on the request
+    path) and only summed when /metrics is scraped"""
+
+    def __init__(self):
+        self.local = threading.local()
+        self.shards = []
+        self.lock = threading.Lock()
+
+    def _shard(self):
+        shard = getattr(self.local, "shard", None)
+        if shard is None:
+            shard = self.local.shard = {"in_flight": 0, "requests": {}, "bytes": {}, "latency": {}}
+            with self.lock:
+                self.shards.append(shard)
+        return shard
+
+    def begin(self):
+        self._shard()["in_flight"] += 1
+
+    def end(self, path, method, code, nbytes, seconds):
+        shard = self._shard()
+        shard["in_flight"] -= 1
+        key = (path, method, code)
+        shard["requests"][key] = shard["requests"].get(key, 0) + 1
+        shard["bytes"][path] = shard["bytes"].get(path, 0) + nbytes
+        histogram = shard["latency"].get(path)
+        if histogram is None:
+            # one count per bucket, one for +Inf, then the running sum
+            histogram = shard["latency"][path] = [0] * (len(LATENCY_BUCKETS) + 1) + [0.0]
+        histogram[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        histogram[-1] += seconds
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)"""
+        in_flight, requests, nbytes, latency = 0, {}, {}, {}
+        with self.lock:
+            shards = list(self.shards)
+        for shard in shards:
+            in_flight += shard["in_flight"]
+            for key, n in list(shard["requests"].items()):
+                requests[key] = requests.get(key, 0) + n
+            for path, n in list(shard["bytes"].items()):
+                nbytes[path] = nbytes.get(path, 0) + n
+            for path, histogram in list(shard["latency"].items()):
+                total = latency.setdefault(path, [0] * len(histogram))
+                for i, value in enumerate(list(histogram)):
+                    total[i] += value
+
+        def label(value):
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        lines = [
+            "# HELP wed_view_requests_in_flight Requests currently being handled.",
+            "# TYPE wed_view_requests_in_flight gauge",
+            f"wed_view_requests_in_flight {in_flight}",
+            "# HELP wed_view_requests_total Requests handled, by path, method and status code.",
+            "# TYPE wed_view_requests_total counter",
+        ]
+        for (path, method, code), n in sorted(requests.items()):
+            lines.append(f'wed_view_requests_total{{path="{label(path)}",method="{method}",code="{code}"}} {n}')
+        lines += [
+            "# HELP wed_view_response_bytes_total Response body bytes sent, by path.",
+            "# TYPE wed_view_response_bytes_total counter",
+        ]
+        for path, n in sorted(nbytes.items()):
+            lines.append(f'wed_view_response_bytes_total{{path="{label(path)}"}} {n}')
+        lines += [
+            "# HELP wed_view_request_duration_seconds Time from request line to response, by path.",
+            "# TYPE wed_view_request_duration_seconds histogram",
+        ]
+        for path, histogram in sorted(latency.items()):
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS + ("+Inf",), histogram):
+                cumulative += n
+                lines.append(f'wed_view_request_duration_seconds_bucket{{path="{label(path)}",le="{bound}"}} {cumulative}')
+            lines.append(f'wed_view_request_duration_seconds_sum{{path="{label(path)}"}} {histogram[-1]}')
+            lines.append(f'wed_view_request_duration_seconds_count{{path="{label(path)}"}} {cumulative}')
+        return "\n".join(lines) + "\n"
+
+
+def load_script(filename, module_name):
+    """Import one of the standalone grader scripts (their file names contain spaces)"""
+    if HERE not in sys.path:
+        sys.path.insert(0, HERE)  # for their shared modules, e.g. grade_history
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(HERE, filename))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# matplotlib rendering runs in separate processes: pyplot is not thread-safe
+# and a render is CPU-bound. Each worker keeps the v13 module and loaded courses.
+_chart_module = None
+_chart_courses = OrderedDict()
+
+
+def _init_chart_worker():
+    global _chart_module
+    import matplotlib
+    matplotlib.use("Agg")
+    warnings.filterwarnings("ignore", message=".*non-interactive.*")
+    _chart_module = load_script("test grader v13.0.0.py", "test_grader_v13")
+
+
+def render_chart(kind, course, student_id, fmt, mtime_ns):
+    """Render a v13 chart to PNG/SVG bytes with matplotlib inside a chart worker process"""
+    plt = _chart_module._pyplot()
+    calc = cached_course(_chart_courses, _chart_module, course, mtime_ns)
+
+    if kind == "student":
+        if student_id not in calc.students:
+            raise KeyError(f"student {student_id!r} not found")
+        calc.plot_student_performance(student_id)
+    else:
+        if not calc.students:
+            raise KeyError("no students in course")
+        calc.generate_class_report()
+    buffer = io.BytesIO()
+    try:
+        plt.gcf().savefig(buffer, format=fmt, dpi=100, bbox_inches="tight")
+    finally:
+        plt.close("all")
+    return buffer.getvalue()
+
+
+def load_course(module, course):
+    calc = module.GradeCalculator(course)
+    with contextlib.redirect_stdout(io.StringIO()):
+        calc.load_data()
+    return calc
+
+
+def cached_course(cache, module, course, mtime_ns, max_courses=CHART_COURSES):
+    """Course from an LRU OrderedDict of course -> (mtime_ns, calculator),
+    reloaded when its file has changed"""
+    entry = cache.get(course)
+    if entry is None or entry[0] != mtime_ns:
+        entry = cache[course] = (mtime_ns, load_course(module, course))
+    cache.move_to_end(course)
+    while len(cache) > max_courses:
+        cache.popitem(last=False)
+    return entry[1]
+
+
+class ChartCache:
+    """LRU cache of rendered charts; concurrent requests for one chart share a render.
+
+    Native SVG charts are cheap (about a millisecond) and drawn in the calling
+    thread from courses loaded in this process; matplotlib charts go to the
+    worker processes."""
+
+    def __init__(self, workers=CHART_WORKERS, max_bytes=CHART_CACHE_BYTES, max_entries=CHART_CACHE_ENTRIES):
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.nbytes = 0
+        self.charts = OrderedDict()
+        self.pending = {}
+        self.lock = threading.Lock()
+        self.executor = None
+        self.module = None
+        self.courses = OrderedDict()
+        self.load_lock = threading.Lock()
+
+    def get(self, kind, course, student_id, fmt, mtime_ns, engine="matplotlib"):
+        if fmt != "svg":
+            engine = "matplotlib"
+        key = (kind, course, student_id, fmt, mtime_ns, engine)
+        with self.lock:
+            if key in self.charts:
+                self.charts.move_to_end(key)
+                return self.charts[key]
+        if engine == "native":
+            body = self.render_native(kind, course, student_id, mtime_ns)
+            self.store(key, body)
+            return body
+
+        owner = False
+        with self.lock:
+            future = self.pending.get(key)
+            if future is None:
+                if self.executor is None:
+                    self.executor = ProcessPoolExecutor(
+                        max_workers=self.workers, initializer=_init_chart_worker,
+                        mp_context=multiprocessing.get_context("spawn"))
+                future = self.executor.submit(render_chart, *key[:-1])
+                self.pending[key] = future
+                owner = True
+        try:
+            body = future.result(timeout=CHART_TIMEOUT)
+        finally:
+            if owner:
+                with self.lock:
+                    self.pending.pop(key, None)
+        if owner:
+            self.store(key, body)
+        return body
+
+    def store(self, key, body):
+        with self.lock:
+            if key in self.charts:
+                self.nbytes -= len(self.charts.pop(key))
+            self.charts[key] = body
+            self.nbytes += len(body)
+            while self.charts and (self.nbytes > self.max_bytes or len(self.charts) > self.max_entries):
+                _, evicted = self.charts.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def render_native(self, kind, course, student_id, mtime_ns):
+        """SVG chart from v13's SvgReport; needs no matplotlib in this process"""
+        with self.load_lock:
+            if self.module is None:
+                self.module = load_script("test grader v13.0.0.py", "test_grader_v13")
+            calc = cached_course(self.courses, self.module, course, mtime_ns)
+        if kind == "student":
+            return calc.student_report_svg(student_id).encode("utf-8")
+        if not calc.students:
+            raise KeyError("no students in course")
+        return calc.class_report_svg().encode("utf-8")
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+
+
+class GradingAPI:
+    """In-process grading and statistics, shared by all worker threads"""
+
+    def __init__(self, db_name=GRADES_DB, pool_size=WORKERS):
+        self.db_name = db_name
+        self.pool_size = pool_size
+        self.lock = threading.Lock()
+        self._grader = None
+        self._db = None
+
+    def _load(self):
+        # Deferred so serving the download page never pays for these imports
+        with self.lock:
+            if self._grader is None:
+                self._grader = load_script("test grader v10.0.0.py", "test_grader_v10")
+                database = load_script("test grader v11.0.0.py", "test_grader_v11")
+                self._db = database.GradeDatabase(self.db_name, pool_size=self.pool_size)
+
+    def grade(self, payload):
+        """Grade one score or a list of scores; raises ValueError on bad input"""
+        self._load()
+        save = False
+        if isinstance(payload, dict):
+            save = bool(payload.get("save", False))
+            payload = payload["scores"] if "scores" in payload else payload.get("score")
+        single = not isinstance(payload, list)
+        scores = [payload] if single else payload
+
+        results = []
+        for i, score in enumerate(scores):
+            if isinstance(score, bool) or not isinstance(score, (int, float)) or not 0 <= score <= 100:
+                raise ValueError(f"scores[{i}] must be a number between 0 and 100")
+            letter_grade, message, _, _ = self._grader.determine_grade_advanced(score)
+            results.append({
+                "score": score,
+                "letter_grade": letter_grade,
+                "gpa": self._grader.calculate_gpa(letter_grade),
+                "message": message,
+                "feedback": self._grader.generate_detailed_feedback(score, letter_grade).split("\n"),
+            })
+        if save:
+            self._db.save_grades([(r["score"], r["letter_grade"], r["gpa"], "", "", r["message"])
+                                  for r in results])
+        return results[0] if single else {"count": len(results), "results": results}
+
+    def stats(self):
+        self._load()
+        total, avg_score, highest, lowest, avg_gpa = self._db.get_statistics()
+        return {
+            "total_grades": total,
+            "avg_score": avg_score,
+            "highest_score": highest,
+            "lowest_score": lowest,
+            "avg_gpa": avg_gpa,
+        }
+
+
+class StaticAsset:
+    """One file loaded into memory together with its compressed variants"""
+
+    def __init__(self, path, stat, content_type):
+        with open(path, "rb") as f:
+            data = f.read()
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.content_type = content_type
+        self.last_modified = email.utils.formatdate(stat.st_mtime, usegmt=True)
+        digest = hashlib.sha256(data).hexdigest()[:32]
+        self.variants = {"identity": (data, f'"{digest}"')}
+        if content_type.startswith(COMPRESSIBLE_TYPES):
+            compressed = self.precompressed(path, ".gz", stat) or gzip.compress(data, 9)
+            if len(compressed) < len(data):
+                self.variants["gzip"] = (compressed, f'"{digest}-gz"')
+            compressed = self.precompressed(path, ".br", stat)
+            if compressed is None and brotli is not None:
+                compressed = brotli.compress(data, quality=11)
+            if compressed is not None and len(compressed) < len(data):
+                self.variants["br"] = (compressed, f'"{digest}-br"')
+        self.nbytes = sum(len(body) for body, _ in self.variants.values())
+        self.etags = {etag for _, etag in self.variants.values()}
+
+    @staticmethod
+    def precompressed(path, suffix, stat):
+        """Contents of a .gz/.br sibling written by build_assets.py, if not older than path"""
+        try:
+            with open(path + suffix, "rb") as f:
+                if os.fstat(f.fileno()).st_mtime_ns >= stat.st_mtime_ns:
+                    return f.read()
+        except OSError:
+            pass
+        return None
+
+    def select(self, accept_encoding):
+        """Pick the best variant the client accepts: brotli, then gzip, then identity"""
+        accepted = set()
+        for item in accept_encoding.split(","):
+            coding, _, params = item.strip().partition(";")
+            if params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000"):
+                accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+
+def parse_range(header, size):
+    """Parse a single-range "bytes=..." header into (start, end) inclusive.
+    
+    Returns None when the header should be ignored (malformed or multiple
+    ranges; the whole file is sent) and (size, size) when unsatisfiable."""
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, dash, last = spec.strip().partition("-")
+    if not dash:
+        return None
+    try:
+        if not first:
+            suffix = int(last)
+            if suffix <= 0:
+                return (size, size)
+            return (max(size - suffix, 0), size - 1)
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        return (size, size)
+    if end < start:
+        return None
+    return (start, min(end, size - 1))
+
+
+class StaticCache:
+    """LRU cache of StaticAssets, revalidated against the file mtime on every hit"""
+
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, max_file=CACHE_MAX_FILE):
+        self.max_bytes = max_bytes
+        self.max_file = max_file
+        self.nbytes = 0
+        self.assets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path, content_type):
+        """Return the cached asset for path, (re)loading it if needed; None if not cacheable"""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if stat.st_size > self.max_file or not os.path.isfile(path):
+            return None
+        with self.lock:
+            asset = self.assets.get(path)
+            if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size:
+                self.assets.move_to_end(path)
+                return asset
+        asset = StaticAsset(path, stat, content_type)
+        with self.lock:
+            old = self.assets.pop(path, None)
+            if old is not None:
+                self.nbytes -= old.nbytes
+            self.assets[path] = asset
+            self.nbytes += asset.nbytes
+            while self.nbytes > self.max_bytes and len(self.assets) > 1:
+                _, evicted = self.assets.popitem(last=False)
+                self.nbytes -= evicted.nbytes
+        return asset
+
+
+class Handler(SimpleHTTPRequestHandler):
+    """Static file handler speaking HTTP/1.1 so browsers can reuse connections"""
+    protocol_version = "HTTP/1.1"
+    timeout = KEEP_ALIVE_TIMEOUT
+    # Headers and body go out in separate writes; without TCP_NODELAY a
+    # keep-alive client waits on delayed ACKs (~40 ms) for every response.
+    disable_nagle_algorithm = True
+
+    def handle(self):
+        # Same loop as BaseHTTPRequestHandler.handle, but stop reusing the
+        # connection once the server has been asked to shut down, and hand an
+        # idle keep-alive connection back to the server (keep_alive) instead
+        # of blocking a worker thread until the client's next request.
+        self.keep_alive = False
+        self.close_connection = True
+        self.handle_one_request()
+        while not self.close_connection and not self.server.stopping.is_set():
+            if not self.input_pending():
+                self.keep_alive = True
+                return
+            self.handle_one_request()
+
+    def input_pending(self):
+        """True if the next (pipelined) request has already arrived; never blocks"""
+        self.connection.settimeout(0)
+        try:
+            return bool(self.rfile.peek(1))
+        except OSError:
+            return False
+        finally:
+            self.connection.settimeout(self.timeout)
+
+    def finish(self):
+        # A parked keep-alive connection keeps its rfile/wfile (and any
+        # buffered input) until the server closes it
+        if not self.keep_alive:
+            super().finish()
+
+    def handle_one_request(self):
+        self._started = None
+        try:
+            super().handle_one_request()
+        finally:
+            if self._started is not None:
+                # Error responses, requests that never got a response (status
+                # 0) and unparsable ones share one label so scanners cannot
+                # blow up the number of series
+                path = getattr(self, "path", None)
+                if path is None or not 0 < self._status < 400:
+                    path = "other"
+                else:
+                    path = path.split("?", 1)[0]
+                self.server.metrics.end(path, self.command or "-", self._status, self._body_bytes,
+                                        time.perf_counter() - self._started)
+
+    def parse_request(self):
+        # Called once the request line has arrived, so idle keep-alive time is not counted
+        self._started = time.perf_counter()
+        self._status = 0
+        self._body_bytes = 0
+        self.path = None  # not set by a request line that fails to parse; don't report the previous one
+        self.server.metrics.begin()
+        return super().parse_request()
+
+    def send_response(self, code, message=None):
+        self._status = code
+        super().send_response(code, message)
+
+    def send_header(self, keyword, value):
+        if keyword.lower() == "content-length" and self.command != "HEAD":
+            self._body_bytes = int(value)
+        super().send_header(keyword, value)
+
+    API_ROUTES = {
+        ("GET", "/stats"): "api_stats",
+        ("POST", "/grade"): "api_grade",
+        ("GET", "/chart/student"): "api_chart",
+        ("GET", "/chart/class"): "api_chart",
+        ("GET", "/metrics"): "api_metrics",
+    }
+
+    def route_api(self, method):
+        """Dispatch API paths; returns False for anything that is not an API route"""
+        name = self.API_ROUTES.get((method, self.path.split("?", 1)[0]))
+        if name is None:
+            return False
+        getattr(self, name)()
+        return True
+
+    def send_json(self, status, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def api_grade(self):
+        length = self.headers.get("Content-Length")
+        if length is None:
+            # A body sent without a length (or chunked) would be left on the
+            # keep-alive connection and read as the next request line
+            self.close_connection = True
+            self.send_json(HTTPStatus.LENGTH_REQUIRED, {"error": "Content-Length required"})
+            return
+        if not length.strip().isdigit():
+            # Without a usable length the body cannot be skipped, so the connection is done
+            self.close_connection = True
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": "invalid Content-Length"})
+            return
+        length = int(length)
+        if length > MAX_API_BODY:
+            self.close_connection = True
+            self.send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "request body too large"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(length) or b"null")
+            self.send_json(HTTPStatus.OK, self.server.api.grade(payload))
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+
+    def api_stats(self):
+        self.send_json(HTTPStatus.OK, self.server.api.stats())
+
+    def api_metrics(self):
+        body = self.server.metrics.render().encode("utf-8")
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def api_chart(self):
+        url = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        kind = url.path.rsplit("/", 1)[1]
+        course = query.get("course", "")
+        student_id = query.get("id", "") if kind == "student" else ""
+        fmt = query.get("format", "png").lower()
+        engine = query.get("engine", "native").lower()
+        if not course or any(c in course for c in "/\\") or fmt not in CHART_TYPES or \
+                engine not in CHART_ENGINES or (kind == "student" and not student_id):
+            self.send_json(HTTPStatus.BAD_REQUEST,
+                           {"error": "need course, id (student charts), format png or svg "
+                                     "and engine native or matplotlib"})
+            return
+        try:
+            mtime_ns = os.stat(f"{course.replace(' ', '_')}_grades.json").st_mtime_ns
+            body = self.server.charts.get(kind, course, student_id, fmt, mtime_ns, engine)
+        except OSError:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": f"course {course!r} not found"})
+            return
+        except KeyError as e:
+            self.send_json(HTTPStatus.NOT_FOUND, {"error": str(e.args[0])})
+            return
+        except Exception as e:
+            self.send_json(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"chart rendering failed: {e}"})
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", CHART_TYPES[fmt])
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "private, max-age=60")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        if not self.route_api("POST"):
+            self.close_connection = True  # the request body was not read
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def is_private(self):
+        path = self.translate_path(self.path)
+        return (path.lower().endswith(PRIVATE_SUFFIXES)
+                or os.path.abspath(path) == os.path.abspath(GRADES_DB))
+
+    def do_GET(self):
+        if self.route_api("GET"):
+            return
+        if self.is_private():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        if "Range" not in self.headers and self.send_cached():
+            return
+        if not self.send_file():
+            super().do_GET()
+
+    def do_HEAD(self):
+        if self.is_private():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        if "Range" not in self.headers and self.send_cached(head=True):
+            return
+        if not self.send_file(head=True):
+            super().do_HEAD()
+
+    def send_file(self, head=False):
+        """Serve a regular file from disk with sendfile; False means not a file"""
+        path = self.translate_path(self.path)
+        if self.path.split("?", 1)[0].endswith("/") or os.path.isdir(path):
+            return False
+        # Same bytes as a full GET (send_cached), so ranges line up with it
+        path = self.built_path(path)
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return False
+        with f:
+            st = os.fstat(f.fileno())
+            if not stat.S_ISREG(st.st_mode):
+                return False
+            size = st.st_size
+            etag = f'"{st.st_mtime_ns:x}-{size:x}"'
+            # Files small enough for the cache keep the content-hash ETag their full GET sends
+            asset = self.server.static_cache.get(path, self.guess_type(path))
+            if asset is not None and (asset.mtime_ns, asset.size) == (st.st_mtime_ns, size):
+                etag = asset.variants["identity"][1]
+            last_modified = email.utils.formatdate(st.st_mtime, usegmt=True)
+
+            if_none_match = self.headers.get("If-None-Match")
+            if if_none_match and (if_none_match.strip() == "*" or
+                                  etag in {tag.strip() for tag in if_none_match.split(",")}):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return True
+
+            start, end = 0, size - 1
+            status = HTTPStatus.OK
+            byte_range = self.headers.get("Range")
+            if_range = self.headers.get("If-Range")
+            if byte_range and (not if_range or if_range.strip() in (etag, last_modified)):
+                parsed = parse_range(byte_range, size)
+                if parsed == (size, size):
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return True
+                if parsed is not None:
+                    start, end = parsed
+                    status = HTTPStatus.PARTIAL_CONTENT
+
+            length = end - start + 1
+            self.send_response(status)
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(length))
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            self.send_header("Accept-Ranges", "bytes")
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", last_modified)
+            self.send_header("Cache-Control", "public, max-age=3600")
+            self.end_headers()
+            if not head and length > 0:
+                # Kernel-to-socket copy; falls back to send() where sendfile is unavailable
+                self.connection.sendfile(f, start, length)
+        return True
+
+    def send_cached(self, head=False):
+        """Serve a file from the in-memory cache; False means fall back to disk"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not self.path.split("?", 1)[0].endswith("/"):
+                return False  # let SimpleHTTPRequestHandler redirect to the slash form
+            path = os.path.join(path, "index.html")
+        asset = self.server.static_cache.get(self.built_path(path), self.guess_type(path))
+        if asset is None:
+            return False
+
+        encoding = asset.select(self.headers.get("Accept-Encoding", ""))
+        body, etag = asset.variants[encoding]
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match and (if_none_match.strip() == "*" or
+                              asset.etags & {tag.strip() for tag in if_none_match.split(",")}):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_asset_headers(asset, etag)
+            self.end_headers()
+            return True
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if encoding != "identity":
+            self.send_header("Content-Encoding", encoding)
+        self.send_asset_headers(asset, etag)
+        self.end_headers()
+        if not head:
+            self.wfile.write(body)
+        return True
+
+    def built_path(self, path):
+        """The dist/ copy of path from build_assets.py while it is at least as new as the source"""
+        rel = os.path.relpath(path, self.directory)
+        if rel.startswith(os.pardir) or rel.split(os.sep, 1)[0] == BUILD_DIR:
+            return path
+        built = os.path.join(self.directory, BUILD_DIR, rel)
+        try:
+            if os.stat(built).st_mtime_ns >= os.stat(path).st_mtime_ns:
+                return built
+        except OSError:
+            pass
+        return path
+
+    def send_asset_headers(self, asset, etag):
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Vary", "Accept-Encoding")
+        # HTML is revalidated on every visit (cheap 304s); other assets may be reused briefly
+        if asset.content_type.startswith("text/html"):
+            self.send_header("Cache-Control", "no-cache")
+        else:
+            self.send_header("Cache-Control", "public, max-age=3600")
+
+
+class PooledHTTPServer(HTTPServer):
+    """HTTPServer that hands each connection to a bounded pool of worker threads
+
+    Worker threads only run while a request is being read or answered. An
+    idle keep-alive connection is parked in a selector watched by one
+    thread and goes back to the pool when its next request becomes
+    readable, so idle browsers never hold workers that other clients need.
+    """
+
+    def __init__(self, address, handler, workers=WORKERS, reuse_port=False):
+        self.reuse_port = reuse_port
+        super().__init__(address, handler)
+        self.workers = workers
+        self.stopping = threading.Event()
+        self.static_cache = StaticCache()
+        self.api = GradingAPI(pool_size=workers)
+        self.charts = ChartCache()
+        self.metrics = Metrics()
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="http")
+        self.idle = OrderedDict()  # parked handler -> idle deadline, oldest first
+        self.parking = []          # handlers parked by workers, registered by the idle thread
+        self.parking_lock = threading.Lock()
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_r, self.wakeup_w = socket.socketpair()
+        self.wakeup_r.setblocking(False)
+        self.selector.register(self.wakeup_r, selectors.EVENT_READ)
+        self.idle_thread = threading.Thread(target=self._watch_idle, name="http-idle", daemon=True)
+        self.idle_thread.start()
+
+    def server_bind(self):
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process_in_worker, request, client_address)
+
+    def _process_in_worker(self, request, client_address, handler=None):
+        """Serve a new connection, or the next request(s) of a parked handler"""
+        try:
+            if handler is None:
+                handler = self.RequestHandlerClass(request, client_address, self)
+            else:
+                try:
+                    handler.handle()
+                finally:
+                    handler.finish()  # a no-op if the connection was parked again
+        except Exception:
+            if handler is not None:
+                handler.keep_alive = False
+            self.handle_error(request, client_address)
+        if handler is not None and handler.keep_alive and not self.stopping.is_set():
+            self.park(handler)
+            return
+        self.close_idle(handler, request)
+
+    def park(self, handler):
+        """Give an idle keep-alive connection to the idle thread"""
+        with self.parking_lock:
+            self.parking.append(handler)
+        self.wakeup_w.send(b"\0")
+
+    def close_idle(self, handler, request):
+        if handler is not None and handler.keep_alive:
+            handler.keep_alive = False
+            handler.finish()
+        self.shutdown_request(request)
+
+    def _watch_idle(self):
+        """Hand parked connections back to the pool once their next request is
+        readable; close those idle past KEEP_ALIVE_TIMEOUT"""
+        while not self.stopping.is_set():
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.fileobj is self.wakeup_r:
+                    with contextlib.suppress(OSError):
+                        self.wakeup_r.recv(4096)
+                    continue
+                handler = key.data
+                self.selector.unregister(handler.request)
+                del self.idle[handler]
+                try:
+                    self.pool.submit(self._process_in_worker, handler.request, handler.client_address, handler)
+                except RuntimeError:  # the pool has been shut down
+                    self.close_idle(handler, handler.request)
+
+            with self.parking_lock:
+                parked, self.parking = self.parking, []
+            deadline = time.monotonic() + KEEP_ALIVE_TIMEOUT
+            for handler in parked:
+                self.selector.register(handler.request, selectors.EVENT_READ, handler)
+                self.idle[handler] = deadline
+            now = time.monotonic()
+            while self.idle and (len(self.idle) > KEEP_ALIVE_MAX_IDLE or next(iter(self.idle.values())) <= now):
+                handler, _ = self.idle.popitem(last=False)
+                self.selector.unregister(handler.request)
+                self.close_idle(handler, handler.request)
+
+    def server_close(self):
+        """Stop accepting, let in-flight requests finish, then close idle connections"""
+        self.stopping.set()
+        super().server_close()
+        self.pool.shutdown(wait=True)
+        self.wakeup_w.send(b"\0")
+        self.idle_thread.join()
+        for handler in list(self.idle) + self.parking:
+            self.close_idle(handler, handler.request)
+        self.idle.clear()
+        self.parking = []
+        self.selector.close()
+        self.wakeup_r.close()
+        self.wakeup_w.close()
+        self.charts.close()
+
+
+class SingleHTTPServer(socketserver.TCPServer):
+    """The original single-threaded server, kept for comparison benchmarks"""
+    allow_reuse_address = True
+
+    def __init__(self, address, handler):
+        super().__init__(address, handler)
+        self.stopping = threading.Event()
+
+
+def install_sigterm_handler(httpd):
+    """Shut down gracefully on SIGTERM (sent by the deployment on scale-down)"""
+    def on_sigterm(signum, frame):
+        print("SIGTERM received, finishing in-flight requests...")
+        httpd.stopping.set()
+        # shutdown() waits for serve_forever() to return, so it must not run
+        # on the thread that is inside serve_forever().
+        threading.Thread(target=httpd.shutdown, daemon=True).start()
+    signal.signal(signal.SIGTERM, on_sigterm)
+
+
+def make_server(port=PORT, workers=WORKERS, single=False, reuse_port=False):
+    if single:
+        return SingleHTTPServer(("0.0.0.0", port), SimpleHTTPRequestHandler)
+    return PooledHTTPServer(("0.0.0.0", port), Handler, workers, reuse_port)
+
+
+class Supervisor:
+    """Keeps N worker processes (each a full pooled server) running on one port"""
+
+    def __init__(self, processes, port, workers):
+        self.processes = processes
+        self.command = [sys.executable, os.path.abspath(__file__), "--port", str(port),
+                        "--workers", str(workers), "--processes", "1", "--reuse-port"]
+        self.workers = []
+        self.started = {}
+        self.stopping = False
+        self.reload_requested = False
+
+    def spawn(self):
+        # A fresh interpreter per worker, so a reload also picks up code changes
+        worker = subprocess.Popen(self.command)
+        self.started[worker.pid] = time.monotonic()
+        return worker
+
+    def run(self):
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+        self.workers = [self.spawn() for _ in range(self.processes)]
+        print(f"Supervisor {os.getpid()} started workers: {', '.join(str(w.pid) for w in self.workers)}")
+
+        while not self.stopping:
+            if self.reload_requested:
+                self.reload_requested = False
+                self.rolling_reload()
+            for i, worker in enumerate(self.workers):
+                if worker.poll() is not None and not self.stopping:
+                    print(f"Worker {worker.pid} exited with status {worker.returncode}, restarting")
+                    if time.monotonic() - self.started.pop(worker.pid, 0) < 1:
+                        time.sleep(1)  # back off instead of crash-looping
+                    self.workers[i] = self.spawn()
+            time.sleep(0.2)
+        self.stop_all()
+
+    def rolling_reload(self):
+        """Replace workers one at a time so the port is never left unserved"""
+        print("Rolling reload...")
+        for i, old in enumerate(list(self.workers)):
+            new = self.spawn()
+            time.sleep(WORKER_READY_WAIT)
+            if new.poll() is not None:
+                print(f"Replacement worker failed to start (status {new.returncode}); keeping {old.pid}")
+                continue
+            self.workers[i] = new
+            old.terminate()
+            old.wait()
+            self.started.pop(old.pid, None)
+        print(f"Reload complete: {', '.join(str(w.pid) for w in self.workers)}")
+
+    def stop_all(self, timeout=KEEP_ALIVE_TIMEOUT + 5):
+        for worker in self.workers:
+            if worker.poll() is None:
+                worker.terminate()
+        deadline = time.monotonic() + timeout
+        for worker in self.workers:
+            try:
+                worker.wait(max(deadline - time.monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                worker.kill()
+                worker.wait()
+
+    def _on_stop(self, signum, frame):
+        self.stopping = True
+
+    def _on_reload(self, signum, frame):
+        self.reload_requested = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the Test Grader download page")
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WORKERS,
+                        help="maximum connections handled concurrently")
+    parser.add_argument("--single", action="store_true",
+                        help="use the single-threaded TCPServer (one connection at a time)")
+    parser.add_argument("--processes", type=int, default=PROCESSES,
+                        help="pre-fork this many worker processes sharing the port (SO_REUSEPORT)")
+    parser.add_argument("--reuse-port", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # Supervised workers (--reuse-port) skip this: their supervisor already built
+    if not args.single and not args.reuse_port and os.path.exists("index.html"):
+        try:
+            load_script("build_assets.py", "build_assets").build(src=os.getcwd(), quiet=True)
+        except (OSError, ValueError) as e:
+            print(f"Asset build skipped ({e}); serving index.html as stored.")
+        # icon.png, favicon.ico and the PWA/Apple touch icons that index.html links;
+        # make_icon.py skips rendering when they are up to date
+        try:
+            load_script("make_icon.py", "make_icon").make_square_icon(quiet=True)
+        except (ImportError, OSError) as e:
+            print(f"Icon generation skipped ({e}).")
+
+    # A supervised worker never supervises (PROCESSES may be set in its environment too)
+    if args.processes > 1 and not args.single and not args.reuse_port:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            print("SO_REUSEPORT is not available on this platform; running a single process.")
+        else:
+            print(f"Starting {args.processes} worker processes on http://0.0.0.0:{args.port}")
+            Supervisor(args.processes, args.port, args.workers).run()
+            print("Server stopped.")
+            return
+
+    print(f"Starting server on http://0.0.0.0:{args.port}")
+    print("Serving files from the current directory...")
+    if not args.single:
+        print(f"Worker threads: {args.workers}")
 
-PORT = 5000
-Handler = SimpleHTTPRequestHandler
+    # Create the server instance
+    with make_server(args.port, args.workers, args.single, args.reuse_port) as httpd:
+        install_sigterm_handler(httpd)
+        try:
+            # Keep the server running until Ctrl+C or SIGTERM
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    print("Server stopped.")
 
-print(f"Starting server on http://0.0.0.0:{PORT}")
-print("Serving files from the current directory...")
 
-# Create the server instance
-with socketserver.TCPServer(("0.0.0.0", PORT), Handler) as httpd:
-    # Keep the server running until you press Ctrl+C
-    httpd.serve_forever()
+if __name__ == "__main__":
+    main()
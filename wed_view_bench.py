@@ -0,0 +1,163 @@
+"""
+Local load test for wed_view.py: requests/s and latency percentiles.
+
+Starts wed_view.py in a child process for each server mode, hammers it with
+concurrent keep-alive clients, and prints a before/after table.
+Run:
+  python wed_view_bench.py                        # compare --single vs pooled
+  python wed_view_bench.py --clients 50 --duration 10 --path /index.html
+  python wed_view_bench.py --slow-clients 2       # add clients that trickle their headers
+  python wed_view_bench.py --idle-clients 32      # add idle keep-alive connections (browser tabs)
+  python wed_view_bench.py --processes 4          # also measure the pre-fork mode
+"""
+
+import argparse
+import http.client
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def wait_for_port(port, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.05)
+    return False
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def slow_client(port, stop):
+    """Open a connection and send the request line one byte at a time"""
+    try:
+        sock = socket.create_connection(("127.0.0.1", port), timeout=5)
+    except OSError:
+        return
+    with sock:
+        for byte in b"GET /index.html HTTP/1.1\r\nHost: bench\r\n":
+            if stop.is_set():
+                return
+            try:
+                sock.sendall(bytes([byte]))
+            except OSError:
+                return
+            time.sleep(0.2)
+
+
+def idle_client(port, path, stop, ready):
+    """Make one keep-alive request, then leave the connection open and idle"""
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    try:
+        conn.request("GET", path)
+        conn.getresponse().read()
+    except (OSError, http.client.HTTPException):
+        pass
+    finally:
+        ready.release()
+    stop.wait()
+    conn.close()
+
+
+def client(port, path, stop, latencies, errors):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    while not stop.is_set():
+        start = time.perf_counter()
+        try:
+            conn.request("GET", path)
+            response = conn.getresponse()
+            response.read()
+            latencies.append(time.perf_counter() - start)
+        except (OSError, http.client.HTTPException):
+            errors.append(1)
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+    conn.close()
+
+
+def run(mode_args, clients, duration, path, slow_clients, idle_clients=0):
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "wed_view.py"), "--port", str(port), *mode_args],
+        cwd=HERE, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        if not wait_for_port(port):
+            raise RuntimeError("server did not start")
+        stop = threading.Event()
+        latencies, errors = [], []
+        # Idle connections are opened first, so they are already parked (or
+        # holding workers) when the measured clients start
+        ready = threading.Semaphore(0)
+        threads = [threading.Thread(target=idle_client, args=(port, path, stop, ready)) for _ in range(idle_clients)]
+        for t in threads:
+            t.start()
+        for _ in range(idle_clients):
+            ready.acquire()
+        threads += [threading.Thread(target=slow_client, args=(port, stop)) for _ in range(slow_clients)]
+        threads += [threading.Thread(target=client, args=(port, path, stop, latencies, errors))
+                    for _ in range(clients)]
+        for t in threads[idle_clients:]:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in threads:
+            t.join()
+    finally:
+        server.terminate()
+        server.wait()
+
+    latencies.sort()
+    def pct(p):
+        return latencies[min(int(p / 100 * len(latencies)), len(latencies) - 1)] * 1000 if latencies else float("nan")
+    return {
+        "requests": len(latencies),
+        "errors": len(errors),
+        "rps": len(latencies) / duration,
+        "p50": pct(50),
+        "p99": pct(99),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--path", default="/index.html")
+    parser.add_argument("--slow-clients", type=int, default=0)
+    parser.add_argument("--idle-clients", type=int, default=0,
+                        help="keep-alive connections that make one request and then sit idle")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="also benchmark --processes N (pre-fork workers)")
+    args = parser.parse_args()
+
+    modes = [
+        ("single (before)", ["--single"]),
+        (f"pooled x{args.workers} (after)", ["--workers", str(args.workers)]),
+    ]
+    if args.processes > 1:
+        modes.append((f"{args.processes} processes x{args.workers}",
+                      ["--workers", str(args.workers), "--processes", str(args.processes)]))
+    print(f"{args.clients} clients, {args.slow_clients} slow clients, {args.idle_clients} idle clients, "
+          f"{args.duration:.0f}s per mode, GET {args.path}")
+    print(f"{'Mode':<22} {'Requests':>9} {'Errors':>7} {'Req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    print("-" * 68)
+    for name, mode_args in modes:
+        r = run(mode_args, args.clients, args.duration, args.path, args.slow_clients, args.idle_clients)
+        print(f"{name:<22} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9.0f} {r['p50']:>8.2f} {r['p99']:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()